@@ -29,7 +29,8 @@ try:
     from components.gemini_handler import setup_gemini
     from components.ui_components import (
         create_project_header, create_room_calculator, create_advanced_requirements,
-        create_multi_room_interface, display_boq_results, update_boq_content_with_current_items
+        create_multi_room_interface, display_boq_results, update_boq_content_with_current_items,
+        streamlit_generation_callbacks
     )
     from components.visualizer import create_3d_visualization
     
@@ -513,6 +514,15 @@ def main():
             value=st.session_state.get('budget_tier_slider', 'Standard'),
             key="budget_tier_slider"
         )
+
+        st.number_input(
+            "Room Budget Cap (USD, 0 = no cap)",
+            min_value=0.0,
+            value=float(st.session_state.get('room_budget_cap_input', 0.0)),
+            step=1000.0,
+            key="room_budget_cap_input",
+            help="Optional: choose the best-scoring product combination that fits this equipment budget"
+        )
         
         if room_type_key in ROOM_SPECS:
             spec = ROOM_SPECS[room_type_key]
@@ -707,38 +717,41 @@ def main():
                     unified_ctx.room.ceiling_height_ft = st.session_state.get('ceiling_height_input', 10.0)
                     unified_ctx.room.area_sqft = unified_ctx.room.length_ft * unified_ctx.room.width_ft
                     unified_ctx.room.volume_cuft = unified_ctx.room.area_sqft * unified_ctx.room.ceiling_height_ft
+                    unified_ctx.project.room_budget_cap = st.session_state.get('room_budget_cap_input') or None
                     
                     progress_bar = st.progress(0, text="Initializing optimized generation...")
                     
-                    # Import the optimized generator
-                    from components.optimized_boq_generator import OptimizedBOQGenerator
-                    
-                    progress_bar.progress(25, text="🎯 Building logical equipment blueprint...")
+                    # Headless core; Streamlit only renders its progress and messages
+                    from components.optimized_boq_generator import run_room_generation
                     
-                    # ✅ NEW: Pass unified context
-                    generator = OptimizedBOQGenerator(
-                        product_df=product_df,
-                        unified_context=unified_ctx
-                    )
-                    
-                    # Store generator for later use
-                    st.session_state.boq_selector = generator.selector
+                    from components.alternatives_engine import catalog_fingerprint
                     
-                    progress_bar.progress(50, text="🔍 Selecting optimal products...")
+                    # NEW: Incremental regeneration - reuse the last run for this catalog and
+                    # only re-select components affected by changed answers
+                    catalog_key = catalog_fingerprint(product_df)
+                    previous = st.session_state.get('last_room_generation')
+                    if not previous or previous[0] != catalog_key:
+                        previous = None
                     
-                    # ✅ SIMPLIFIED: No parameters needed now
-                    boq_items, validation_results = generator.generate_boq_for_room()
+                    progress_callback, log_callback = streamlit_generation_callbacks(progress_bar)
+                    result = run_room_generation(
+                        unified_ctx, product_df,
+                        progress=progress_callback,
+                        log=log_callback,
+                        previous=previous[1] if previous else None
+                    )
+                    st.session_state.last_room_generation = (catalog_key, result)
+                    boq_items, validation_results = result.items, result.validation
                     
-                    progress_bar.progress(90, text="⚖️ Calculating Quality Score...")
+                    # Store selector for later use
+                    st.session_state.boq_selector = result.selector
 
-                    # Calculate quality score
-                    quality_score = generator.calculate_boq_quality_score(boq_items, validation_results)
+                    quality_score = result.quality_score
                     st.session_state.boq_quality_score = quality_score
 
                     if boq_items:
                         st.session_state.boq_items = boq_items
                         st.session_state.validation_results = validation_results
-                        st.session_state.boq_selector = generator.selector
                         
                         # Display quality score prominently
                         col_q1, col_q2, col_q3 = st.columns([1, 2, 1])
@@ -0,0 +1,7 @@
+# benchmarks/__init__.py
+"""
+Headless, offline, fixed-seed performance benchmarks for BOQ generation.
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json --threshold 0.2
+"""
@@ -0,0 +1,271 @@
+# benchmarks/run_benchmarks.py
+"""
+End-to-End BOQ Benchmarks
+Times catalog load, index build, per-component selection, full room generation
+for every ROOM_SPECS room type, multi-room optimization, Excel export and plain
+CSV/JSON/PDF export, on the shipped catalog and a synthetic 50k-row catalog.
+Headless, offline, fixed seed.
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json --threshold 0.2
+
+With --baseline, exits 1 when any benchmark's median is more than `threshold`
+slower than the baseline (and by at least --min-delta-ms).
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional
+
+import numpy as np
+
+from components.room_profiles import ROOM_SPECS
+from components.batch_boq import build_project_contexts
+from components.data_handler import load_catalog
+from components.intelligent_product_selector import IntelligentProductSelector, SharedCatalog
+from components.optimized_boq_generator import OptimizedBOQGenerator
+from components.multi_room_optimizer import MultiRoomOptimizer
+from components.excel_generator import generate_company_excel, write_company_excel_streaming
+from components.boq_document import build_boq_document
+from components.boq_renderers import RENDERERS, render_boq
+from components import avixa_engine
+from benchmarks.synthetic_catalog import write_synthetic_catalog, DEFAULT_ROWS
+
+DEFAULT_SEED = 42
+DEFAULT_THRESHOLD = 0.2
+MULTI_ROOM_SIZES = (10, 50, 200)
+USD_TO_INR = 83.5
+
+BENCH_PROJECT = {
+    'name': 'Benchmark Project',
+    'client': 'Benchmark Client',
+    'budget_tier': 'Standard',
+}
+
+
+# ==================== TIMING ====================
+
+def time_call(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    Run fn `repeat` times; setup (untimed) runs before each call and its return
+    value is passed to fn when fn takes an argument. stdout is silenced.
+    """
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn(state) if setup else fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'runs': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+    }
+
+
+def _seed(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+# ==================== SUITE ====================
+
+def _room_spec_rooms() -> List[Dict[str, Any]]:
+    """One spec room per ROOM_SPECS type at its typical dimensions"""
+    rooms = []
+    for room_type, profile in ROOM_SPECS.items():
+        length, width = profile.get('typical_dims_ft', (20, 15))
+        rooms.append({'name': room_type.split(' (')[0], 'type': room_type,
+                      'length': length, 'width': width, 'ceiling_height': 10})
+    return rooms
+
+
+def _generate(shared: SharedCatalog, context):
+    return OptimizedBOQGenerator(shared, context).generate_boq_for_room()
+
+
+def run_catalog_suite(label: str, catalog_path: str, repeat: int, seed: int,
+                      multi_room_sizes=MULTI_ROOM_SIZES, include_excel: bool = True) -> Dict[str, Any]:
+    """All benchmarks against one catalog file"""
+    results = {}
+    _seed(seed)
+    print(f"\n📦 [{label}] {catalog_path}")
+
+    def record(name, stats):
+        results[name] = stats
+        print(f"    {name:<48} median {stats['median_ms']:10.2f} ms  (min {stats['min_ms']:.2f})")
+
+    # --- Catalog load & index build ---
+    record('catalog_load', time_call(lambda: load_catalog(catalog_path), repeat))
+    product_df, _, _ = load_catalog(catalog_path)
+    record('shared_catalog_build', time_call(lambda: SharedCatalog(product_df), repeat))
+    shared = SharedCatalog(product_df)
+    record('partition_index_build', time_call(
+        lambda: IntelligentProductSelector._build_partition_index(shared.product_df), repeat))
+
+    contexts = build_project_contexts({'project': BENCH_PROJECT, 'rooms': _room_spec_rooms()})
+
+    # --- select_product per component type (standard conference room blueprint) ---
+    standard = next(c for c in contexts if c.room.room_type == 'Large Conference Room (8-12 People)')
+    generator = OptimizedBOQGenerator(shared, copy.deepcopy(standard))
+    generator._run_avixa_analysis()
+    blueprint = generator._build_avixa_compliant_blueprint()
+    for component_key, requirement in blueprint.items():
+        def fresh_selector():
+            selector = IntelligentProductSelector(shared)
+            selector.unified_context = generator.context
+            return selector
+        record(f'select_product.{component_key}', time_call(
+            lambda selector, req=requirement: selector.select_product(req), repeat, setup=fresh_selector))
+
+    # --- Full room generation per room type (cold AVIXA cache) ---
+    room_boqs = []
+    for context in contexts:
+        def cold_context(context=context):
+            avixa_engine.clear_cache()
+            return copy.deepcopy(context)
+        record(f'generate_boq_for_room.{context.room.room_name}', time_call(
+            lambda ctx: _generate(shared, ctx), repeat, setup=cold_context))
+        with contextlib.redirect_stdout(io.StringIO()):
+            items, _ = _generate(shared, copy.deepcopy(context))
+        room_boqs.append({'name': context.room.room_name, 'type': context.room.room_type,
+                          'area': context.room.area_sqft, 'boq_items': items})
+
+    # --- Multi-room optimization ---
+    optimizer = MultiRoomOptimizer(optimization_enabled=True, rooms_are_adjacent=True)
+    for size in multi_room_sizes:
+        project_rooms = [dict(copy.deepcopy(room_boqs[i % len(room_boqs)]), name=f"Room {i + 1}")
+                         for i in range(size)]
+        record(f'optimize_multi_room_project.{size}_rooms', time_call(
+            lambda rooms: optimizer.optimize_multi_room_project(rooms), repeat,
+            setup=lambda rooms=project_rooms: copy.deepcopy(rooms)))
+
+    # --- Excel export ---
+    details = {'Project Name': BENCH_PROJECT['name'], 'Client Name': BENCH_PROJECT['client'], 'gst_rates': {}}
+    if include_excel:
+        for with_images in (False, True):
+            name = 'generate_company_excel.' + ('with_images' if with_images else 'no_images')
+            record(name, time_call(
+                lambda rooms, images=with_images: generate_company_excel(details, rooms, USD_TO_INR,
+                                                                         include_product_images=images),
+                repeat, setup=lambda: copy.deepcopy(room_boqs)))
+        record('write_company_excel_streaming', time_call(
+            lambda rooms: os.remove(write_company_excel_streaming(details, rooms, USD_TO_INR)),
+            repeat, setup=lambda: copy.deepcopy(room_boqs)))
+
+    # --- Plain exports (BOQ document + CSV/JSON/PDF renderers) ---
+    record('build_boq_document', time_call(lambda: build_boq_document(details, room_boqs, USD_TO_INR), repeat))
+    document = build_boq_document(details, room_boqs, USD_TO_INR)
+    for fmt in sorted(RENDERERS):
+        record(f'render_boq.{fmt}', time_call(lambda fmt=fmt: render_boq(document, fmt), repeat))
+
+    return results
+
+
+# ==================== REPORT / REGRESSION CHECK ====================
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def find_regressions(current: Dict, baseline: Dict, threshold: float, min_delta_ms: float) -> List[Dict]:
+    """Benchmarks whose median slowed by more than threshold (fraction) and min_delta_ms"""
+    regressions = []
+    for catalog, benches in current.get('results', {}).items():
+        for name, stats in benches.items():
+            base = baseline.get('results', {}).get(catalog, {}).get(name)
+            if not base:
+                continue
+            delta = stats['median_ms'] - base['median_ms']
+            if delta > min_delta_ms and stats['median_ms'] > base['median_ms'] * (1 + threshold):
+                regressions.append({
+                    'catalog': catalog, 'benchmark': name,
+                    'baseline_ms': base['median_ms'], 'current_ms': stats['median_ms'],
+                    'change_pct': round(delta / base['median_ms'] * 100, 1) if base['median_ms'] else None
+                })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run_benchmarks',
+                                     description='Time BOQ generation end to end.')
+    parser.add_argument('--catalog', default='master_product_catalog.csv', help='Shipped product catalog CSV')
+    parser.add_argument('--synthetic-rows', type=int, default=DEFAULT_ROWS,
+                        help=f'Rows in the synthetic catalog (default {DEFAULT_ROWS}; 0 skips it)')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Timed runs per benchmark (median is reported)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--rooms', default=','.join(map(str, MULTI_ROOM_SIZES)),
+                        help='Multi-room optimizer project sizes (comma separated)')
+    parser.add_argument('--no-excel', action='store_true', help='Skip the Excel export benchmarks')
+    parser.add_argument('--output', '-o', help='Write results JSON here')
+    parser.add_argument('--baseline', help='Earlier results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Allowed median slowdown as a fraction (default {DEFAULT_THRESHOLD})')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help='Ignore slowdowns smaller than this many ms (timer noise)')
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+    room_sizes = tuple(int(n) for n in args.rooms.split(',') if n.strip())
+
+    catalogs = {'shipped': args.catalog}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic_rows:
+            catalogs[f'synthetic_{args.synthetic_rows}'] = write_synthetic_catalog(
+                args.catalog, os.path.join(tmp, 'synthetic_catalog.csv'), rows=args.synthetic_rows, seed=args.seed)
+
+        report = {
+            'meta': {
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'commit': _git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'repeat': args.repeat,
+            },
+            'results': {
+                label: run_catalog_suite(label, path, args.repeat, args.seed, room_sizes, not args.no_excel)
+                for label, path in catalogs.items()
+            }
+        }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n🧾 Results: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n🚨 {len(regressions)} regression(s) vs {args.baseline} (>{args.threshold:.0%}):")
+            for r in regressions:
+                print(f"    [{r['catalog']}] {r['benchmark']}: {r['baseline_ms']:.2f} → {r['current_ms']:.2f} ms "
+                      f"(+{r['change_pct']}%)")
+            return 1
+        print(f"\n✅ No regressions vs {args.baseline} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+# benchmarks/synthetic_catalog.py
+"""
+Synthetic Catalog Builder
+Scales the shipped catalog up to N rows by resampling real products with unique
+model numbers and jittered prices, so category/brand/keyword distributions stay
+realistic. Deterministic for a given seed.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROWS = 50_000
+PRICE_JITTER = 0.2  # ±20 %
+
+
+def make_synthetic_catalog(base_df: pd.DataFrame, rows: int = DEFAULT_ROWS, seed: int = 42) -> pd.DataFrame:
+    """Resample base_df (raw catalog CSV columns) to `rows` rows"""
+    rng = np.random.default_rng(seed)
+    positions = rng.integers(0, len(base_df), size=rows)
+    df = base_df.iloc[positions].reset_index(drop=True).copy()
+
+    suffix = pd.Series(np.arange(rows), dtype=str).radd('-S')
+    df['model_number'] = df['model_number'].astype(str) + suffix
+    df['name'] = df['name'].astype(str) + suffix
+
+    factor = 1 + rng.uniform(-PRICE_JITTER, PRICE_JITTER, size=rows)
+    for column in ('price_usd', 'price_inr', 'price'):
+        if column in df.columns:
+            df[column] = (pd.to_numeric(df[column], errors='coerce') * factor).round(2)
+    return df
+
+
+def write_synthetic_catalog(base_csv: str, output_csv: str, rows: int = DEFAULT_ROWS, seed: int = 42) -> str:
+    make_synthetic_catalog(pd.read_csv(base_csv), rows=rows, seed=seed).to_csv(output_csv, index=False)
+    return output_csv
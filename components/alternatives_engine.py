@@ -0,0 +1,202 @@
+# components/alternatives_engine.py
+"""
+Top-K Alternatives Engine
+Precomputes per-partition neighbour lists so "Find Alternative Products" is a lookup
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+# Neighbour score weights
+TEXT_WEIGHT = 0.5
+PRICE_WEIGHT = 0.3
+QUALITY_WEIGHT = 0.2
+
+PRICE_DIRECTIONS = ('any', 'cheaper', 'pricier')
+
+
+def catalog_fingerprint(product_df: pd.DataFrame) -> int:
+    """Cheap vectorized fingerprint of a catalog, used as a cache key"""
+    cols = [c for c in ('model_number', 'name', 'price') if c in product_df.columns]
+    return int(pd.util.hash_pandas_object(product_df[cols], index=False).sum())
+
+
+class AlternativesEngine:
+    """
+    Neighbour lists per (category, sub_category) partition, scored by
+    spec-text similarity, price distance and data quality.
+    Partitions are built on first use and cached for the engine's lifetime.
+    """
+
+    def __init__(self, product_df: pd.DataFrame, neighbours_per_product: int = 20):
+        self.product_df = product_df
+        self.neighbours_per_product = neighbours_per_product
+        self._partitions = {}
+        self._partition_positions = product_df.groupby(
+            ['category', 'sub_category'], sort=False
+        ).indices
+
+    def build_all(self):
+        """Eagerly build every partition (e.g. at startup)"""
+        for key in self._partition_positions:
+            self._get_partition(key)
+        return self
+
+    def top_k(self, product: Dict, count: int = 3, price_direction: str = 'any',
+              brands: Optional[List[str]] = None, category: Optional[str] = None,
+              sub_category: Optional[str] = None) -> List[Dict]:
+        """
+        Top-K alternatives for a product from its catalog partition.
+
+        Args:
+            price_direction: 'any', 'cheaper' or 'pricier' relative to the product
+            brands: Optional list of brands to restrict alternatives to
+        """
+        key = (category or product.get('category'), sub_category or product.get('sub_category'))
+        partition = self._get_partition(key)
+        if partition is None:
+            return []
+
+        model = product.get('model_number')
+        selected_price = float(product.get('price', 0) or 0)
+        row = partition['row_by_model'].get(model)
+
+        if row is not None:
+            neighbours = partition['neighbours'][row]
+        else:
+            # Product not in the catalog partition: score it against the partition once
+            neighbours = self._score_external(partition, product)
+
+        brand_filter = {b.lower() for b in brands} if brands else None
+        records = partition['records']
+        prices = partition['prices']
+
+        alternatives = []
+        for idx, score in neighbours:
+            alt = records[idx]
+            if alt.get('model_number') == model:
+                continue
+            price = prices[idx]
+            if price_direction == 'cheaper' and price >= selected_price:
+                continue
+            if price_direction == 'pricier' and price <= selected_price:
+                continue
+            if brand_filter and str(alt.get('brand', '')).lower() not in brand_filter:
+                continue
+
+            alt = dict(alt)
+            alt['similarity_score'] = score
+            alt['price_difference'] = price - selected_price
+            alt['price_difference_pct'] = (alt['price_difference'] / selected_price * 100) if selected_price > 0 else 0
+            alternatives.append(alt)
+            if len(alternatives) >= count:
+                break
+
+        return alternatives
+
+    def partition_brands(self, category: str, sub_category: str) -> List[str]:
+        """Brands available in a partition (for UI filters)"""
+        partition = self._get_partition((category, sub_category))
+        if partition is None:
+            return []
+        return sorted({str(r.get('brand', '')) for r in partition['records'] if r.get('brand')})
+
+    def _get_partition(self, key: Tuple[str, str]) -> Optional[Dict]:
+        if key in self._partitions:
+            return self._partitions[key]
+
+        positions = self._partition_positions.get(key)
+        if positions is None or len(positions) == 0:
+            self._partitions[key] = None
+            return None
+
+        df = self.product_df.iloc[positions]
+        records = df.to_dict('records')
+        texts = [self._product_text(r) for r in records]
+        prices = df['price'].astype(float).to_numpy() if 'price' in df.columns else np.zeros(len(df))
+        quality = (df['data_quality_score'].astype(float).to_numpy() / 100.0
+                   if 'data_quality_score' in df.columns else np.ones(len(df)))
+
+        scores = (TEXT_WEIGHT * self._text_similarity(texts)
+                  + PRICE_WEIGHT * self._price_closeness(prices, prices)
+                  + QUALITY_WEIGHT * quality[np.newaxis, :])
+        np.fill_diagonal(scores, -np.inf)
+
+        # Over-fetch so price/brand filters still leave K results
+        k = min(self.neighbours_per_product, len(records) - 1)
+        neighbours = []
+        for i in range(len(records)):
+            if k <= 0:
+                neighbours.append([])
+                continue
+            top = np.argpartition(-scores[i], k - 1)[:k]
+            top = top[np.argsort(-scores[i][top], kind='stable')]
+            neighbours.append([(int(j), float(scores[i][j])) for j in top])
+
+        row_by_model = {}
+        for i, r in enumerate(records):
+            row_by_model.setdefault(r.get('model_number'), i)
+
+        partition = {
+            'records': records,
+            'texts': texts,
+            'prices': prices,
+            'quality': quality,
+            'neighbours': neighbours,
+            'row_by_model': row_by_model,
+        }
+        self._partitions[key] = partition
+        return partition
+
+    def _score_external(self, partition: Dict, product: Dict) -> List[Tuple[int, float]]:
+        """Rank a partition against a product that isn't part of it"""
+        texts = partition['texts'] + [self._product_text(product)]
+        text_sim = self._text_similarity(texts)[-1, :-1]
+        price = np.array([float(product.get('price', 0) or 0)])
+        scores = (TEXT_WEIGHT * text_sim
+                  + PRICE_WEIGHT * self._price_closeness(price, partition['prices'])[0]
+                  + QUALITY_WEIGHT * partition['quality'])
+        order = np.argsort(-scores, kind='stable')
+        return [(int(j), float(scores[j])) for j in order]
+
+    @staticmethod
+    def _product_text(record: Dict) -> str:
+        specs = record.get('specifications', record.get('full_specifications', ''))
+        return f"{record.get('name', '')} {specs if isinstance(specs, str) else ''}".lower()
+
+    @staticmethod
+    def _text_similarity(texts: List[str]) -> np.ndarray:
+        """Pairwise cosine similarity (TF-IDF), or token Jaccard without scikit-learn"""
+        if SKLEARN_AVAILABLE:
+            try:
+                matrix = TfidfVectorizer(token_pattern=r'[a-z0-9]+').fit_transform(texts)
+                return (matrix @ matrix.T).toarray()
+            except ValueError:  # Empty vocabulary
+                return np.zeros((len(texts), len(texts)))
+
+        tokens = [set(re.findall(r'[a-z0-9]+', t)) for t in texts]
+        n = len(tokens)
+        sim = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i + 1, n):
+                union = len(tokens[i] | tokens[j])
+                if union:
+                    sim[i, j] = sim[j, i] = len(tokens[i] & tokens[j]) / union
+        return sim
+
+    @staticmethod
+    def _price_closeness(prices_a: np.ndarray, prices_b: np.ndarray) -> np.ndarray:
+        """1 at equal price, falling to 0 as the relative difference reaches 100%"""
+        a = prices_a[:, np.newaxis]
+        b = prices_b[np.newaxis, :]
+        denom = np.maximum(np.maximum(a, b), 1e-9)
+        return 1.0 - np.minimum(np.abs(a - b) / denom, 1.0)
@@ -2,15 +2,16 @@
 # COMPLETE AVIXA STANDARDS IMPLEMENTATION
 # Matches the comprehensive guidelines document
 
-import streamlit as st
-import math
-from typing import Dict, List, Any, Tuple
+from typing import Dict
 from components.room_profiles import ROOM_SPECS
+from components.avixa_engine import AVIXAEngine, analyze_room
 
-class AVIXADesigner:
+class AVIXADesigner(AVIXAEngine):
     """
     Complete AVIXA-compliant AV system designer
     Implements ALL standards from avixa_guidelines.md
+    ✅ CONSOLIDATED: Formulas live in components/avixa_engine.py; this class keeps
+    the legacy signatures (room_type arguments) and logging.
     """
     
     def log(self, message: str):
@@ -23,516 +24,26 @@ class AVIXADesigner:
                                       room_type: str = "Standard Conference Room") -> Dict:
         """
         AVIXA DISCAS - Display Image Size for 2D Content
-        Implements Section 1 of AVIXA guidelines with room type awareness
+        room_type is accepted for compatibility; sizing is purely geometric
         """
-        # Maximum viewing distance (85% of room length for furniture clearance)
-        max_viewing_distance = max(room_length, room_width) * 0.85
-        
-        # Content type determines calculation method
-        if content_type == "ADM":  # Analytical Decision Making
-            # Critical detail viewing (engineering drawings, forensic evidence)
-            vertical_resolution = 1080  # Standard 1080p
-            min_image_height = (max_viewing_distance / 3438) * vertical_resolution
-            
-        elif content_type == "BDM":  # Basic Decision Making (presentations)
-            # Standard presentations, readable text
-            element_height_percent = 0.04  # 4% for standard presentations
-            min_image_height = (max_viewing_distance / 200) / element_height_percent
-            
-        else:  # Passive viewing
-            # Digital signage, general content
-            min_image_height = max_viewing_distance / 8
-        
-        # Convert height to diagonal (16:9 aspect ratio)
-        # Diagonal = Height × √(16²+9²) / 9 ≈ Height × 2.22
-        recommended_diagonal = min_image_height * 2.22
-        
-        # Room type constraints (prevent oversizing in small rooms)
-        room_constraints = {
-            'Small Huddle Room': (43, 55),
-            'Medium Huddle Room': (55, 65),
-            'Standard Conference Room': (65, 75),
-            'Large Conference Room': (75, 85),
-            'Executive Boardroom': (85, 98),
-            'Training Room': (75, 85),
-            'Large Training': (85, 98),
-            'Multipurpose': (98, 110)
-        }
-        
-        # Apply constraints
-        min_size, max_size = room_constraints.get(room_type, (55, 98))
-        recommended_diagonal = max(min_size, min(recommended_diagonal, max_size))
-        
-        # Snap to standard display sizes
-        available_sizes = [43, 55, 65, 75, 85, 98, 110, 120]
-        selected_size = min((size for size in available_sizes if size >= recommended_diagonal), 
-                           default=available_sizes[-1])
-        
-        return {
-            'max_viewing_distance_ft': max_viewing_distance,
-            'min_image_height_inches': min_image_height,
-            'recommended_diagonal_inches': recommended_diagonal,
-            'selected_size_inches': selected_size,
-            'content_type': content_type,
-            'calculation_method': 'AVIXA DISCAS'
-        }
-    
-    @staticmethod
-    def validate_viewing_angles(room_width: float, display_width_inches: float, 
-                                seating_rows: int) -> Dict:
-        """
-        AVIXA Viewing Angle Standards - Section 1
-        """
-        display_width_ft = display_width_inches / 12 * 0.871  # 16:9 width conversion
-        
-        # Optimal viewing zone (60% of room width)
-        optimal_viewing_zone = room_width * 0.6
-        
-        # Maximum horizontal offset for 45° viewing angle
-        viewing_distance = room_width * 0.7  # Estimate
-        max_offset = display_width_ft / 2 + math.tan(math.radians(45)) * viewing_distance
-        
-        # Check if all seats are within acceptable angles
-        seats_within_optimal = optimal_viewing_zone >= room_width * 0.8
-        
-        return {
-            'optimal_viewing_zone_ft': optimal_viewing_zone,
-            'max_acceptable_offset_ft': max_offset,
-            'all_seats_acceptable': seats_within_optimal,
-            'horizontal_angle_max_deg': 45,
-            'vertical_angle_max_deg': 30,
-            'compliance_status': 'PASS' if seats_within_optimal else 'REVIEW REQUIRED'
-        }
+        return AVIXAEngine.calculate_display_size_discas(room_length, room_width, content_type)
     
     def calculate_audio_coverage_a102(self, room_area: float, ceiling_height: float, 
                                    room_type: str, occupancy: int = None) -> Dict:
         """
-        ✅ ENHANCED: Now scales with actual occupancy, not just area
         AVIXA A102.01:2017 - Audio Coverage Uniformity
-        Implements Section 2 of guidelines
         """
-        # Base coverage (area-based)
-        if ceiling_height <= 9:
-            coverage_per_speaker = 150
-        elif ceiling_height <= 12:
-            coverage_per_speaker = 200
-        else:
-            coverage_per_speaker = 250
-
-        # Room type adjustment
-        if room_type in ["Conference", "Meeting", "Executive Boardroom"]:
-            coverage_per_speaker *= 0.8  # Tighter coverage for critical listening
-        elif room_type in ["Training", "Classroom"]:
-            coverage_per_speaker *= 0.9
-
-        area_based_speakers = max(2, math.ceil(room_area / coverage_per_speaker))
-
-        # NEW: Occupancy-based validation
-        if occupancy:
-            # AVIXA guideline: 1 speaker per 6-8 people in training/presentation environments
-            if "Training" in room_type or "Presentation" in room_type or "Multipurpose" in room_type:
-                occupancy_based_speakers = max(2, math.ceil(occupancy / 7))
-                
-                # Use the HIGHER of the two calculations
-                speakers_needed = max(area_based_speakers, occupancy_based_speakers)
-                
-                self.log(f"    📊 Area-based: {area_based_speakers} speakers, Occupancy-based: {occupancy_based_speakers} speakers")
-                self.log(f"    ✅ Selected: {speakers_needed} speakers (higher value per AVIXA)")
-            else:
-                speakers_needed = area_based_speakers
-        else:
-            speakers_needed = area_based_speakers
-
-        # Target STI (Speech Transmission Index)
-        target_sti = 0.70 if "Executive" in room_type or "Critical" in room_type else 0.60
-
-        return {
-            'speakers_needed': speakers_needed,
-            'calculation_basis': 'area + occupancy' if occupancy else 'area only',
-            'coverage_per_speaker_sqft': coverage_per_speaker,
-            'target_sti': target_sti,
-            'spl_uniformity_target': '±3 dB (500Hz-4kHz)',
-            'ceiling_height_ft': ceiling_height,
-            'occupancy_validated': bool(occupancy),
-            'standard': 'AVIXA A102.01:2017'
-        }
+        audio_calcs = AVIXAEngine.calculate_audio_coverage_a102(room_area, ceiling_height, room_type, occupancy)
+        self.log(f"    ✅ Selected: {audio_calcs['speakers_needed']} speakers ({audio_calcs['calculation_basis']})")
+        return audio_calcs
     
     @staticmethod
     def calculate_microphone_coverage(room_area: float, table_config: str, 
-                                      room_type: str) -> Dict:
+                                      room_type: str = None) -> Dict:
         """
         AVIXA Microphone Coverage Standards - Section 2
         """
-        if table_config == "round_table":
-            # Boundary/table microphones
-            mic_coverage_area = 80  # sq ft per microphone
-            mic_type = "Table/Boundary Microphone"
-            pickup_pattern = "Cardioid"
-            
-        elif table_config == "conference_table":
-            # Gooseneck or array microphones
-            mic_spacing_ft = 6  # feet between mics
-            # Estimate table length from room area
-            table_length = math.sqrt(room_area) * 0.7
-            mics_needed = max(2, math.ceil(table_length / mic_spacing_ft))
-            
-            return {
-                'mics_needed': mics_needed,
-                'mic_type': "Gooseneck/Array Microphone",
-                'spacing_ft': mic_spacing_ft,
-                'pickup_pattern': "Cardioid/Supercardioid",
-                'coverage_method': 'Linear spacing along table'
-            }
-            
-        else:  # Open floor plan
-            # Ceiling array microphones
-            mic_coverage_area = 150  # sq ft per ceiling mic
-            mic_type = "Ceiling Array Microphone"
-            pickup_pattern = "Omnidirectional (ceiling array)"
-        
-        mics_needed = max(2, math.ceil(room_area / mic_coverage_area))
-        
-        return {
-            'mics_needed': mics_needed,
-            'mic_type': mic_type,
-            'coverage_area_sqft': mic_coverage_area,
-            'pickup_pattern': pickup_pattern,
-            'coverage_method': 'Area-based placement'
-        }
-    
-    @staticmethod
-    def calculate_required_amplifier_power(room_volume: float, target_spl: float, 
-                                          speaker_sensitivity: float = 89) -> Dict:
-        """
-        AVIXA SPL Calculation - Section 2
-        """
-        # Estimate distance to farthest listener
-        room_length = (room_volume / 10) ** (1/3)  # Rough cubic estimate
-        distance_meters = room_length * 0.3048 * 0.85  # 85% of length in meters
-        
-        # Account for room acoustics (absorption/reflection)
-        if room_volume < 5000:
-            acoustic_loss = 3  # dB
-        elif room_volume < 15000:
-            acoustic_loss = 6
-        else:
-            acoustic_loss = 10
-        
-        adjusted_target_spl = target_spl + acoustic_loss
-        
-        # Power calculation: P = 10^((SPL - Sensitivity + 20log(Distance)) / 10)
-        power_watts = 10 ** ((adjusted_target_spl - speaker_sensitivity + 
-                             20 * math.log10(distance_meters)) / 10)
-        
-        # Add 2x headroom (safety factor for dynamic range)
-        recommended_power = power_watts * 2
-        
-        return {
-            'required_power_watts': power_watts,
-            'recommended_power_watts': recommended_power,
-            'target_spl_db': target_spl,
-            'speaker_sensitivity_db': speaker_sensitivity,
-            'acoustic_loss_db': acoustic_loss,
-            'distance_to_farthest_m': distance_meters,
-            'headroom_factor': 2.0
-        }
-    
-    @staticmethod
-    def calculate_network_requirements(room_equipment: Dict) -> Dict:
-        """
-        AVIXA Network Infrastructure Standards - Section 5
-        """
-        total_bandwidth = 0
-        
-        # Video conferencing codec
-        if room_equipment.get("video_codec"):
-            codec_streams = room_equipment.get("cameras", 1) + 1  # +1 for content
-            total_bandwidth += codec_streams * 4  # Mbps per 1080p stream
-        
-        # Networked displays (AV over IP)
-        if room_equipment.get("network_displays"):
-            display_count = room_equipment["network_displays"]
-            total_bandwidth += display_count * 50  # Mbps per 4K display
-        
-        # Control system
-        total_bandwidth += 5  # Mbps for control traffic
-        
-        # Digital signage
-        if room_equipment.get("digital_signage"):
-            total_bandwidth += 10
-        
-        # Calculate switch requirements
-        required_ports = sum([
-            room_equipment.get("cameras", 0),
-            room_equipment.get("displays", 0),
-            room_equipment.get("network_displays", 0),
-            1,  # Codec/processor
-            1,  # Control system
-            2   # Spare ports (20% overhead)
-        ])
-        
-        # Recommend switch tier
-        if total_bandwidth > 500:
-            switch_type = "10GbE Managed Switch"
-        elif total_bandwidth > 100:
-            switch_type = "1GbE Managed Switch with SFP+ uplink"
-        else:
-            switch_type = "1GbE Managed Switch"
-        
-        return {
-            'total_bandwidth_mbps': total_bandwidth,
-            'switch_type': switch_type,
-            'required_ports': required_ports,
-            'recommended_ports': math.ceil(required_ports / 8) * 8,  # Round to 8/16/24/48
-            'poe_required': True,
-            'qos_required': True,
-            'vlan_structure': {
-                'AV_Production': 10,
-                'Video_Conferencing': 20,
-                'Control_Systems': 30,
-                'Management': 99
-            },
-            'standard': 'AVIXA Network Infrastructure Best Practices'
-        }
-    
-    @staticmethod
-    def calculate_power_requirements(boq_items: List[Dict]) -> Dict:
-        """
-        AVIXA Power & Electrical Standards - Section 6
-        """
-        power_ratings = {
-            'Displays': {
-                '43-55': 150,
-                '55-65': 200,
-                '65-75': 300,
-                '75-85': 375,
-                '85-98': 500,
-                '98+': 600
-            },
-            'Video Conferencing': {
-                'codec': 75,
-                'camera_poe': 25,
-                'video_bar': 90
-            },
-            'Audio': {
-                'amplifier_100w': 250,
-                'dsp': 40,
-                'speaker': 60,
-                'mic_poe': 15
-            },
-            'Control Systems': {
-                'processor': 35,
-                'touch_panel': 25
-            },
-            'Infrastructure': {
-                'switch_24port_poe': 300,
-                'switch_48port_poe': 500
-            }
-        }
-        
-        total_watts = 0
-        poe_watts = 0
-        
-        for item in boq_items:
-            category = item.get('category', '')
-            quantity = item.get('quantity', 1)
-            name = item.get('name', '').lower()
-            
-            # Estimate power based on category and name
-            if category == 'Displays':
-                # Extract size from name
-                import re
-                size_match = re.search(r'(\d{2,3})["\']', name)
-                if size_match:
-                    size = int(size_match.group(1))
-                    if size >= 98:
-                        total_watts += 600 * quantity
-                    elif size >= 85:
-                        total_watts += 500 * quantity
-                    elif size >= 75:
-                        total_watts += 375 * quantity
-                    elif size >= 65:
-                        total_watts += 300 * quantity
-                    elif size >= 55:
-                        total_watts += 200 * quantity
-                    else:
-                        total_watts += 150 * quantity
-                else:
-                    total_watts += 200 * quantity  # Default
-                    
-            elif category == 'Audio':
-                if 'amplifier' in name:
-                    total_watts += 250 * quantity
-                elif 'dsp' in name or 'processor' in name:
-                    total_watts += 40 * quantity
-                elif 'speaker' in name:
-                    total_watts += 60 * quantity
-                elif 'microphone' in name and 'poe' in name:
-                    poe_watts += 15 * quantity
-                    
-            elif category == 'Video Conferencing':
-                if 'camera' in name and ('poe' in name or 'ptz' in name):
-                    poe_watts += 25 * quantity
-                elif 'bar' in name or 'video bar' in name:
-                    total_watts += 90 * quantity
-                else:
-                    total_watts += 75 * quantity
-                    
-            elif category == 'Control Systems':
-                if 'touch' in name or 'panel' in name:
-                    poe_watts += 25 * quantity
-                else:
-                    total_watts += 35 * quantity
-                    
-            elif category == 'Infrastructure':
-                if 'switch' in name:
-                    if '48' in name:
-                        total_watts += 500 * quantity
-                    else:
-                        total_watts += 300 * quantity
-        
-        # Add 20% safety factor
-        total_watts *= 1.2
-        poe_watts *= 1.2
-        
-        # Calculate circuit requirements (120V systems)
-        required_amps = total_watts / 120
-        
-        # Determine circuit rating and count
-        if required_amps > 30:
-            recommended_circuits = math.ceil(required_amps / 20)
-            circuit_rating = "20A"
-        else:
-            recommended_circuits = math.ceil(required_amps / 15)
-            circuit_rating = "15A"
-        
-        # UPS recommendation
-        ups_recommended = total_watts > 500
-        ups_capacity_va = total_watts * 1.4 if ups_recommended else 0
-        
-        return {
-            'total_watts': total_watts,
-            'poe_watts': poe_watts,
-            'total_amps': required_amps,
-            'recommended_circuits': recommended_circuits,
-            'circuit_rating': circuit_rating,
-            'ups_recommended': ups_recommended,
-            'ups_capacity_va': ups_capacity_va,
-            'safety_factor': 1.2,
-            'standard': 'NEC Article 647 (AVIXA compliance)'
-        }
-    
-    @staticmethod
-    def recommend_acoustic_treatment(room_volume: float, rt60_measured: float, 
-                                     room_type: str) -> Dict:
-        """
-        AVIXA Acoustic Treatment Standards - Section 3
-        """
-        # Target RT60 by room type
-        target_rt60 = {
-            "Conference": 0.5,
-            "Training": 0.6,
-            "Boardroom": 0.4,
-            "Auditorium": 1.0,
-            "Multipurpose": 0.7
-        }.get(room_type, 0.6)
-        
-        # Determine treatment level
-        if rt60_measured > target_rt60 * 1.5:
-            # Heavy treatment needed
-            panel_coverage = room_volume / 100  # sq ft of panels
-            return {
-                'treatment_level': 'Heavy',
-                'panel_area_sqft': panel_coverage,
-                'panel_nrc': 0.85,  # High absorption
-                'locations': ['ceiling', 'rear_wall', 'side_walls'],
-                'target_rt60': target_rt60,
-                'measured_rt60': rt60_measured,
-                'compliance_status': 'NON-COMPLIANT - Treatment Required'
-            }
-            
-        elif rt60_measured > target_rt60 * 1.2:
-            # Moderate treatment
-            panel_coverage = room_volume / 150
-            return {
-                'treatment_level': 'Moderate',
-                'panel_area_sqft': panel_coverage,
-                'panel_nrc': 0.70,
-                'locations': ['rear_wall', 'side_walls'],
-                'target_rt60': target_rt60,
-                'measured_rt60': rt60_measured,
-                'compliance_status': 'MARGINAL - Treatment Recommended'
-            }
-        
-        # Minimal or no treatment needed
-        return {
-            'treatment_level': 'Minimal',
-            'panel_area_sqft': 0,
-            'target_rt60': target_rt60,
-            'measured_rt60': rt60_measured,
-            'compliance_status': 'COMPLIANT'
-        }
-    
-    @staticmethod
-    def calculate_cable_requirements(room_dimensions: Tuple[float, float, float],
-                                     equipment_locations: Dict) -> Dict:
-        """
-        AVIXA Cabling Standards - Section 7
-        """
-        length, width, height = room_dimensions
-        
-        # Estimate cable runs
-        # Typical run: From rack to furthest equipment + 20% slack + vertical runs
-        max_horizontal = math.sqrt(length**2 + width**2)  # Diagonal
-        vertical_run = height * 2  # Up and down
-        average_run = (max_horizontal + vertical_run) * 1.2  # 20% slack
-        
-        # Cable types needed
-        cable_requirements = {
-            'cat6a': {
-                'runs': equipment_locations.get('network_devices', 0) + 
-                       equipment_locations.get('cameras', 0) +
-                       equipment_locations.get('control_panels', 0),
-                'length_per_run_ft': average_run,
-                'total_length_ft': 0,
-                'purpose': 'Network, PoE, Control'
-            },
-            'hdmi_hdbaset': {
-                'runs': equipment_locations.get('displays', 0),
-                'length_per_run_ft': average_run,
-                'total_length_ft': 0,
-                'purpose': 'Video distribution'
-            },
-            'xlr_audio': {
-                'runs': equipment_locations.get('microphones', 0),
-                'length_per_run_ft': average_run * 0.8,  # Usually shorter
-                'total_length_ft': 0,
-                'purpose': 'Balanced audio'
-            },
-            'speaker_cable': {
-                'runs': equipment_locations.get('speakers', 0),
-                'length_per_run_ft': average_run * 0.7,
-                'total_length_ft': 0,
-                'purpose': 'Speaker connections'
-            },
-            'power': {
-                'runs': 2,  # Dedicated circuits
-                'length_per_run_ft': average_run,
-                'total_length_ft': 0,
-                'purpose': 'Dedicated power'
-            }
-        }
-        
-        # Calculate total lengths
-        for cable_type, specs in cable_requirements.items():
-            specs['total_length_ft'] = specs['runs'] * specs['length_per_run_ft']
-        
-        return {
-            'cable_requirements': cable_requirements,
-            'conduit_size_recommended': '1.5"' if sum(s['runs'] for s in cable_requirements.values()) < 10 else '2"',
-            'total_cable_runs': sum(s['runs'] for s in cable_requirements.values()),
-            'labeling_standard': 'AVIXA CLAS (Cable Labeling and Administration Standard)'
-        }
+        return AVIXAEngine.calculate_microphone_coverage(room_area, table_config)
 
 
 # ==============================================================================
@@ -550,34 +61,15 @@ def calculate_avixa_recommendations(length: float, width: float, ceiling_height:
     area = length * width
     volume = area * ceiling_height
     
-    # Display sizing (DISCAS)
-    display_calcs = designer.calculate_display_size_discas(
-        length, width, content_type="BDM", room_type=room_type
-    )
-    
-    # Audio coverage (A102.01)
-    # Get occupancy from room profile to pass to the enhanced function
-    occupancy = ROOM_SPECS.get(room_type, {}).get('capacity_max')
-    audio_calcs = designer.calculate_audio_coverage_a102(
-        area, ceiling_height, room_type, occupancy
-    )
-    
-    # Microphone coverage
-    table_config = "conference_table" if area < 800 else "conference_table"
-    mic_calcs = designer.calculate_microphone_coverage(
-        area, table_config, room_type
-    )
-    
-    # SPL requirements
-    target_spl = 75  # Standard for conference rooms
-    spl_calcs = designer.calculate_required_amplifier_power(
-        volume, target_spl
-    )
-    
-    # Viewing angles
-    viewing_calcs = designer.validate_viewing_angles(
-        width, display_calcs['selected_size_inches'], seating_rows=2
-    )
+    # Display, audio, microphones, SPL and viewing angles (memoized per room geometry)
+    capacity = ROOM_SPECS.get(room_type, {}).get('capacity')
+    occupancy = capacity[1] if capacity else None
+    core_calcs = analyze_room(length, width, ceiling_height, room_type, occupancy, content_type="BDM")
+    display_calcs = core_calcs['display']
+    audio_calcs = core_calcs['audio']
+    mic_calcs = core_calcs['microphones']
+    spl_calcs = core_calcs['spl']
+    viewing_calcs = core_calcs['viewing_angles']
     
     # Network requirements (basic estimate)
     network_reqs = designer.calculate_network_requirements({
@@ -0,0 +1,519 @@
+# components/avixa_engine.py
+"""
+AVIXA Engine - single source of truth for AVIXA formulas
+Per-room results are memoized on room geometry so repeat generations reuse them
+"""
+
+import copy
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from components.boq_columns import BOQColumns
+
+
+class AVIXAEngine:
+    """
+    Canonical implementation of ALL AVIXA calculations from guidelines document.
+    EnhancedAVIXACalculator and AVIXADesigner both delegate here.
+    """
+    
+    @staticmethod
+    def calculate_display_size_discas(room_length: float, room_width: float, content_type: str = "BDM") -> Dict:
+        """
+        AVIXA DISCAS - Display Image Size for 2D Content
+        Section 1 of guidelines
+        """
+        # Maximum viewing distance (85% of room length for furniture)
+        max_viewing_distance = max(room_length, room_width) * 0.85
+        
+        if content_type == "ADM":  # Analytical Decision Making
+            # Formula: Image Height = (Farthest Viewer Distance ÷ 3438) × Vertical Resolution
+            min_image_height = (max_viewing_distance / 3438) * 1080  # Assuming 1080p
+            
+        elif content_type == "BDM":  # Basic Decision Making (presentations)
+            # Formula: Image Height = (Farthest Viewer Distance ÷ 200) ÷ Element Height %
+            element_height_percent = 0.04  # 4% for standard presentations
+            min_image_height = (max_viewing_distance / 200) / element_height_percent
+            
+        else:  # Passive viewing
+            # Formula: Image Height = Viewing Distance ÷ 8
+            min_image_height = max_viewing_distance / 8
+        
+        # Convert to diagonal (16:9 aspect ratio)
+        recommended_diagonal = min_image_height * 2.22
+        
+        # Snap to available sizes
+        available_sizes = [43, 55, 65, 75, 85, 98]
+        selected_size = min((size for size in available_sizes if size >= recommended_diagonal), default=98)
+        
+        return {
+            'max_viewing_distance_ft': max_viewing_distance,
+            'min_image_height_inches': min_image_height,
+            'recommended_diagonal_inches': recommended_diagonal,
+            'selected_size_inches': selected_size,
+            'content_type': content_type
+        }
+    
+    @staticmethod
+    def validate_viewing_angles(room_width: float, display_width_inches: float, seating_rows: int) -> Dict:
+        """
+        AVIXA Viewing Angle Standards
+        Section 1 of guidelines
+        """
+        display_width_ft = display_width_inches / 12 * 0.871  # 16:9 conversion
+        
+        # Calculate horizontal viewing angles
+        optimal_viewing_zone = room_width * 0.6  # 60% of room width
+        
+        # Maximum offset for 45° viewing angle
+        max_offset = display_width_ft / 2 + math.tan(math.radians(45)) * 10  # Assuming 10ft viewing distance
+        
+        seats_within_optimal = optimal_viewing_zone >= room_width * 0.8
+        
+        return {
+            'optimal_viewing_zone_ft': optimal_viewing_zone,
+            'max_acceptable_offset_ft': max_offset,
+            'all_seats_acceptable': seats_within_optimal,
+            'horizontal_angle_max': 45,
+            'vertical_angle_max': 30
+        }
+    
+    @staticmethod
+    def calculate_audio_coverage_a102(room_area: float, ceiling_height: float, 
+                                       room_type: str, occupancy: int = None) -> Dict:
+        """
+        ENHANCED: Now scales with actual occupancy, not just area
+        AVIXA A102.01:2017 - Audio Coverage Uniformity
+        Section 2 of guidelines
+        """
+        # Base coverage (area-based)
+        if ceiling_height <= 9:
+            coverage_per_speaker = 150
+        elif ceiling_height <= 12:
+            coverage_per_speaker = 200
+        else:
+            coverage_per_speaker = 250
+
+        # Room type adjustment
+        if room_type in ["Conference", "Meeting"]:
+            coverage_per_speaker *= 0.8
+        elif room_type in ["Training", "Classroom"]:
+            coverage_per_speaker *= 0.9
+
+        area_based_speakers = max(2, math.ceil(room_area / coverage_per_speaker))
+
+        # NEW: Occupancy-based validation
+        if occupancy:
+            # AVIXA guideline: 1 speaker per 6-8 people in training/presentation environments
+            if "Training" in room_type or "Presentation" in room_type:
+                occupancy_based_speakers = max(2, math.ceil(occupancy / 7))
+                
+                # Use the HIGHER of the two calculations
+                speakers_needed = max(area_based_speakers, occupancy_based_speakers)
+            else:
+                speakers_needed = area_based_speakers
+        else:
+            speakers_needed = area_based_speakers
+
+        # Target STI
+        target_sti = 0.70 if "Executive" in room_type or "Critical" in room_type else 0.60
+
+        return {
+            'speakers_needed': speakers_needed,
+            'calculation_basis': 'area + occupancy' if occupancy else 'area only',
+            'coverage_per_speaker_sqft': coverage_per_speaker,
+            'target_sti': target_sti,
+            'spl_uniformity_target': '±3 dB (500Hz-4kHz)',
+            'ceiling_height_ft': ceiling_height
+        }
+
+    @staticmethod
+    def calculate_microphone_coverage(room_area: float, table_config: str) -> Dict:
+        """
+        AVIXA Microphone Coverage Standards
+        Section 2 of guidelines
+        """
+        if table_config == "round_table":
+            mic_coverage_area = 80  # sq ft per microphone
+            mic_type = "Table/Boundary Microphone"
+            
+        elif table_config == "conference_table":
+            mic_spacing_ft = 6  # feet between mics
+            table_length = math.sqrt(room_area) * 0.7  # Estimate
+            mics_needed = max(2, math.ceil(table_length / mic_spacing_ft))
+            return {
+                'mics_needed': mics_needed,
+                'mic_type': "Gooseneck/Array Microphone",
+                'spacing_ft': mic_spacing_ft,
+                'pickup_pattern': "Cardioid/Supercardioid"
+            }
+            
+        else:  # Open floor plan
+            mic_coverage_area = 150  # sq ft per ceiling mic
+            mic_type = "Ceiling Array Microphone"
+        
+        mics_needed = max(2, math.ceil(room_area / mic_coverage_area))
+        
+        return {
+            'mics_needed': mics_needed,
+            'mic_type': mic_type,
+            'coverage_area_sqft': mic_coverage_area,
+            'pickup_pattern': 'Omnidirectional (ceiling)' if 'Ceiling' in mic_type else 'Cardioid'
+        }
+    
+    @staticmethod
+    def calculate_required_amplifier_power(room_volume: float, target_spl: float, speaker_sensitivity: float = 89) -> Dict:
+        """
+        AVIXA SPL Calculation
+        Section 2 of guidelines
+        """
+        # Distance to farthest listener (estimate)
+        room_length = (room_volume / 10) ** (1/3)  # Rough estimate
+        distance_meters = room_length * 0.3048 * 0.85
+        
+        # Account for room acoustics
+        if room_volume < 5000:
+            acoustic_loss = 3  # dB
+        elif room_volume < 15000:
+            acoustic_loss = 6
+        else:
+            acoustic_loss = 10
+        
+        adjusted_target_spl = target_spl + acoustic_loss
+        
+        # Power calculation
+        power_watts = 10 ** ((adjusted_target_spl - speaker_sensitivity + 20 * math.log10(distance_meters)) / 10)
+        
+        # Add headroom (safety factor)
+        recommended_power = power_watts * 2
+        
+        return {
+            'required_power_watts': power_watts,
+            'recommended_power_watts': recommended_power,
+            'target_spl_db': target_spl,
+            'speaker_sensitivity_db': speaker_sensitivity,
+            'acoustic_loss_db': acoustic_loss
+        }
+    
+    @staticmethod
+    def calculate_network_requirements(room_equipment: Dict) -> Dict:
+        """
+        AVIXA Network Infrastructure Standards
+        Section 5 of guidelines
+        """
+        total_bandwidth = 0
+        
+        # Video conferencing codec
+        if room_equipment.get("video_codec"):
+            codec_streams = room_equipment.get("cameras", 1) + 1  # +1 for content
+            total_bandwidth += codec_streams * 4  # Mbps per 1080p stream
+        
+        # Networked displays (AV over IP)
+        if room_equipment.get("network_displays"):
+            display_count = room_equipment["network_displays"]
+            total_bandwidth += display_count * 50  # Mbps per 4K display
+        
+        # Control system
+        total_bandwidth += 5  # Mbps for control traffic
+        
+        # Digital signage
+        if room_equipment.get("digital_signage"):
+            total_bandwidth += 10
+        
+        # Calculate switch requirements
+        required_ports = sum([
+            room_equipment.get("cameras", 0),
+            room_equipment.get("displays", 0),
+            room_equipment.get("network_displays", 0),
+            1,  # Codec/processor
+            1,  # Control system
+            2   # Spare ports
+        ])
+        
+        # Recommend switch tier
+        if total_bandwidth > 500:
+            switch_type = "10GbE Managed Switch"
+        elif total_bandwidth > 100:
+            switch_type = "1GbE Managed Switch with SFP+ uplink"
+        else:
+            switch_type = "1GbE Managed Switch"
+        
+        return {
+            'total_bandwidth_mbps': total_bandwidth,
+            'switch_type': switch_type,
+            'required_ports': required_ports,
+            'recommended_ports': math.ceil(required_ports / 8) * 8,
+            'poe_required': True,
+            'qos_required': True,
+            'vlan_structure': {
+                'AV_Production': 10,
+                'Video_Conferencing': 20,
+                'Control_Systems': 30
+            }
+        }
+    
+    @staticmethod
+    def calculate_power_requirements(boq_items: List[Dict]) -> Dict:
+        """
+        AVIXA Power & Electrical Standards
+        Section 6 of guidelines
+        """
+        total_watts = 0
+        poe_watts = 0
+        
+        # Estimate power per role (BOQ accepted as a list or a prebuilt BOQColumns view)
+        columns = BOQColumns.of(boq_items)
+        for i in columns.role_indices['display']:
+            size = columns.size[i]
+            if size >= 98:
+                total_watts += 600 * columns.quantity[i]
+            elif size >= 75:
+                total_watts += 375 * columns.quantity[i]
+            else:
+                total_watts += 200 * columns.quantity[i]
+        for i in columns.role_indices['audio_amplifier']:
+            total_watts += 250 * columns.quantity[i]
+        for i in columns.role_indices['audio_dsp']:
+            total_watts += 40 * columns.quantity[i]
+        for i in columns.role_indices['vc_camera']:
+            poe_watts += 25 * columns.quantity[i]
+        for i in columns.role_indices['vc_device']:
+            total_watts += 75 * columns.quantity[i]
+        
+        # Add 20% safety factor
+        total_watts *= 1.2
+        poe_watts *= 1.2
+        
+        # Calculate circuit requirements (120V systems)
+        required_amps = total_watts / 120
+        recommended_circuits = math.ceil(required_amps / 15)  # 15A circuits
+        
+        if required_amps > 30:
+            recommended_circuits = math.ceil(required_amps / 20)
+            circuit_rating = "20A"
+        else:
+            circuit_rating = "15A"
+        
+        return {
+            'total_watts': total_watts,
+            'poe_watts': poe_watts,
+            'total_amps': required_amps,
+            'recommended_circuits': recommended_circuits,
+            'circuit_rating': circuit_rating,
+            'ups_recommended': total_watts > 500,
+            'ups_capacity_va': total_watts * 1.4 if total_watts > 500 else 0
+        }
+    
+    @staticmethod
+    def recommend_acoustic_treatment(room_volume: float, rt60_measured: float, room_type: str) -> Dict:
+        """
+        AVIXA Acoustic Treatment Standards
+        Section 3 of guidelines
+        """
+        target_rt60 = {
+            "Conference": 0.5,
+            "Training": 0.6,
+            "Boardroom": 0.4,
+            "Auditorium": 1.0
+        }.get(room_type, 0.6)
+        
+        if rt60_measured > target_rt60 * 1.5:
+            panel_coverage = room_volume / 100
+            return {
+                'treatment_level': 'Heavy',
+                'panel_area_sqft': panel_coverage,
+                'panel_nrc': 0.85,
+                'locations': ['ceiling', 'rear_wall', 'side_walls']
+            }
+            
+        elif rt60_measured > target_rt60 * 1.2:
+            panel_coverage = room_volume / 150
+            return {
+                'treatment_level': 'Moderate',
+                'panel_area_sqft': panel_coverage,
+                'panel_nrc': 0.70,
+                'locations': ['rear_wall', 'side_walls']
+            }
+        
+        return {'treatment_level': 'Minimal', 'panel_area_sqft': 0}
+    
+    @staticmethod
+    def calculate_cable_requirements(room_dimensions: Tuple[float, float, float],
+                                     equipment_locations: Dict) -> Dict:
+        """
+        AVIXA Cabling Standards - Section 7
+        """
+        length, width, height = room_dimensions
+        
+        # Estimate cable runs
+        # Typical run: From rack to furthest equipment + 20% slack + vertical runs
+        max_horizontal = math.sqrt(length**2 + width**2)  # Diagonal
+        vertical_run = height * 2  # Up and down
+        average_run = (max_horizontal + vertical_run) * 1.2  # 20% slack
+        
+        # Cable types needed
+        cable_requirements = {
+            'cat6a': {
+                'runs': equipment_locations.get('network_devices', 0) + 
+                       equipment_locations.get('cameras', 0) +
+                       equipment_locations.get('control_panels', 0),
+                'length_per_run_ft': average_run,
+                'total_length_ft': 0,
+                'purpose': 'Network, PoE, Control'
+            },
+            'hdmi_hdbaset': {
+                'runs': equipment_locations.get('displays', 0),
+                'length_per_run_ft': average_run,
+                'total_length_ft': 0,
+                'purpose': 'Video distribution'
+            },
+            'xlr_audio': {
+                'runs': equipment_locations.get('microphones', 0),
+                'length_per_run_ft': average_run * 0.8,  # Usually shorter
+                'total_length_ft': 0,
+                'purpose': 'Balanced audio'
+            },
+            'speaker_cable': {
+                'runs': equipment_locations.get('speakers', 0),
+                'length_per_run_ft': average_run * 0.7,
+                'total_length_ft': 0,
+                'purpose': 'Speaker connections'
+            },
+            'power': {
+                'runs': 2,  # Dedicated circuits
+                'length_per_run_ft': average_run,
+                'total_length_ft': 0,
+                'purpose': 'Dedicated power'
+            }
+        }
+        
+        # Calculate total lengths
+        for cable_type, specs in cable_requirements.items():
+            specs['total_length_ft'] = specs['runs'] * specs['length_per_run_ft']
+        
+        return {
+            'cable_requirements': cable_requirements,
+            'conduit_size_recommended': '1.5"' if sum(s['runs'] for s in cable_requirements.values()) < 10 else '2"',
+            'total_cable_runs': sum(s['runs'] for s in cable_requirements.values()),
+            'labeling_standard': 'AVIXA CLAS (Cable Labeling and Administration Standard)'
+        }
+
+# ==============================================================================
+# MEMOIZED ROOM ANALYSIS
+# ==============================================================================
+
+_ROOM_CACHE_MAXSIZE = 1024
+_room_cache = OrderedDict()
+_room_cache_lock = threading.Lock()
+_room_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _room_key(length, width, height, room_type, occupancy, content_type) -> Tuple:
+    return (float(length), float(width), float(height), room_type, occupancy or None, content_type)
+
+
+def _cache_get(key):
+    with _room_cache_lock:
+        result = _room_cache.get(key)
+        if result is not None:
+            _room_cache.move_to_end(key)
+            _room_cache_stats['hits'] += 1
+        else:
+            _room_cache_stats['misses'] += 1
+        return result
+
+
+def _cache_put(key, result):
+    with _room_cache_lock:
+        _room_cache[key] = result
+        _room_cache.move_to_end(key)
+        while len(_room_cache) > _ROOM_CACHE_MAXSIZE:
+            _room_cache.popitem(last=False)
+
+
+def _compute_room(length, width, height, room_type, occupancy, content_type) -> Dict:
+    area = length * width
+    volume = area * height
+    display_calcs = AVIXAEngine.calculate_display_size_discas(length, width, content_type=content_type)
+    return {
+        'display': display_calcs,
+        'audio': AVIXAEngine.calculate_audio_coverage_a102(area, height, room_type, occupancy),
+        'microphones': AVIXAEngine.calculate_microphone_coverage(area, "conference_table"),
+        'spl': AVIXAEngine.calculate_required_amplifier_power(volume, 75),
+        'viewing_angles': AVIXAEngine.validate_viewing_angles(
+            width, display_calcs['selected_size_inches'], seating_rows=2
+        ),
+        'room_area': area,
+        'room_volume': volume
+    }
+
+
+def analyze_room(length: float, width: float, height: float, room_type: str,
+                 occupancy: Optional[int] = None, content_type: str = "BDM") -> Dict:
+    """
+    Core AVIXA analysis for one room (display, audio, microphones, spl,
+    viewing_angles at the DISCAS size, room_area, room_volume).
+    Memoized on (length, width, height, room_type, occupancy, content_type);
+    returns a copy the caller may modify.
+    """
+    key = _room_key(length, width, height, room_type, occupancy, content_type)
+    result = _cache_get(key)
+    if result is None:
+        result = _compute_room(float(length), float(width), float(height), room_type, occupancy, content_type)
+        _cache_put(key, result)
+    return copy.deepcopy(result)
+
+
+def analyze_rooms(rooms: List[Dict], content_type: str = "BDM") -> List[Dict]:
+    """
+    Batch version of analyze_room. Rooms are dicts with length, width, height,
+    room_type and optional occupancy. Cache misses are computed together with the
+    vectorized kernel and stored in the same memo cache.
+    """
+    keys = [
+        _room_key(r['length'], r['width'], r['height'], r['room_type'], r.get('occupancy'), content_type)
+        for r in rooms
+    ]
+    results = {}
+    missing = []
+    for key in keys:
+        if key in results:
+            continue
+        cached = _cache_get(key)
+        if cached is not None:
+            results[key] = cached
+        else:
+            results[key] = None
+            missing.append(key)
+
+    if missing:
+        try:
+            from components.avixa_kernel import calculate_avixa_batch, batch_row_to_calcs
+            batch = calculate_avixa_batch(
+                [k[0] for k in missing], [k[1] for k in missing], [k[2] for k in missing],
+                [k[3] for k in missing], [k[4] for k in missing], content_type=content_type
+            )
+            computed = [batch_row_to_calcs(batch, i, content_type=content_type) for i in range(len(missing))]
+        except ImportError:
+            # NumPy unavailable - fall back to the scalar formulas
+            computed = [_compute_room(*key) for key in missing]
+        for key, result in zip(missing, computed):
+            _cache_put(key, result)
+            results[key] = result
+
+    return [copy.deepcopy(results[key]) for key in keys]
+
+
+def get_cache_info() -> Dict[str, int]:
+    """Memo cache statistics"""
+    with _room_cache_lock:
+        return {'size': len(_room_cache), 'maxsize': _ROOM_CACHE_MAXSIZE, **_room_cache_stats}
+
+
+def clear_cache():
+    """Drop all memoized room analyses"""
+    with _room_cache_lock:
+        _room_cache.clear()
+        _room_cache_stats.update(hits=0, misses=0)
@@ -0,0 +1,201 @@
+# components/avixa_kernel.py
+"""
+Vectorized AVIXA Calculation Kernel
+Computes DISCAS display sizing, A102.01 speaker counts, microphone coverage,
+SPL/amplifier power and viewing angles for many rooms in one call.
+
+Results match AVIXAEngine (avixa_engine.py) exactly (same operations in the same
+order). Transcendental functions (pow, log10) go through libm via the math
+module, because NumPy's SIMD/SVML loops can differ from it by an ULP.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+AVAILABLE_DISPLAY_SIZES = np.array([43, 55, 65, 75, 85, 98])
+VIEWING_OFFSET_10FT = math.tan(math.radians(45)) * 10  # 45° offset at an assumed 10ft distance
+
+
+def _libm(func, values: np.ndarray) -> np.ndarray:
+    """Apply a math-module function elementwise (bit-identical to the scalar path)"""
+    return np.fromiter(map(func, values.tolist()), dtype=float, count=len(values))
+
+
+def _room_type_flags(room_types: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Evaluate the room-type string rules once per distinct room type"""
+    unique_types, inverse = np.unique(np.asarray(room_types, dtype=object).astype(str), return_inverse=True)
+    rules = {
+        'conference_exact': lambda t: t in ["Conference", "Meeting"],
+        'training_exact': lambda t: t in ["Training", "Classroom"],
+        'occupancy_rule': lambda t: "Training" in t or "Presentation" in t,
+        'critical_sti': lambda t: "Executive" in t or "Critical" in t,
+    }
+    return {
+        name: np.array([rule(t) for t in unique_types], dtype=bool)[inverse]
+        for name, rule in rules.items()
+    }
+
+
+def calculate_avixa_batch(lengths, widths, ceiling_heights, room_types: Sequence[str],
+                          occupancies: Optional[Sequence[Optional[int]]] = None,
+                          areas=None, volumes=None, display_sizes=None,
+                          content_type: str = "BDM", table_config: str = "conference_table",
+                          target_spl: float = 75, speaker_sensitivity: float = 89) -> Dict[str, np.ndarray]:
+    """
+    Columnar AVIXA calculations for a batch of rooms.
+
+    Args:
+        lengths, widths, ceiling_heights: Room dimensions in feet (array-like)
+        room_types: Room type names (ROOM_SPECS keys)
+        occupancies: Seating capacity per room (None/0 = area-only audio sizing)
+        areas, volumes: Override area/volume (default length × width, area × height)
+        display_sizes: Display size used for viewing angles (default: DISCAS selection)
+
+    Returns:
+        Dict of arrays, one entry per room
+    """
+    length = np.asarray(lengths, dtype=float)
+    width = np.asarray(widths, dtype=float)
+    height = np.asarray(ceiling_heights, dtype=float)
+    n = len(length)
+    area = np.asarray(areas, dtype=float) if areas is not None else length * width
+    volume = np.asarray(volumes, dtype=float) if volumes is not None else area * height
+    occupancy = np.array([o or 0 for o in occupancies], dtype=float) if occupancies is not None else np.zeros(n)
+    flags = _room_type_flags(room_types)
+
+    # === DISCAS display sizing ===
+    max_viewing_distance = np.maximum(length, width) * 0.85
+    if content_type == "ADM":
+        min_image_height = (max_viewing_distance / 3438) * 1080
+    elif content_type == "BDM":
+        min_image_height = (max_viewing_distance / 200) / 0.04
+    else:
+        min_image_height = max_viewing_distance / 8
+    recommended_diagonal = min_image_height * 2.22
+    size_idx = np.searchsorted(AVAILABLE_DISPLAY_SIZES, recommended_diagonal, side='left')
+    selected_size = np.where(
+        size_idx < len(AVAILABLE_DISPLAY_SIZES),
+        AVAILABLE_DISPLAY_SIZES[np.minimum(size_idx, len(AVAILABLE_DISPLAY_SIZES) - 1)],
+        AVAILABLE_DISPLAY_SIZES[-1]
+    )
+
+    # === A102.01 audio coverage ===
+    coverage = np.where(height <= 9, 150.0, np.where(height <= 12, 200.0, 250.0))
+    coverage = np.where(flags['conference_exact'], coverage * 0.8,
+                        np.where(flags['training_exact'], coverage * 0.9, coverage))
+    area_based_speakers = np.maximum(2, np.ceil(area / coverage)).astype(int)
+    occupancy_based_speakers = np.maximum(2, np.ceil(occupancy / 7)).astype(int)
+    use_occupancy = (occupancy != 0) & flags['occupancy_rule']
+    speakers_needed = np.where(use_occupancy,
+                               np.maximum(area_based_speakers, occupancy_based_speakers),
+                               area_based_speakers)
+    target_sti = np.where(flags['critical_sti'], 0.70, 0.60)
+
+    # === Microphone coverage ===
+    if table_config == "conference_table":
+        mics_needed = np.maximum(2, np.ceil(np.sqrt(area) * 0.7 / 6)).astype(int)
+    else:
+        mic_coverage_area = 80 if table_config == "round_table" else 150
+        mics_needed = np.maximum(2, np.ceil(area / mic_coverage_area)).astype(int)
+
+    # === SPL / amplifier power ===
+    estimated_length = _libm(lambda v: v ** (1 / 3), volume / 10)
+    distance_meters = estimated_length * 0.3048 * 0.85
+    acoustic_loss = np.where(volume < 5000, 3, np.where(volume < 15000, 6, 10))
+    adjusted_target_spl = target_spl + acoustic_loss
+    exponent = (adjusted_target_spl - speaker_sensitivity + 20 * _libm(math.log10, distance_meters)) / 10
+    power_watts = _libm(lambda v: 10 ** v, exponent)
+    recommended_power = power_watts * 2
+
+    # === Viewing angles ===
+    display_for_viewing = np.asarray(display_sizes, dtype=float) if display_sizes is not None else selected_size
+    display_width_ft = display_for_viewing / 12 * 0.871
+    optimal_viewing_zone = width * 0.6
+    max_offset = display_width_ft / 2 + VIEWING_OFFSET_10FT
+
+    return {
+        'room_area': area,
+        'room_volume': volume,
+        'max_viewing_distance_ft': max_viewing_distance,
+        'min_image_height_inches': min_image_height,
+        'recommended_diagonal_inches': recommended_diagonal,
+        'selected_size_inches': selected_size,
+        'speakers_needed': speakers_needed,
+        'coverage_per_speaker_sqft': coverage,
+        'occupancy': occupancy,
+        'target_sti': target_sti,
+        'mics_needed': mics_needed,
+        'required_power_watts': power_watts,
+        'recommended_power_watts': recommended_power,
+        'acoustic_loss_db': acoustic_loss,
+        'optimal_viewing_zone_ft': optimal_viewing_zone,
+        'max_acceptable_offset_ft': max_offset,
+        'all_seats_acceptable': optimal_viewing_zone >= width * 0.8,
+        'ceiling_height_ft': height,
+    }
+
+
+def batch_row_to_calcs(batch: Dict[str, np.ndarray], i: int, content_type: str = "BDM",
+                       table_config: str = "conference_table", target_spl: float = 75,
+                       speaker_sensitivity: float = 89) -> Dict:
+    """
+    Rebuild the nested per-room dict (same shape as context.avixa_calculations)
+    for row i of a batch result.
+    """
+    if table_config == "conference_table":
+        mic_calcs = {
+            'mics_needed': int(batch['mics_needed'][i]),
+            'mic_type': "Gooseneck/Array Microphone",
+            'spacing_ft': 6,
+            'pickup_pattern': "Cardioid/Supercardioid"
+        }
+    else:
+        mic_type = "Table/Boundary Microphone" if table_config == "round_table" else "Ceiling Array Microphone"
+        mic_calcs = {
+            'mics_needed': int(batch['mics_needed'][i]),
+            'mic_type': mic_type,
+            'coverage_area_sqft': 80 if table_config == "round_table" else 150,
+            'pickup_pattern': 'Omnidirectional (ceiling)' if 'Ceiling' in mic_type else 'Cardioid'
+        }
+
+    return {
+        'display': {
+            'max_viewing_distance_ft': float(batch['max_viewing_distance_ft'][i]),
+            'min_image_height_inches': float(batch['min_image_height_inches'][i]),
+            'recommended_diagonal_inches': float(batch['recommended_diagonal_inches'][i]),
+            'selected_size_inches': int(batch['selected_size_inches'][i]),
+            'content_type': content_type
+        },
+        'audio': {
+            'speakers_needed': int(batch['speakers_needed'][i]),
+            'calculation_basis': 'area + occupancy' if batch['occupancy'][i] else 'area only',
+            'coverage_per_speaker_sqft': float(batch['coverage_per_speaker_sqft'][i]),
+            'target_sti': float(batch['target_sti'][i]),
+            'spl_uniformity_target': '±3 dB (500Hz-4kHz)',
+            'ceiling_height_ft': float(batch['ceiling_height_ft'][i])
+        },
+        'microphones': mic_calcs,
+        'spl': {
+            'required_power_watts': float(batch['required_power_watts'][i]),
+            'recommended_power_watts': float(batch['recommended_power_watts'][i]),
+            'target_spl_db': target_spl,
+            'speaker_sensitivity_db': speaker_sensitivity,
+            'acoustic_loss_db': int(batch['acoustic_loss_db'][i])
+        },
+        'viewing_angles': {
+            'optimal_viewing_zone_ft': float(batch['optimal_viewing_zone_ft'][i]),
+            'max_acceptable_offset_ft': float(batch['max_acceptable_offset_ft'][i]),
+            'all_seats_acceptable': bool(batch['all_seats_acceptable'][i]),
+            'horizontal_angle_max': 45,
+            'vertical_angle_max': 30
+        },
+        'room_area': float(batch['room_area'][i]),
+        'room_volume': float(batch['room_volume'][i])
+    }
+
+
+def batch_to_calcs_list(batch: Dict[str, np.ndarray], **kwargs) -> List[Dict]:
+    """All rows of a batch result as per-room calculation dicts"""
+    return [batch_row_to_calcs(batch, i, **kwargs) for i in range(len(batch['room_area']))]
@@ -0,0 +1,336 @@
+# components/batch_boq.py
+"""
+Batch BOQ Generator (command line)
+Generates a full project BOQ workbook + JSON dump from a YAML/JSON project spec:
+
+    python -m components.batch_boq project.yaml --jobs 4 --output-dir out/
+
+Spec format (YAML or JSON):
+
+    project:
+      name: City Hospital Phase 2
+      client: City Health Trust
+      location: Pune
+      budget_tier: Standard            # Economy / Standard / Premium / Executive
+      room_budget_cap: 25000           # optional, USD per room
+    brands:                            # optional, 'No Preference' by default
+      displays: Samsung
+      video_conferencing: Poly
+      audio: Shure
+      control: Crestron
+    technical:                         # optional TechnicalRequirements fields
+      vc_platform: Microsoft Teams
+    rooms:
+      - name: Board Room
+        type: Executive Boardroom (10-16 People)   # ROOM_SPECS key
+        length: 30
+        width: 18
+        ceiling_height: 10
+        budget_tier: Premium           # optional per-room override
+        brands: {audio: Biamp}         # optional per-room override
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import fields
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from components.room_profiles import ROOM_SPECS
+from components.requirements_context import (
+    UnifiedRequirementsContext, RoomContext, TechnicalRequirements, BrandPreferences, ProjectContext
+)
+
+DEFAULT_USD_TO_INR = 83.5
+
+
+class SpecError(ValueError):
+    """Invalid project spec file"""
+
+
+# ==================== SPEC LOADING ====================
+
+def load_project_spec(path: str) -> Dict[str, Any]:
+    """Read a YAML or JSON project spec; a bare list is treated as the room list"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            spec = json.load(f)
+        else:
+            import yaml
+            spec = yaml.safe_load(f)
+
+    if isinstance(spec, list):
+        spec = {'rooms': spec}
+    if not isinstance(spec, dict) or not spec.get('rooms'):
+        raise SpecError(f"{path}: no rooms defined")
+
+    for i, room in enumerate(spec['rooms']):
+        label = room.get('name') or f"room #{i + 1}"
+        if room.get('type') not in ROOM_SPECS:
+            raise SpecError(f"{label}: unknown room type {room.get('type')!r} "
+                            f"(expected one of: {', '.join(ROOM_SPECS)})")
+        for dim in ('length', 'width'):
+            if not isinstance(room.get(dim), (int, float)) or room[dim] <= 0:
+                raise SpecError(f"{label}: '{dim}' must be a positive number (feet)")
+    return spec
+
+
+def _apply_fields(target, values: Optional[Dict[str, Any]], section: str):
+    """Set dataclass fields from a spec section, rejecting unknown keys"""
+    if not values:
+        return
+    known = {f.name for f in fields(target)}
+    for key, value in values.items():
+        if key not in known:
+            raise SpecError(f"{section}: unknown field '{key}'")
+        setattr(target, key, value)
+
+
+def _resolve_vc_ecosystem_brand(brands: BrandPreferences, vc_platform: str):
+    """Same VC ecosystem defaults as UnifiedRequirementsContext.from_questionnaire"""
+    if brands.vc_ecosystem_brand:
+        return
+    platform = vc_platform.lower()
+    if platform == 'microsoft teams' or 'zoom' in platform:
+        brands.vc_ecosystem_brand = brands.video_conferencing if brands.video_conferencing != 'No Preference' else 'Poly'
+    elif 'cisco' in platform:
+        brands.vc_ecosystem_brand = 'Cisco'
+
+
+def build_project_contexts(spec: Dict[str, Any]) -> List[UnifiedRequirementsContext]:
+    """One UnifiedRequirementsContext per room in the spec"""
+    project_spec = spec.get('project', {})
+    first_room = spec['rooms'][0]
+
+    technical = TechnicalRequirements()
+    _apply_fields(technical, spec.get('technical'), 'technical')
+    brands = BrandPreferences()
+    _apply_fields(brands, spec.get('brands'), 'brands')
+
+    base = UnifiedRequirementsContext(
+        room=RoomContext(
+            length_ft=float(first_room['length']),
+            width_ft=float(first_room['width']),
+            ceiling_height_ft=float(first_room.get('ceiling_height', 10)),
+            area_sqft=0.0,
+            volume_cuft=0.0,
+            room_type=first_room['type']
+        ),
+        technical=technical,
+        brands=brands,
+        project=ProjectContext(
+            project_name=project_spec.get('name', 'Batch Project'),
+            client_name=project_spec.get('client', 'Valued Client'),
+            budget_tier=project_spec.get('budget_tier', 'Standard'),
+            room_budget_cap=project_spec.get('room_budget_cap')
+        )
+    )
+
+    contexts = []
+    for i, room in enumerate(spec['rooms']):
+        capacity = ROOM_SPECS[room['type']].get('capacity')
+        ctx = base.for_room(
+            room_name=room.get('name') or f"Room {i + 1}",
+            room_type=room['type'],
+            length_ft=float(room['length']),
+            width_ft=float(room['width']),
+            ceiling_height_ft=float(room.get('ceiling_height', 10)),
+            seating_capacity=room.get('seating_capacity') or (capacity[1] if capacity else None)
+        )
+        if room.get('budget_tier'):
+            ctx.project.budget_tier = room['budget_tier']
+        if room.get('room_budget_cap') is not None:
+            ctx.project.room_budget_cap = room['room_budget_cap'] or None
+        _apply_fields(ctx.brands, room.get('brands'), f"{ctx.room.room_name}.brands")
+        _apply_fields(ctx.technical, room.get('technical'), f"{ctx.room.room_name}.technical")
+        _resolve_vc_ecosystem_brand(ctx.brands, ctx.technical.vc_platform)
+        contexts.append(ctx)
+    return contexts
+
+
+def build_project_details(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """project_details dict in the shape generate_company_excel expects"""
+    project_spec = spec.get('project', {})
+    return {
+        'Project Name': project_spec.get('name', 'Batch Project'),
+        'Client Name': project_spec.get('client', 'Valued Client'),
+        'Location': project_spec.get('location', ''),
+        'Design Engineer': project_spec.get('design_engineer', ''),
+        'Account Manager': project_spec.get('account_manager', ''),
+        'Key Client Personnel': project_spec.get('client_personnel', ''),
+        'Key Comments': project_spec.get('comments', ''),
+        'gst_rates': project_spec.get('gst_rates', {})
+    }
+
+
+# ==================== OUTPUT ====================
+
+def _json_default(value):
+    """numpy scalars / NaN-ish values from catalog rows"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def write_json_report(path: str, project_details: Dict, rooms: List[Dict], results) -> None:
+    report = {
+        'project': {k: v for k, v in project_details.items() if k != 'gst_rates'},
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'rooms': [
+            {
+                'name': room['name'],
+                'type': room['type'],
+                'items': result.items,
+                'validation': result.validation,
+                'quality_score': result.quality_score,
+                'avixa_calculations': result.context.avixa_calculations if result.context else {},
+                'elapsed_ms': round(result.elapsed_ms, 1)
+            }
+            for room, result in zip(rooms, results)
+        ]
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=_json_default)
+
+
+def _print_timing_summary(timings: Dict[str, float], results, jobs: int):
+    room_ms = [r.elapsed_ms for r in results if r.items]
+    print("\n⏱️  Timing summary")
+    print(f"    Catalog load:     {timings['catalog']:8.2f} s")
+    print(f"    Room generation:  {timings['generation']:8.2f} s  ({len(results)} rooms, {jobs} job(s))")
+    if room_ms:
+        print(f"    Per room:         min {min(room_ms) / 1000:.2f} s | "
+              f"avg {sum(room_ms) / len(room_ms) / 1000:.2f} s | max {max(room_ms) / 1000:.2f} s")
+    print(f"    Excel + JSON:     {timings['export']:8.2f} s")
+    print(f"    Total:            {timings['total']:8.2f} s")
+
+
+# ==================== ENTRY POINT ====================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m components.batch_boq',
+        description='Generate a project BOQ workbook and JSON report from a YAML/JSON room list.'
+    )
+    parser.add_argument('spec', help='Project spec file (.yaml, .yml or .json)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Rooms generated in parallel (default 1)')
+    parser.add_argument('--processes', action='store_true', help='Use a process pool instead of threads')
+    parser.add_argument('--catalog', default='master_product_catalog.csv', help='Product catalog CSV')
+    parser.add_argument('--output-dir', '-o', default='.', help='Directory for the .xlsx and .json outputs')
+    parser.add_argument('--usd-to-inr', type=float, default=None,
+                        help=f'Exchange rate for the workbook (default {DEFAULT_USD_TO_INR})')
+    parser.add_argument('--template', nargs='?', const='Design BOQ Format_2025.xlsx', default=None,
+                        help='Take the static sheets from a company template workbook '
+                             '(default when given without a path: Design BOQ Format_2025.xlsx)')
+    parser.add_argument('--formats', default='',
+                        help='Also write plain exports, comma separated: csv (one file per room), json, pdf')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print generator messages per room')
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    formats = [fmt.strip().lower() for fmt in args.formats.split(',') if fmt.strip()]
+    from components.boq_renderers import RENDERERS
+    unknown = [fmt for fmt in formats if fmt not in RENDERERS]
+    if unknown:
+        parser.error(f"unknown --formats {', '.join(unknown)} (available: {', '.join(sorted(RENDERERS))})")
+    if args.template and not os.path.isfile(args.template):
+        print(f"❌ Template not found: {args.template}", file=sys.stderr)
+        return 2
+
+    total_start = time.perf_counter()
+    timings = {}
+
+    try:
+        spec = load_project_spec(args.spec)
+        contexts = build_project_contexts(spec)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    # Imported after spec validation - these pull in pandas/openpyxl
+    from components.data_handler import load_catalog
+    from components.multi_room_generator import generate_project_boqs
+    from components.excel_generator import (
+        generate_company_excel, write_company_excel_streaming, STREAMING_ROOM_THRESHOLD
+    )
+
+    start = time.perf_counter()
+    try:
+        product_df, _, data_issues = load_catalog(args.catalog)
+    except FileNotFoundError:
+        print(f"❌ Catalog not found: {args.catalog}", file=sys.stderr)
+        return 2
+    timings['catalog'] = time.perf_counter() - start
+    print(f"📦 Loaded {len(product_df)} products from {args.catalog}")
+    if args.verbose:
+        for issue in data_issues:
+            print(f"    ℹ️ {issue}")
+
+    rooms = [{'name': ctx.room.room_name, 'type': ctx.room.room_type} for ctx in contexts]
+    print(f"🏗️  Generating {len(rooms)} rooms with {args.jobs} job(s)...")
+
+    def on_room_done(index, result):
+        status = '✅' if result.items else '❌'
+        grade = result.quality_score.get('grade', '-') if result.quality_score else '-'
+        print(f"    {status} {rooms[index]['name']}: {len(result.items)} items, "
+              f"grade {grade}, {result.elapsed_ms / 1000:.2f} s")
+        if args.verbose or not result.items:
+            for level, message in result.messages:
+                print(f"        [{level}] {message}")
+
+    start = time.perf_counter()
+    results = generate_project_boqs(contexts, product_df, max_workers=args.jobs,
+                                    use_processes=args.processes, on_room_done=on_room_done)
+    timings['generation'] = time.perf_counter() - start
+
+    for room, result in zip(rooms, results):
+        room['boq_items'] = result.items
+
+    start = time.perf_counter()
+    project_details = build_project_details(spec)
+    os.makedirs(args.output_dir, exist_ok=True)
+    safe_project = re.sub(r'[^\w\-]+', '_', project_details['Project Name']).strip('_') or 'Project'
+    base_name = os.path.join(args.output_dir, f"{safe_project}_BOQ_{datetime.now().strftime('%Y%m%d')}")
+
+    usd_to_inr = args.usd_to_inr or DEFAULT_USD_TO_INR
+    export_rooms = [r for r in rooms if r['boq_items']]
+    if len(export_rooms) >= STREAMING_ROOM_THRESHOLD:
+        # Large projects: stream straight to the output file, no in-memory workbook
+        write_company_excel_streaming(project_details, export_rooms, usd_to_inr, output_path=base_name + '.xlsx',
+                                      template_path=args.template)
+        print(f"📊 Workbook: {base_name}.xlsx")
+    else:
+        excel_data = generate_company_excel(project_details, export_rooms, usd_to_inr, template_path=args.template)
+        if excel_data is not None:
+            payload = excel_data.getvalue() if hasattr(excel_data, 'getvalue') else excel_data
+            with open(base_name + '.xlsx', 'wb') as f:
+                f.write(payload)
+            print(f"📊 Workbook: {base_name}.xlsx")
+        else:
+            print("⚠️ Workbook generation failed", file=sys.stderr)
+
+    write_json_report(base_name + '.json', project_details, rooms, results)
+    print(f"🧾 JSON report: {base_name}.json")
+
+    if formats:
+        from components.boq_renderers import export_boq
+        for filename, data in export_boq(project_details, export_rooms, usd_to_inr, formats).items():
+            with open(os.path.join(args.output_dir, filename), 'wb') as f:
+                f.write(data)
+        print(f"📄 Plain exports ({', '.join(formats)}): {args.output_dir}")
+    timings['export'] = time.perf_counter() - start
+    timings['total'] = time.perf_counter() - total_start
+
+    _print_timing_summary(timings, results, args.jobs)
+
+    failed = sum(1 for r in results if not r.items)
+    return 1 if failed == len(results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
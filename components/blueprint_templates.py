@@ -0,0 +1,310 @@
+# components/blueprint_templates.py
+"""
+Compiled Blueprint Templates
+Room profiles (room_profiles.ROOM_SPECS) and component requirement templates are
+compiled once, at import. A generation only fills in quantities, sizes and brands
+from the AVIXA results; keyword lists, blacklists, regex filter plans and filter
+cache keys are built once per distinct parameter set and shared afterwards.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Any
+
+from components.room_profiles import ROOM_SPECS
+from components.intelligent_product_selector import ProductRequirement, FilterPlan
+
+# PRODUCTION: Room-specific display constraints
+ROOM_DISPLAY_CONSTRAINTS = {
+    'Small Huddle Room (2-3 People)': {'min': 43, 'max': 55},
+    'Medium Huddle Room (4-6 People)': {'min': 50, 'max': 65},
+    'Standard Conference Room (6-8 People)': {'min': 55, 'max': 75},
+    'Large Conference Room (8-12 People)': {'min': 65, 'max': 85},
+    'Executive Boardroom (10-16 People)': {'min': 75, 'max': 98},
+    'Training Room (15-25 People)': {'min': 75, 'max': 98},
+    'Large Training/Presentation Room (25-40 People)': {'min': 98, 'max': 110},
+    'Multipurpose Event Room (40+ People)': {'min': 98, 'max': 120},
+}
+DEFAULT_DISPLAY_CONSTRAINTS = {'min': 55, 'max': 98}
+DEFAULT_ROOM_TYPE = 'Standard Conference Room (6-8 People)'
+
+
+@dataclass(frozen=True)
+class RoomTemplate:
+    """Per-room-type blueprint settings, compiled from ROOM_SPECS"""
+    room_type: str
+    display_min: int
+    display_max: int
+    executive: bool          # Boardroom-class: 75" minimum, dual displays
+    profile: Dict[str, Any]
+
+    def clamp_display_size(self, size: int, room_area: float) -> int:
+        size = max(self.display_min, min(size, self.display_max))
+        if self.executive or room_area > 600:
+            size = max(75, size)
+        return size
+
+    def display_quantity(self, dual_display_needed: bool, room_area: float) -> int:
+        return 2 if (dual_display_needed or self.executive or room_area > 600) else 1
+
+
+@dataclass(frozen=True)
+class ComponentTemplate:
+    """
+    Immutable requirement template. '{size}' / '{brand}' placeholders in the
+    keyword tuples are filled per generation; justification is a format string.
+    """
+    component_key: str
+    category: str
+    sub_category: str
+    priority: float
+    justification: str
+    required_keywords: Tuple[str, ...] = ()
+    blacklist_keywords: Tuple[str, ...] = ()
+    quantity: int = 1
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    mounting_type: Optional[str] = None
+    sized: bool = False  # size_requirement = size
+    client_preference_weight: float = 0.5
+    strict_category_match: bool = True
+
+    @property
+    def uses_size(self) -> bool:
+        return self.sized or any('{size}' in kw for kw in self.required_keywords + self.blacklist_keywords)
+
+    @property
+    def uses_brand(self) -> bool:
+        return any('{brand}' in kw for kw in self.required_keywords + self.blacklist_keywords)
+
+
+# Filter-relevant fields per (template, size, brand, overrides), built on first use
+_compiled_filters: Dict[Tuple, Dict[str, Any]] = {}
+_compile_lock = threading.Lock()
+
+
+def _compiled_filter_fields(name: str, template: ComponentTemplate, size, brand,
+                            overrides: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
+    key = (name, size if template.uses_size else None,
+           brand.lower() if brand and template.uses_brand else None, overrides)
+    compiled = _compiled_filters.get(key)
+    if compiled is not None:
+        return compiled
+
+    values = {'size': size, 'brand': brand.lower() if brand else ''}
+    fields = {
+        'category': template.category,
+        'sub_category': template.sub_category,
+        'required_keywords': tuple(kw.format(**values) if '{' in kw else kw for kw in template.required_keywords),
+        'blacklist_keywords': tuple(kw.format(**values) if '{' in kw else kw for kw in template.blacklist_keywords),
+        'min_price': template.min_price,
+        'max_price': template.max_price,
+        'mounting_type': template.mounting_type,
+        'size_requirement': size if template.sized else None,
+        'client_preference_weight': template.client_preference_weight,
+        'strict_category_match': template.strict_category_match,
+    }
+    fields.update(overrides)
+    fields['filter_plan'] = FilterPlan.build(key, fields['required_keywords'], fields['blacklist_keywords'])
+    with _compile_lock:
+        return _compiled_filters.setdefault(key, fields)
+
+
+def instantiate(name: str, quantity: Optional[int] = None, size=None, brand: Optional[str] = None,
+                overrides: Optional[Dict[str, Any]] = None, **justification_args) -> ProductRequirement:
+    """
+    ProductRequirement for a compiled component template.
+    overrides replace filter fields (e.g. a size-dependent min_price) and become
+    part of the filter plan key.
+    """
+    template = COMPONENT_TEMPLATES[name]
+    compiled = _compiled_filter_fields(name, template, size, brand,
+                                       tuple(sorted(overrides.items())) if overrides else ())
+    quantity = template.quantity if quantity is None else quantity
+    requirement_fields = dict(compiled)
+    requirement_fields['required_keywords'] = list(compiled['required_keywords'])
+    requirement_fields['blacklist_keywords'] = list(compiled['blacklist_keywords'])
+    return ProductRequirement(
+        quantity=quantity,
+        priority=template.priority,
+        justification=template.justification.format(size=size, brand=brand, quantity=quantity,
+                                                    **justification_args),
+        **requirement_fields
+    )
+
+
+def room_template(room_type: str) -> RoomTemplate:
+    """Compiled template for a room type (unknown types use the standard conference room)"""
+    return ROOM_TEMPLATES.get(room_type) or _compile_room_template(room_type)
+
+
+def _compile_room_template(room_type: str) -> RoomTemplate:
+    constraints = ROOM_DISPLAY_CONSTRAINTS.get(room_type, DEFAULT_DISPLAY_CONSTRAINTS)
+    return RoomTemplate(
+        room_type=room_type,
+        display_min=constraints['min'],
+        display_max=constraints['max'],
+        executive='Executive' in room_type or 'Boardroom' in room_type,
+        profile=ROOM_SPECS.get(room_type, ROOM_SPECS[DEFAULT_ROOM_TYPE])
+    )
+
+
+DSP_KEYWORDS = ('dsp', 'processor', 'digital signal processor', 'tesira', 'qsc core', 'biamp')
+DSP_BLACKLIST = ('mixer', 'amplifier', 'speaker', 'touchmix', 'live sound', 'portable mixer',
+                 'analog mixer', 'powered mixer', 'summing')
+
+COMPONENT_TEMPLATES = {
+    # === DISPLAYS ===
+    'primary_display': ComponentTemplate(
+        'primary_display', 'Displays', 'Professional Display', 1,
+        'Final determined size: {size}" for {room_type}',
+        required_keywords=('display', '4k', '{size}'),
+        blacklist_keywords=('mount', 'bracket', 'stand', 'arm', 'cable', 'adapter', 'menu'),
+        max_price=30000, sized=True, client_preference_weight=1.0
+    ),
+    'primary_display_interactive': ComponentTemplate(
+        'primary_display', 'Displays', 'Interactive Display', 1,
+        'Final determined size: {size}" for {room_type}',
+        required_keywords=('display', '4k', '{size}'),
+        blacklist_keywords=('mount', 'bracket', 'stand', 'arm', 'cable', 'adapter', 'menu'),
+        max_price=30000, sized=True, client_preference_weight=1.0
+    ),
+    'display_mount': ComponentTemplate(
+        'display_mount', 'Mounts', 'Display Mount / Cart', 2,
+        'Articulating wall mounts for dual {size}" displays',
+        required_keywords=('wall mount', 'articulating', 'heavy duty', '{size}'),
+        blacklist_keywords=('video wall', 'tile', 'array', 'ceiling', 'floor', 'camera', 'mic', 'speaker',
+                            'touch', 'panel', 'controller', 'menu'),
+        max_price=1500, mounting_type='wall', sized=True
+    ),
+
+    # === VIDEO CONFERENCING (brand = enforced VC ecosystem) ===
+    'vc_system_small': ComponentTemplate(
+        'vc_system', 'Video Conferencing', 'Video Bar', 3,
+        'All-in-one {brand} solution for small space',
+        required_keywords=('video bar', 'all-in-one', '{brand}'),
+        blacklist_keywords=('codec', 'ptz', 'camera'),
+        min_price=800, max_price=3000, client_preference_weight=1.0
+    ),
+    'vc_system_medium': ComponentTemplate(
+        'vc_system', 'Video Conferencing', 'Video Bar', 3,
+        '{brand} video bar with expansion capability',
+        required_keywords=('video bar', 'expansion', '{brand}'),
+        min_price=1200, max_price=5000, client_preference_weight=1.0
+    ),
+    'vc_codec': ComponentTemplate(
+        'vc_codec', 'Video Conferencing', 'Room Kit / Codec', 3,
+        '{brand} codec for {vc_platform}',
+        required_keywords=('codec', 'room kit', '{brand}'),
+        blacklist_keywords=('video bar', 'webcam', 'usb'),
+        min_price=1500, max_price=15000, client_preference_weight=1.0
+    ),
+    'ptz_camera': ComponentTemplate(
+        'ptz_camera', 'Video Conferencing', 'PTZ Camera', 4,
+        '{brand} PTZ camera for ecosystem compatibility',
+        required_keywords=('ptz', 'camera', 'optical', 'zoom', '{brand}'),
+        blacklist_keywords=('controller', 'remote', 'mount', 'accessory', 'webcam'),
+        min_price=1000, max_price=10000, client_preference_weight=1.0
+    ),
+    'camera_mount': ComponentTemplate(
+        'camera_mount', 'Mounts', 'Camera Mount', 4.5,
+        'Mounting hardware for {brand} PTZ camera',
+        required_keywords=('camera', 'mount', 'ptz', 'bracket'),
+        blacklist_keywords=('display', 'speaker', 'projector'),
+        min_price=150, max_price=400
+    ),
+    'touch_controller': ComponentTemplate(
+        'touch_controller', 'Video Conferencing', 'Touch Controller / Panel', 5,
+        '{brand} touch controller for native integration',
+        required_keywords=('touch', 'controller', 'panel', '{brand}'),
+        blacklist_keywords=('crestron', 'extron', 'amx'),
+        min_price=300, client_preference_weight=1.0
+    ),
+
+    # === AUDIO (quantities from AVIXA A102.01 / mic coverage) ===
+    'microphones_ceiling': ComponentTemplate(
+        'microphones', 'Audio', 'Ceiling Microphone', 6,
+        'AVIXA-calculated {quantity}x mics for {room_area:.0f} sqft',
+        required_keywords=('microphone', 'ceiling', 'array'),
+        blacklist_keywords=('usb', 'webcam'),
+        min_price=400
+    ),
+    'microphones_table': ComponentTemplate(
+        'microphones', 'Audio', 'Table/Boundary Microphone', 6,
+        'AVIXA-calculated {quantity}x mics for {room_area:.0f} sqft',
+        required_keywords=('microphone', 'table', 'array'),
+        blacklist_keywords=('usb',),
+        min_price=150
+    ),
+    'audio_dsp': ComponentTemplate(
+        'audio_dsp', 'Audio', 'DSP / Audio Processor / Mixer', 7,
+        'AVIXA-required conferencing DSP with AEC for {room_area:.0f} sqft room',
+        required_keywords=DSP_KEYWORDS,
+        blacklist_keywords=DSP_BLACKLIST,
+        min_price=1500, max_price=15000  # Real conferencing DSPs start at $1500
+    ),
+    'audio_dsp_brand_matched': ComponentTemplate(
+        'audio_dsp', 'Audio', 'DSP / Audio Processor / Mixer', 7,
+        'AVIXA-required conferencing DSP with AEC for {room_area:.0f} sqft room',
+        required_keywords=DSP_KEYWORDS + ('{brand}',),
+        blacklist_keywords=DSP_BLACKLIST,
+        min_price=1500, max_price=15000, client_preference_weight=1.0
+    ),
+    'ceiling_speakers': ComponentTemplate(
+        'ceiling_speakers', 'Audio', 'Ceiling Loudspeaker', 8,
+        'AVIXA A102.01: {quantity}x speakers for uniform coverage',
+        required_keywords=('ceiling', 'speaker', 'in-ceiling'),
+        blacklist_keywords=('portable', 'powered', 'grille', 'cover', 'trim', 'accessory'),
+        min_price=100
+    ),
+    'power_amplifier': ComponentTemplate(
+        'power_amplifier', 'Audio', 'Amplifier', 9,
+        'AVIXA SPL: {power:.0f}W amplifier for {target_spl}dB SPL',
+        required_keywords=('amplifier', 'power', 'channel'),
+        blacklist_keywords=('dsp', 'mixer'),
+        min_price=500
+    ),
+
+    # === INFRASTRUCTURE & CONNECTIVITY ===
+    'av_rack': ComponentTemplate(
+        'av_rack', 'Infrastructure', 'AV Rack', 10,
+        'Houses codec, DSP, amplifier, and network equipment (minimum 12U)',
+        required_keywords=('rack', '12u', 'equipment', 'enclosure'),
+        blacklist_keywords=('shelf', 'mount', 'bracket', 'accessory'),
+        min_price=500, max_price=2500
+    ),
+    'rack_pdu': ComponentTemplate(
+        'rack_pdu', 'Infrastructure', 'Power (PDU/UPS)', 11,
+        'Rack-mount power distribution for all equipment',
+        required_keywords=('pdu', 'rack', 'power', '8 outlet', 'distribution'),
+        min_price=150, max_price=800
+    ),
+    'network_switch': ComponentTemplate(
+        'network_switch', 'Networking', 'Network Switch', 12,
+        'Managed PoE switch for VC system and other endpoints',
+        required_keywords=('switch', 'poe', 'managed', 'gigabit'),
+        blacklist_keywords=('unmanaged', 'hub'),
+        min_price=300, max_price=1500
+    ),
+    'table_connectivity': ComponentTemplate(
+        'table_connectivity', 'Cables & Connectivity', 'Wall & Table Plate Module', 13,
+        'Table-mount connectivity for HDMI/USB-C laptop input',
+        required_keywords=('table', 'connectivity', 'hdmi', 'usb-c', 'retractor', 'cubby'),
+        blacklist_keywords=('wall plate', 'single gang', 'mount', 'bracket'),
+        min_price=200, max_price=800
+    ),
+    'cables_hdmi': ComponentTemplate(
+        'cables_hdmi', 'Cables & Connectivity', 'AV Cable', 14,
+        'HDMI cables for video distribution',
+        required_keywords=('hdmi', 'cable', 'certified', '4k'),
+        quantity=4, min_price=20, max_price=150
+    ),
+    'cables_network': ComponentTemplate(
+        'cables_network', 'Cables & Connectivity', 'AV Cable', 15,
+        'Cat6A network cables for endpoints',
+        required_keywords=('cat6', 'ethernet', 'network', 'cable'),
+        quantity=6, min_price=15, max_price=80
+    ),
+}
+
+ROOM_TEMPLATES = {room_type: _compile_room_template(room_type) for room_type in ROOM_SPECS}
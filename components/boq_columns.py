@@ -0,0 +1,108 @@
+# components/boq_columns.py
+"""
+Columnar BOQ View
+One pass over boq_items builds per-field columns, role tags (display, speaker,
+mic, switch, UPS, ...) and per-role aggregates. Validators, quality scoring and
+the power/network estimates read from this instead of re-scanning the list.
+"""
+
+from typing import Dict, List, Optional, Set
+
+# Role -> predicate on (category, sub_category, upper-cased name).
+# These are the substring rules the validators have always used.
+ROLE_RULES = {
+    'display': lambda cat, sub, name: cat == 'Displays',
+    'speaker': lambda cat, sub, name: 'Speaker' in sub or 'Loudspeaker' in sub,
+    'mic': lambda cat, sub, name: 'Mic' in sub,  # also matches 'Microphone'
+    'microphone': lambda cat, sub, name: 'Microphone' in sub,
+    'conferencing_dsp': lambda cat, sub, name: 'DSP / Audio Processor / Mixer' in sub,
+    'dsp': lambda cat, sub, name: 'DSP' in sub,
+    'switch': lambda cat, sub, name: 'Switch' in sub,
+    'ups': lambda cat, sub, name: 'UPS' in name or 'Power' in sub,
+    'codec': lambda cat, sub, name: 'Codec' in sub,
+    'camera': lambda cat, sub, name: 'Camera' in sub,
+    'audio_amplifier': lambda cat, sub, name: cat == 'Audio' and 'Amplifier' in sub,
+    'audio_dsp': lambda cat, sub, name: cat == 'Audio' and 'Amplifier' not in sub and 'DSP' in sub,
+    'vc_camera': lambda cat, sub, name: cat == 'Video Conferencing' and 'Camera' in sub,
+    'vc_device': lambda cat, sub, name: cat == 'Video Conferencing' and 'Camera' not in sub,
+}
+
+
+class BOQColumns:
+    """
+    NEW: Read-only columnar view of a BOQ item list.
+    Build once per validation run (BOQColumns.of(items) reuses an existing view).
+    """
+
+    def __init__(self, boq_items: List[Dict]):
+        self.items = boq_items
+        self.category = []
+        self.sub_category = []
+        self.brand = []
+        self.name = []
+        self.quantity = []
+        self.price = []
+        self.size = []
+        self.roles: List[Set[str]] = []
+
+        self.role_indices: Dict[str, List[int]] = {role: [] for role in ROLE_RULES}
+        self.role_quantity: Dict[str, int] = {role: 0 for role in ROLE_RULES}
+        self.brands_by_category: Dict[str, Set[str]] = {}
+
+        for i, item in enumerate(boq_items):
+            category = item.get('category', '')
+            sub_category = item.get('sub_category', '')
+            name = item.get('name', '')
+            brand = item.get('brand', '')
+            quantity = item.get('quantity', 1)
+
+            self.category.append(category)
+            self.sub_category.append(sub_category)
+            self.brand.append(brand)
+            self.name.append(name)
+            self.quantity.append(quantity)
+            self.price.append(item.get('price', 0))
+            self.size.append(item.get('size_requirement', 65))
+            self.brands_by_category.setdefault(category, set()).add(brand)
+
+            upper_name = name.upper()
+            roles = {role for role, rule in ROLE_RULES.items() if rule(category, sub_category, upper_name)}
+            self.roles.append(roles)
+            for role in roles:
+                self.role_indices[role].append(i)
+                self.role_quantity[role] += item.get('quantity', 0)
+
+    @classmethod
+    def of(cls, boq_items) -> 'BOQColumns':
+        """Accept either an item list or an already built view"""
+        return boq_items if isinstance(boq_items, cls) else cls(boq_items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def has(self, role: str) -> bool:
+        return bool(self.role_indices[role])
+
+    def count(self, role: str) -> int:
+        """Number of line items with the role"""
+        return len(self.role_indices[role])
+
+    def first(self, role: str) -> Optional[Dict]:
+        """First line item with the role (BOQ order)"""
+        indices = self.role_indices[role]
+        return self.items[indices[0]] if indices else None
+
+    def items_with(self, role: str) -> List[Dict]:
+        return [self.items[i] for i in self.role_indices[role]]
+
+    def has_category(self, fragment: str) -> bool:
+        """Substring match against the distinct categories (not every item)"""
+        return any(fragment in category for category in self.brands_by_category)
+
+    def brands_in_category(self, fragment: str) -> Set[str]:
+        """Lower-cased brands of every category containing fragment"""
+        return {
+            brand.lower()
+            for category, brands in self.brands_by_category.items() if fragment in category
+            for brand in brands
+        }
@@ -0,0 +1,137 @@
+# components/boq_document.py
+"""
+BOQ Document Model
+Format-neutral view of a priced project BOQ: project details, then per room the
+priced lines (INR, GST split into SGST/CGST) and service lines, then totals.
+Built once per project from rooms_data and the shared ProjectTotals; the
+renderers in boq_renderers.py turn it into CSV / JSON / PDF without openpyxl.
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from components.project_totals import ProjectTotals, ServiceLine, compute_project_totals
+
+# Bumped whenever a field is added, renamed or changes meaning (JSON consumers check it)
+BOQ_DOCUMENT_VERSION = 1
+
+# project_details keys carried into the document (same labels as the workbook)
+PROJECT_FIELDS = (
+    'Project Name', 'Client Name', 'Location', 'Design Engineer', 'Account Manager',
+    'Key Client Personnel', 'Key Comments',
+)
+
+
+@dataclass(frozen=True)
+class BOQLine:
+    """One priced BOQ item; amounts in INR"""
+    sr_no: int
+    category: str
+    sub_category: str
+    brand: str
+    model_number: str
+    description: str
+    quantity: int
+    unit_price_usd: float
+    unit_price_inr: float
+    subtotal: float
+    gst_rate: float
+    sgst_amount: float
+    cgst_amount: float
+    total_tax: float
+    total: float
+
+
+@dataclass(frozen=True)
+class RoomDocument:
+    name: str
+    room_type: str
+    area_sqft: float
+    lines: Tuple[BOQLine, ...]
+    services: Tuple[ServiceLine, ...]
+    hardware_subtotal: float
+    services_total: float
+    subtotal: float
+    gst: float
+    total: float
+
+
+@dataclass(frozen=True)
+class BOQDocument:
+    """Whole project; rooms are the ones with BOQ items, in rooms_data order"""
+    project: Dict[str, str]
+    generated_at: str
+    currency: str
+    usd_to_inr_rate: float
+    rooms: Tuple[RoomDocument, ...]
+    equipment: float
+    services: float
+    subtotal: float
+    gst: float
+    total: float
+    version: int = BOQ_DOCUMENT_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dicts/lists, ready for json.dumps"""
+        return asdict(self)
+
+
+def build_boq_document(project_details: Dict, rooms_data: List[Dict], usd_to_inr_rate: float,
+                       totals: Optional[ProjectTotals] = None) -> BOQDocument:
+    """
+    NEW: Price the project once into a BOQDocument.
+    Rooms without BOQ items are left out, as in the workbook. totals (optional)
+    must be compute_project_totals() of those same rooms.
+    """
+    rooms = [room for room in rooms_data if room.get('boq_items')]
+    if totals is None:
+        totals = compute_project_totals(rooms, usd_to_inr_rate, project_details.get('gst_rates', {}))
+
+    room_documents = []
+    for room, room_totals in zip(rooms, totals.rooms):
+        lines = tuple(
+            BOQLine(
+                sr_no=sr_no,
+                category=item.get('category', 'General AV'),
+                sub_category=item.get('sub_category', ''),
+                brand=item.get('brand', 'N/A'),
+                model_number=item.get('model_number', 'N/A'),
+                description=item.get('name', 'Unknown Product'),
+                quantity=int(item.get('quantity', 1)),
+                unit_price_usd=float(item.get('price', 0)),
+                unit_price_inr=line.unit_price_inr,
+                subtotal=line.subtotal,
+                gst_rate=line.gst_rate,
+                sgst_amount=line.sgst_amount,
+                cgst_amount=line.cgst_amount,
+                total_tax=line.total_tax,
+                total=line.total_with_gst,
+            )
+            for sr_no, (item, line) in enumerate(zip(room['boq_items'], room_totals.lines), start=1)
+        )
+        room_documents.append(RoomDocument(
+            name=room_totals.name,
+            room_type=room.get('type', ''),
+            area_sqft=float(room.get('area', 0) or 0),
+            lines=lines,
+            services=room_totals.services,
+            hardware_subtotal=room_totals.hardware_subtotal,
+            services_total=room_totals.services_total,
+            subtotal=room_totals.subtotal,
+            gst=room_totals.gst,
+            total=room_totals.total,
+        ))
+
+    return BOQDocument(
+        project={field: str(project_details.get(field, '')) for field in PROJECT_FIELDS},
+        generated_at=datetime.now().isoformat(timespec='seconds'),
+        currency='INR',
+        usd_to_inr_rate=usd_to_inr_rate,
+        rooms=tuple(room_documents),
+        equipment=totals.equipment,
+        services=totals.services,
+        subtotal=totals.subtotal,
+        gst=totals.gst,
+        total=totals.total,
+    )
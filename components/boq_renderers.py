@@ -0,0 +1,202 @@
+# components/boq_renderers.py
+"""
+Plain BOQ Exports
+Renderers that turn a BOQDocument into machine-readable files for ERP and
+procurement systems - CSV per room, one JSON document and a short PDF
+summary. No styling, no images, no openpyxl: milliseconds per project.
+
+    document = build_boq_document(project_details, rooms_data, usd_to_inr_rate)
+    files = render_boq(document, 'csv')   # {filename: bytes}
+
+New formats plug in with @register_renderer.
+"""
+
+import csv
+import io
+import json
+import re
+import zipfile
+from dataclasses import astuple, dataclass, fields
+from typing import Callable, Dict, Iterable, List
+
+from components.boq_document import BOQDocument, BOQLine, build_boq_document
+
+
+@dataclass(frozen=True)
+class BOQRenderer:
+    name: str
+    media_type: str
+    render: Callable[[BOQDocument], Dict[str, bytes]]
+
+
+RENDERERS: Dict[str, BOQRenderer] = {}
+
+
+def register_renderer(name: str, media_type: str):
+    """Decorator: add a document -> {filename: bytes} function under `name`"""
+    def decorator(render):
+        RENDERERS[name] = BOQRenderer(name, media_type, render)
+        return render
+    return decorator
+
+
+def render_boq(document: BOQDocument, fmt: str) -> Dict[str, bytes]:
+    """Files for one format, keyed by file name"""
+    try:
+        renderer = RENDERERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown BOQ export format '{fmt}' (available: {', '.join(sorted(RENDERERS))})")
+    return renderer.render(document)
+
+
+def export_boq(project_details: Dict, rooms_data: List[Dict], usd_to_inr_rate: float,
+               formats: Iterable[str] = ('json',)) -> Dict[str, bytes]:
+    """NEW: Build the document once and render every requested format"""
+    document = build_boq_document(project_details, rooms_data, usd_to_inr_rate)
+    files = {}
+    for fmt in formats:
+        files.update(render_boq(document, fmt))
+    return files
+
+
+def zip_files(files: Dict[str, bytes]) -> bytes:
+    """Bundle rendered files into one .zip (e.g. the per-room CSVs for a download)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for filename, data in files.items():
+            archive.writestr(filename, data)
+    return buffer.getvalue()
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^\w\-]+', '_', name).strip('_') or 'BOQ'
+
+
+def _base_name(document: BOQDocument) -> str:
+    return _safe_name(document.project.get('Project Name') or 'Project')
+
+
+# ==================== CSV (ONE FILE PER ROOM) ====================
+CSV_COLUMNS = ('line_type',) + tuple(field.name for field in fields(BOQLine))
+
+
+@register_renderer('csv', 'text/csv')
+def render_csv(document: BOQDocument) -> Dict[str, bytes]:
+    """Item rows, then the room's service lines (line_type 'service', amounts in INR)"""
+    files = {}
+    base_name = _base_name(document)
+    for index, room in enumerate(document.rooms, start=1):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        for line in room.lines:
+            writer.writerow(('item',) + astuple(line))
+        for sr_no, service in enumerate(room.services, start=len(room.lines) + 1):
+            writer.writerow((
+                'service', sr_no, 'Services', '', '', '', service.name, 1, '', service.amount,
+                service.amount, service.gst_rate, service.sgst_amount, service.cgst_amount,
+                service.total_tax, service.total,
+            ))
+        filename = f"{base_name}_{index:02d}_{_safe_name(room.name)}.csv"
+        # utf-8-sig so Excel opens non-ASCII product names correctly
+        files[filename] = buffer.getvalue().encode('utf-8-sig')
+    return files
+
+
+# ==================== JSON (ERP IMPORT) ====================
+@register_renderer('json', 'application/json')
+def render_json(document: BOQDocument) -> Dict[str, bytes]:
+    payload = json.dumps(document.to_dict(), ensure_ascii=False, separators=(',', ':'))
+    return {f"{_base_name(document)}_BOQ.json": payload.encode('utf-8')}
+
+
+# ==================== PDF (SUMMARY) ====================
+PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT = 595, 842  # A4, points
+PDF_MARGIN = 40
+PDF_FONT_SIZE = 9
+PDF_LEADING = 12
+PDF_LINE_CHARS = 92  # Courier is 0.6 em wide
+PDF_LINES_PER_PAGE = (PDF_PAGE_HEIGHT - 2 * PDF_MARGIN) // PDF_LEADING
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_bytes(pages: List[List[str]]) -> bytes:
+    """Minimal PDF 1.4: Courier text pages, built by hand (no PDF library needed)"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree - filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        text = ["BT", f"/F1 {PDF_FONT_SIZE} Tf", f"{PDF_LEADING} TL",
+                f"{PDF_MARGIN} {PDF_PAGE_HEIGHT - PDF_MARGIN} Td"]
+        text += [f"({_pdf_escape(line)}) Tj T*" for line in lines]
+        text.append("ET")
+        stream = "\n".join(text).encode('cp1252', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PDF_PAGE_WIDTH} {PDF_PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        ).encode('ascii'))
+        page_ids.append(len(objects))
+    objects[1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] "
+        f"/Count {len(page_ids)} >>"
+    ).encode('ascii')
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref_offset = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return out.getvalue()
+
+
+def _money(amount: float) -> str:
+    return f"{amount:,.2f}"
+
+
+def _summary_lines(document: BOQDocument) -> List[str]:
+    project = document.project
+    rule = '-' * PDF_LINE_CHARS
+    lines = [
+        f"BILL OF QUANTITIES - SUMMARY   {project.get('Project Name', '')}",
+        f"Client: {project.get('Client Name', '')}    Location: {project.get('Location', '')}",
+        f"Generated: {document.generated_at}    Rate: 1 USD = {document.usd_to_inr_rate:.2f} INR",
+        "All amounts in INR",
+        "",
+        f"{'#':>3} {'Room':<30} {'Items':>5} {'Subtotal':>16} {'GST':>15} {'Total':>17}",
+        rule,
+    ]
+    for index, room in enumerate(document.rooms, start=1):
+        lines.append(
+            f"{index:>3} {room.name[:30]:<30} {len(room.lines):>5} {_money(room.subtotal):>16} "
+            f"{_money(room.gst):>15} {_money(room.total):>17}"
+        )
+    lines += [
+        rule,
+        f"{'Equipment':<40}{_money(document.equipment):>52}",
+        f"{'Services (installation, warranty, PM)':<40}{_money(document.services):>52}",
+        f"{'Subtotal':<40}{_money(document.subtotal):>52}",
+        f"{'GST (SGST + CGST)':<40}{_money(document.gst):>52}",
+        f"{'GRAND TOTAL':<40}{_money(document.total):>52}",
+    ]
+    return [line[:PDF_LINE_CHARS] for line in lines]
+
+
+@register_renderer('pdf', 'application/pdf')
+def render_pdf(document: BOQDocument) -> Dict[str, bytes]:
+    """Project totals and one line per room (the itemised BOQ is in the CSV/JSON/XLSX)"""
+    lines = _summary_lines(document)
+    pages = [lines[start:start + PDF_LINES_PER_PAGE] for start in range(0, len(lines), PDF_LINES_PER_PAGE)]
+    return {f"{_base_name(document)}_BOQ_Summary.pdf": _pdf_bytes(pages)}
@@ -11,111 +11,119 @@ def load_and_validate_data():
     Loads the master product catalog, validates essential columns, and renames
     columns for internal consistency within the application.
     """
-    data_issues = []
     try:
-        df = pd.read_csv("master_product_catalog.csv")
+        return load_catalog()
+    except FileNotFoundError:
+        st.error("FATAL: 'master_product_catalog.csv' not found. The application cannot start without the product database.")
+        return None, None, ["'master_product_catalog.csv' is missing."]
+    except Exception as e:
+        st.error(f"A critical error occurred during data loading: {e}")
+        traceback.print_exc()
+        return None, None, [f"An unexpected error occurred: {str(e)}"]
 
-        # ========== BULLETPROOF COLUMN NORMALIZATION ==========
-        
-        # Handle category column (might be 'category' or 'primary_category')
-        if 'category' not in df.columns:
-            if 'primary_category' in df.columns:
-                df['category'] = df['primary_category']
-                data_issues.append("Renamed 'primary_category' to 'category'")
-            else:
-                df['category'] = 'General AV'
-                data_issues.append("Created default 'category' column")
-        
-        # Handle sub_category
-        if 'sub_category' not in df.columns:
-            df['sub_category'] = 'Uncategorized'
-            data_issues.append("Created default 'sub_category' column")
-        
-        # Handle price (might be 'price', 'price_usd', or missing)
-        if 'price' not in df.columns:
-            if 'price_usd' in df.columns:
-                df['price'] = df['price_usd']
-            elif 'price_inr' in df.columns:
-                df['price'] = df['price_inr'] / 83.5  # Convert to USD
-            else:
-                df['price'] = 0
-                data_issues.append("Created default 'price' column")
-        
-        # Handle specifications (might be 'specifications' or 'full_specifications')
-        if 'specifications' not in df.columns:
-            if 'full_specifications' in df.columns:
-                df['specifications'] = df['full_specifications']
-            else:
-                df['specifications'] = ''
-        
-        # Handle other essential columns with defaults
-        column_defaults = {
-            'name': '',
-            'brand': '',
-            'description': '',
-            'model_number': '',
-            'warranty': 'Not Specified',
-            'lead_time_days': 14,
-            'gst_rate': 18,
-            'image_url': '',
-            'unit_of_measure': 'piece',
-            'data_quality_score': 100
-        }
-        
-        for col, default_val in column_defaults.items():
-            if col not in df.columns:
-                df[col] = default_val
-                data_issues.append(f"Created default '{col}' column")
 
-        # ========== DATA TYPE COERCION ==========
-        df['price'] = pd.to_numeric(df['price'], errors='coerce').fillna(0)
-        df['gst_rate'] = pd.to_numeric(df['gst_rate'], errors='coerce').fillna(18)
-        df['lead_time_days'] = pd.to_numeric(df['lead_time_days'], errors='coerce').fillna(14)
-        df['data_quality_score'] = pd.to_numeric(df['data_quality_score'], errors='coerce').fillna(100)
-        
-        # String columns
-        df['description'] = df['description'].fillna('')
-        df['specifications'] = df['specifications'].fillna('')
-        df['image_url'] = df['image_url'].fillna('')
-        df['model_number'] = df['model_number'].fillna('')
-        df['warranty'] = df['warranty'].fillna('Not Specified')
-        df['unit_of_measure'] = df['unit_of_measure'].fillna('piece')
-        df['name'] = df['name'].fillna('')
-        df['brand'] = df['brand'].fillna('')
-        
-        # Category handling
-        df['category'] = df['category'].fillna('General AV')
-        df['sub_category'] = df['sub_category'].fillna('Needs Classification')
+def load_catalog(catalog_path: str = "master_product_catalog.csv",
+                 guidelines_path: str = "avixa_guidelines.md"):
+    """
+    NEW: Headless catalog loader (no Streamlit) - returns (df, guidelines, data_issues).
+    Raises FileNotFoundError if the catalog is missing.
+    """
+    data_issues = []
+    df = pd.read_csv(catalog_path)
 
-        # ========== DATA QUALITY FILTERS ==========
-        # Filter out products with zero price
-        initial_count = len(df)
-        df = df[df['price'] > 0].copy()
-        if initial_count > len(df):
-            data_issues.append(f"Removed {initial_count - len(df)} products with a price of $0.")
+    # ========== BULLETPROOF COLUMN NORMALIZATION ==========
 
-        # Filter out low quality products (optional)
-        low_quality_count = len(df[df['data_quality_score'] < 50])
-        if low_quality_count > 0:
-            data_issues.append(f"Found {low_quality_count} products with quality score < 50.")
+    # Handle category column (might be 'category' or 'primary_category')
+    if 'category' not in df.columns:
+        if 'primary_category' in df.columns:
+            df['category'] = df['primary_category']
+            data_issues.append("Renamed 'primary_category' to 'category'")
+        else:
+            df['category'] = 'General AV'
+            data_issues.append("Created default 'category' column")
 
-        # ========== LOAD AVIXA GUIDELINES ==========
-        try:
-            with open("avixa_guidelines.md", "r") as f:
-                guidelines = f.read()
-        except FileNotFoundError:
-            guidelines = "AVIXA guidelines not found."
-            data_issues.append("AVIXA guidelines file missing (avixa_guidelines.md)")
+    # Handle sub_category
+    if 'sub_category' not in df.columns:
+        df['sub_category'] = 'Uncategorized'
+        data_issues.append("Created default 'sub_category' column")
+
+    # Handle price (might be 'price', 'price_usd', or missing)
+    if 'price' not in df.columns:
+        if 'price_usd' in df.columns:
+            df['price'] = df['price_usd']
+        elif 'price_inr' in df.columns:
+            df['price'] = df['price_inr'] / 83.5  # Convert to USD
+        else:
+            df['price'] = 0
+            data_issues.append("Created default 'price' column")
+
+    # Handle specifications (might be 'specifications' or 'full_specifications')
+    if 'specifications' not in df.columns:
+        if 'full_specifications' in df.columns:
+            df['specifications'] = df['full_specifications']
+        else:
+            df['specifications'] = ''
 
-        return df.reset_index(drop=True), guidelines, data_issues
+    # Handle other essential columns with defaults
+    column_defaults = {
+        'name': '',
+        'brand': '',
+        'description': '',
+        'model_number': '',
+        'warranty': 'Not Specified',
+        'lead_time_days': 14,
+        'gst_rate': 18,
+        'image_url': '',
+        'unit_of_measure': 'piece',
+        'data_quality_score': 100
+    }
 
+    for col, default_val in column_defaults.items():
+        if col not in df.columns:
+            df[col] = default_val
+            data_issues.append(f"Created default '{col}' column")
+
+    # ========== DATA TYPE COERCION ==========
+    df['price'] = pd.to_numeric(df['price'], errors='coerce').fillna(0)
+    df['gst_rate'] = pd.to_numeric(df['gst_rate'], errors='coerce').fillna(18)
+    df['lead_time_days'] = pd.to_numeric(df['lead_time_days'], errors='coerce').fillna(14)
+    df['data_quality_score'] = pd.to_numeric(df['data_quality_score'], errors='coerce').fillna(100)
+
+    # String columns
+    df['description'] = df['description'].fillna('')
+    df['specifications'] = df['specifications'].fillna('')
+    df['image_url'] = df['image_url'].fillna('')
+    df['model_number'] = df['model_number'].fillna('')
+    df['warranty'] = df['warranty'].fillna('Not Specified')
+    df['unit_of_measure'] = df['unit_of_measure'].fillna('piece')
+    df['name'] = df['name'].fillna('')
+    df['brand'] = df['brand'].fillna('')
+
+    # Category handling
+    df['category'] = df['category'].fillna('General AV')
+    df['sub_category'] = df['sub_category'].fillna('Needs Classification')
+
+    # ========== DATA QUALITY FILTERS ==========
+    # Filter out products with zero price
+    initial_count = len(df)
+    df = df[df['price'] > 0].copy()
+    if initial_count > len(df):
+        data_issues.append(f"Removed {initial_count - len(df)} products with a price of $0.")
+
+    # Filter out low quality products (optional)
+    low_quality_count = len(df[df['data_quality_score'] < 50])
+    if low_quality_count > 0:
+        data_issues.append(f"Found {low_quality_count} products with quality score < 50.")
+
+    # ========== LOAD AVIXA GUIDELINES ==========
+    try:
+        with open(guidelines_path, "r") as f:
+            guidelines = f.read()
     except FileNotFoundError:
-        st.error("FATAL: 'master_product_catalog.csv' not found. The application cannot start without the product database.")
-        return None, None, ["'master_product_catalog.csv' is missing."]
-    except Exception as e:
-        st.error(f"A critical error occurred during data loading: {e}")
-        traceback.print_exc()
-        return None, None, [f"An unexpected error occurred: {str(e)}"]
+        guidelines = "AVIXA guidelines not found."
+        data_issues.append("AVIXA guidelines file missing (avixa_guidelines.md)")
+
+    return df.reset_index(drop=True), guidelines, data_issues
 
 
 def match_product_in_database(product_name, brand, model_number, product_df):
@@ -0,0 +1,168 @@
+# components/design_sweep.py
+"""
+Design-Space Sweep
+Generates one room's BOQ across a grid of variants (budget tier, display size,
+camera type, VC ecosystem) and returns a side-by-side comparison table.
+
+All variants share one SharedCatalog, the AVIXA memo cache and one
+FilterPlanCache, so candidate filtering for a requirement runs once no matter how
+many variants produce it. Only the order-dependent preference / ecosystem /
+budget stages run per variant.
+"""
+
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable, Sequence
+
+from components.requirements_context import UnifiedRequirementsContext
+from components.intelligent_product_selector import SharedCatalog, FilterPlanCache
+from components.optimized_boq_generator import run_room_generation, RoomBOQResult
+from components.multi_room_generator import _failed_result
+
+# Sweep dimension -> (context section, field)
+SWEEP_DIMENSIONS = {
+    'budget_tier': ('project', 'budget_tier'),
+    'display_size': ('technical', 'display_size_preference'),
+    'camera_type': ('technical', 'camera_type'),
+    'vc_ecosystem': ('brands', 'vc_ecosystem_brand'),
+}
+
+# progress(variant_index, variant_count, label)
+SweepProgressCallback = Callable[[int, int, str], None]
+
+
+@dataclass
+class DesignSweepResult:
+    """Per-variant results plus the comparison table (one row per variant)"""
+    variants: List[Dict[str, Any]]
+    results: List[RoomBOQResult]
+    table: List[Dict[str, Any]]
+    elapsed_ms: float = 0.0
+    filter_cache_hits: int = 0
+    filter_cache_misses: int = 0
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.table)
+
+
+def build_variant_grid(budget_tiers: Optional[Sequence[str]] = None,
+                       display_sizes: Optional[Sequence[Optional[int]]] = None,
+                       camera_types: Optional[Sequence[str]] = None,
+                       vc_ecosystems: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Cartesian product of the given dimensions; omitted dimensions keep the base context value"""
+    axes = {
+        'budget_tier': budget_tiers,
+        'display_size': display_sizes,
+        'camera_type': camera_types,
+        'vc_ecosystem': vc_ecosystems,
+    }
+    axes = {name: list(values) for name, values in axes.items() if values}
+    if not axes:
+        return [{}]
+    names = list(axes)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(axes[n] for n in names))]
+
+
+def variant_label(variant: Dict[str, Any]) -> str:
+    """Short human-readable name, e.g. 'Premium | 85" | PTZ | Cisco'"""
+    parts = []
+    for name in SWEEP_DIMENSIONS:
+        if name not in variant:
+            continue
+        value = variant[name]
+        if name == 'display_size':
+            parts.append(f'{value}"' if value else 'AVIXA size')
+        else:
+            parts.append(str(value))
+    return ' | '.join(parts) or 'Base design'
+
+
+def build_variant_context(base_context: UnifiedRequirementsContext,
+                          variant: Dict[str, Any]) -> UnifiedRequirementsContext:
+    """Fresh copy of the base room context with the variant's overrides applied"""
+    room = base_context.room
+    context = base_context.for_room(
+        room_name=room.room_name,
+        room_type=room.room_type,
+        length_ft=room.length_ft,
+        width_ft=room.width_ft,
+        ceiling_height_ft=room.ceiling_height_ft,
+        seating_capacity=room.seating_capacity
+    )
+    for name, value in variant.items():
+        if name not in SWEEP_DIMENSIONS:
+            raise ValueError(f"Unknown sweep dimension '{name}' (expected one of: {', '.join(SWEEP_DIMENSIONS)})")
+        section, attr = SWEEP_DIMENSIONS[name]
+        setattr(getattr(context, section), attr, value)
+    return context
+
+
+def summarize_variant(variant: Dict[str, Any], result: RoomBOQResult) -> Dict[str, Any]:
+    """One comparison-table row"""
+    validation = result.validation or {}
+    quality = result.quality_score or {}
+    row = {'variant': variant_label(variant)}
+    row.update(variant)
+    row.update({
+        'items': len(result.items),
+        'total_usd': round(sum(float(item.get('price', 0) or 0) * (item.get('quantity', 1) or 0)
+                               for item in result.items), 2),
+        'avixa_compliance': validation.get('compliance_score', 0),
+        'quality_pct': round(quality.get('percentage', 0.0), 1),
+        'grade': quality.get('grade', '-'),
+        'issues': len(validation.get('issues', [])),
+        'warnings': len(validation.get('warnings', [])),
+        'elapsed_ms': round(result.elapsed_ms, 1),
+    })
+    return row
+
+
+def run_design_sweep(base_context: UnifiedRequirementsContext, catalog,
+                     variants: Optional[List[Dict[str, Any]]] = None,
+                     progress: Optional[SweepProgressCallback] = None,
+                     **grid) -> DesignSweepResult:
+    """
+    Generate the base room once per variant and compare the designs.
+
+    Args:
+        base_context: Context for the room being explored (left unmodified)
+        catalog: Product DataFrame or SharedCatalog
+        variants: Explicit variant dicts (SWEEP_DIMENSIONS keys); default is
+            build_variant_grid(**grid), e.g. budget_tiers=[...], display_sizes=[...]
+        progress: Called before each variant
+
+    Returns:
+        DesignSweepResult; table rows are in variant order
+    """
+    start = time.perf_counter()
+    variants = variants if variants is not None else build_variant_grid(**grid)
+    shared = catalog if isinstance(catalog, SharedCatalog) else SharedCatalog(catalog)
+    filter_cache = FilterPlanCache()
+
+    results = []
+    for i, variant in enumerate(variants):
+        if progress:
+            progress(i, len(variants), variant_label(variant))
+        context = build_variant_context(base_context, variant)
+        try:
+            # Swept camera types switch between the video bar and the codec + PTZ design
+            results.append(run_room_generation(context, shared, filter_cache=filter_cache,
+                                               camera_selects_codec='camera_type' in variant))
+        except Exception as e:
+            results.append(_failed_result(context, e))
+
+    # Per-variant results keep only what the table and a follow-up export need
+    for result in results:
+        result.selector = None
+        result.generator = None
+
+    return DesignSweepResult(
+        variants=variants,
+        results=results,
+        table=[summarize_variant(v, r) for v, r in zip(variants, results)],
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+        filter_cache_hits=filter_cache.hits,
+        filter_cache_misses=filter_cache.misses
+    )
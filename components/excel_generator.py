@@ -2,24 +2,67 @@
 # PRODUCTION VERSION - Matches AllWave AV company format
 
 import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.drawing.image import Image as ExcelImage
+from openpyxl.styles.named_styles import NamedStyleList
 from openpyxl.utils import get_column_letter
+from openpyxl.utils.indexed_list import IndexedList
+from copy import copy
 from io import BytesIO
+import hashlib
+import json
+import os
 import re
+import tempfile
+import threading
 from datetime import datetime
+from functools import lru_cache
+
+from components.project_totals import compute_project_totals, compute_room_totals
+
+# Projects with at least this many rooms should use write_company_excel_streaming()
+STREAMING_ROOM_THRESHOLD = 50
+
+# Company workbook template shipped with the app (template_path=DEFAULT_TEMPLATE_PATH)
+DEFAULT_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     'Design BOQ Format_2025.xlsx')
 
 # Import the image generator
 try:
-    from components.product_image_generator import generate_product_info_card, extract_display_size
+    from components.product_image_generator import (
+        get_product_card_png, extract_display_size, prerender_product_cards, product_card_key
+    )
 except ImportError:
     # Fallback if import fails
-    def generate_product_info_card(*args, **kwargs):
+    def get_product_card_png(*args, **kwargs):
+        return None
+    def prerender_product_cards(*args, **kwargs):
+        return {}
+    def product_card_key(*args, **kwargs):
         return None
     def extract_display_size(name):
         return None
 
 
+def _product_card_spec(item):
+    """Product info-card arguments for a BOQ line item"""
+    # Extract display size if applicable
+    size_inches = None
+    if item.get('category') == 'Displays':
+        size_inches = extract_display_size(item.get('name', ''))
+    return {
+        'product_name': item.get('name', 'Unknown Product'),
+        'brand': item.get('brand', 'N/A'),
+        'model': item.get('model_number', 'N/A'),
+        'category': item.get('category', 'General AV'),
+        'size_inches': size_inches,
+    }
+
+
 # ==================== STYLE DEFINITIONS ====================
 def _define_styles():
     """Defines all necessary styles for the professional report."""
@@ -43,11 +86,119 @@ def _define_styles():
     }
 
 
+# ==================== NAMED STYLE REGISTRY ====================
+# Room BOQ sheet column alignment (A..P): Sr. No / Qty centred, Top 3 Reasons wrapped
+_BOQ_COLUMN_ALIGN = ['center', 'top', 'top', 'top', 'center'] + ['top'] * 9 + ['wrap', 'top']
+_BOQ_CURRENCY_COLUMNS = (6, 7, 10, 12, 13, 14)  # Unit rate, total, SGST/CGST amt, total tax, amount
+
+
+def _boq_row_styles(kind, currency_columns=()):
+    """Named style per column (A..P) for one room BOQ row kind"""
+    return [
+        f"{kind}_currency" if col in currency_columns else f"{kind}_{align}"
+        for col, align in enumerate(_BOQ_COLUMN_ALIGN, 1)
+    ]
+
+
+BOQ_ITEM_ROW_STYLES = _boq_row_styles('boq_cell', _BOQ_CURRENCY_COLUMNS)
+BOQ_BLANK_ROW_STYLES = _boq_row_styles('boq_cell')
+BOQ_CATEGORY_ROW_STYLES = _boq_row_styles('boq_category')
+BOQ_TOTAL_ROW_STYLES = _boq_row_styles('boq_total', (13, 14))
+PROPOSAL_ROW_STYLES = ['proposal_center', 'proposal_left', 'proposal_center'] + ['proposal_currency'] * 4
+EXEC_ROOM_ROW_STYLES = ['summary_center', 'summary_center'] + ['summary_currency'] * 4
+
+
+def _named_style_specs(styles):
+    """NamedStyle name -> attributes, built from _define_styles()"""
+    border = styles['thin_border']
+    currency = styles['currency_format']
+    white_fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
+    total_fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+    total_font = Font(bold=True, size=11)
+    boq_align = {
+        'top': Alignment(vertical='top'),
+        'center': Alignment(horizontal='center', vertical='top'),
+        'wrap': Alignment(wrap_text=True, vertical='top'),
+    }
+    boq_kinds = {
+        'boq_cell': {'border': border},
+        'boq_category': {'fill': styles['boq_category_fill'], 'font': Font(bold=True, color="000000"),
+                         'border': border},
+        'boq_total': {'fill': total_fill, 'font': total_font, 'border': border},
+    }
+
+    specs = {
+        'bordered': {'border': border},
+        'bold_label': {'font': styles['bold_font']},
+        'boq_info_label': {'font': styles['bold_font'], 'fill': styles['header_light_green_fill'], 'border': border},
+        'boq_table_header': {'fill': styles['table_header_blue_fill'], 'font': styles['bold_font'], 'border': border,
+                             'alignment': Alignment(horizontal='center', vertical='center', wrap_text=True)},
+        'summary_header': {'fill': styles['table_header_blue_fill'], 'font': styles['bold_font'], 'border': border,
+                           'alignment': Alignment(horizontal='center', vertical='center')},
+        'summary_header_wrap': {'fill': styles['table_header_blue_fill'], 'font': styles['bold_font'], 'border': border,
+                                'alignment': Alignment(horizontal='center', vertical='center', wrap_text=True)},
+        'summary_subheader': {'fill': styles['header_light_green_fill'], 'font': styles['bold_font'], 'border': border,
+                              'alignment': Alignment(horizontal='center', vertical='center')},
+        'section_banner': {'fill': styles['table_header_blue_fill'], 'font': Font(bold=True, color="FFFFFF"),
+                           'alignment': Alignment(horizontal='center', vertical='center')},
+        'summary_center': {'border': border, 'alignment': Alignment(horizontal='center', vertical='center')},
+        'summary_currency': {'border': border, 'number_format': currency,
+                             'alignment': Alignment(horizontal='right', vertical='center')},
+        'proposal_center': {'border': border, 'fill': white_fill,
+                            'alignment': Alignment(horizontal='center', vertical='center')},
+        'proposal_left': {'border': border, 'fill': white_fill,
+                          'alignment': Alignment(horizontal='left', vertical='center')},
+        'proposal_currency': {'border': border, 'fill': white_fill, 'number_format': currency,
+                              'alignment': Alignment(horizontal='right', vertical='center')},
+        'proposal_total_label': {'font': Font(bold=True, size=12), 'fill': total_fill, 'border': border,
+                                 'alignment': Alignment(horizontal='center', vertical='center')},
+        'exec_total_label': {'font': Font(bold=True, size=12), 'fill': total_fill, 'border': border},
+        'summary_total': {'font': total_font, 'fill': total_fill, 'border': border},
+        'summary_total_currency': {'font': total_font, 'fill': total_fill, 'border': border, 'number_format': currency,
+                                   'alignment': Alignment(horizontal='right', vertical='center')},
+        'terms_cell': {'border': border, 'alignment': Alignment(wrap_text=True, vertical='center')},
+        'terms_header': {'font': styles['bold_font'], 'fill': styles['header_light_green_fill'], 'border': border,
+                         'alignment': Alignment(wrap_text=True, vertical='center')},
+    }
+    for kind, attrs in boq_kinds.items():
+        for align, alignment in boq_align.items():
+            specs[f"{kind}_{align}"] = dict(attrs, alignment=alignment)
+        specs[f"{kind}_currency"] = dict(attrs, alignment=boq_align['top'], number_format=currency)
+    return specs
+
+
+def _ensure_named_styles(workbook, styles):
+    """
+    NEW: Register the report's named styles once per workbook. Cells then take a
+    style by name (one shared style id) instead of fresh Font/Fill/Alignment objects.
+    """
+    if 'boq_cell_top' in workbook.named_styles:
+        return
+    for name, attrs in _named_style_specs(styles).items():
+        # Unset font/border stay the workbook defaults (Calibri 11, no border), as on plain cells
+        defaults = {'font': copy(DEFAULT_FONT), 'border': copy(DEFAULT_BORDER)}
+        workbook.add_named_style(NamedStyle(name=name, **dict(defaults, **attrs)))
+
+
+def _style_row(sheet, row, style_names, min_col=1):
+    """Apply one named style per column along a row (None leaves the cell alone)"""
+    for col, name in enumerate(style_names, min_col):
+        if name:
+            sheet.cell(row=row, column=col).style = name
+
+
 # ==================== HEADER WITH LOGOS ====================
+@lru_cache(maxsize=32)
+def _logo_bytes(image_path):
+    """Logo file contents, read once per process"""
+    with open(image_path, 'rb') as f:
+        return f.read()
+
+
 def _add_image_to_cell(sheet, image_path, cell, height_px):
     """Adds a logo to a cell, preserving aspect ratio."""
     try:
-        img = ExcelImage(image_path)
+        img = ExcelImage(BytesIO(_logo_bytes(image_path)))
         img.height = height_px
         img.width = (img.width / img.height) * height_px
         sheet.add_image(img, cell)
@@ -153,6 +304,8 @@ def _add_version_control_sheet(workbook, project_details, styles):
         else:
             sheet[f'F{row}'].alignment = Alignment(vertical='center') # ADD THIS LINE
 
+    return sheet
+
 
 # ==================== TERMS & CONDITIONS SHEET ====================
 def _add_terms_and_conditions_sheet(workbook, styles):
@@ -438,12 +591,22 @@ def _add_terms_and_conditions_sheet(workbook, styles):
             sheet.row_dimensions[row_cursor].height = 15
         row_cursor += 1
 
+    return sheet
+
 
 # ==================== ROOM BOQ SHEET ====================
-def _populate_room_boq_sheet(sheet, items, room_name, styles, usd_to_inr_rate, gst_rates):
+def _populate_room_boq_sheet(sheet, items, room_name, styles, usd_to_inr_rate, gst_rates,
+                             include_product_images=True, room_totals=None, product_cards=None):
     """
     Creates detailed BOQ sheet with PRODUCT IMAGES and TOP 3 REASONS columns.
+    include_product_images=False leaves the image column empty (faster export).
+    product_cards: {product_card_key: PNG bytes} pre-rendered for this export.
+    ENHANCED: Rows are styled once, through the workbook's named styles.
+    ENHANCED: Amounts come from room_totals (project_totals.RoomTotals), computed here if not given.
     """
+    if room_totals is None:
+        room_totals = compute_room_totals(items, usd_to_inr_rate, gst_rates, room_name)
+    _ensure_named_styles(sheet.parent, styles)
     _create_sheet_header(sheet)
     
     # === ROOM INFO SECTION ===
@@ -457,12 +620,9 @@ def _populate_room_boq_sheet(sheet, items, room_name, styles, usd_to_inr_rate, g
     for i, (label, value) in enumerate(info_data):
         row = i + 3
         sheet[f'A{row}'].value = label
-        sheet[f'A{row}'].font = styles['bold_font']
-        sheet[f'A{row}'].fill = styles['header_light_green_fill'] # ADDED THIS LINE
         sheet.merge_cells(f'B{row}:C{row}')
         sheet[f'B{row}'].value = value
-        for col in ['A', 'B', 'C']:
-            sheet[f'{col}{row}'].border = styles['thin_border']
+        _style_row(sheet, row, ('boq_info_label', 'bordered', 'bordered'))
 
     sheet.append([])  # Spacer row
 
@@ -496,27 +656,17 @@ def _populate_room_boq_sheet(sheet, items, room_name, styles, usd_to_inr_rate, g
     # Merge GST header cells
     sheet.merge_cells(f'I{header_start_row}:J{header_start_row}')
     sheet.merge_cells(f'K{header_start_row}:L{header_start_row}')
-    # ADDED - Explicit alignment for merged cells
-    sheet[f'I{header_start_row}'].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    sheet[f'K{header_start_row}'].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
 
     # Style headers
-    for row in sheet.iter_rows(min_row=header_start_row, max_row=sheet.max_row):
-        for cell in row:
-            if cell.value is not None:
-                cell.fill = styles["table_header_blue_fill"]
-                cell.font = styles['bold_font']
-                cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                cell.border = styles['thin_border']
+    _style_row(sheet, header_start_row, ['boq_table_header' if h is not None else None for h in headers1])
+    _style_row(sheet, header_start_row + 1, ['boq_table_header' if h is not None else None for h in headers2])
     
     # === GROUP ITEMS BY CATEGORY ===
     grouped_items = {}
-    for item in items:
+    for item, line in zip(items, room_totals.lines):
         cat = item.get('category', 'General AV')
-        grouped_items.setdefault(cat, []).append(item)
+        grouped_items.setdefault(cat, []).append((item, line))
 
-    total_before_gst_hardware = 0
-    total_gst_hardware = 0
     item_s_no = 1
     category_letters = [chr(ord('A') + i) for i in range(len(grouped_items))]
 
@@ -526,25 +676,10 @@ def _populate_room_boq_sheet(sheet, items, room_name, styles, usd_to_inr_rate, g
         sheet.append([category_letters[i], category])
         cat_row_idx = sheet.max_row
         sheet.merge_cells(f'B{cat_row_idx}:P{cat_row_idx}')  # Extended to include new column
-        for cell in sheet[cat_row_idx]:
-            cell.fill = styles['boq_category_fill']
-            cell.font = Font(bold=True, color="000000") # CHANGED - Explicit font color
-            cell.border = styles['thin_border']
+        _style_row(sheet, cat_row_idx, BOQ_CATEGORY_ROW_STYLES)
         
         # Individual items
-        for item in cat_items:
-            unit_price_inr = item.get('price', 0) * usd_to_inr_rate
-            subtotal = unit_price_inr * item.get('quantity', 1)
-            gst_rate = item.get('gst_rate', gst_rates.get('Electronics', 18))
-            sgst_rate = cgst_rate = gst_rate / 2
-            sgst_amount = subtotal * (sgst_rate / 100)
-            cgst_amount = subtotal * (cgst_rate / 100)
-            total_tax = sgst_amount + cgst_amount
-            total_with_gst = subtotal + total_tax
-            
-            total_before_gst_hardware += subtotal
-            total_gst_hardware += total_tax
-
+        for item, line in cat_items:
             # === GET TOP 3 REASONS (Already extracted during BOQ generation) ===
             reasons = item.get('top_3_reasons', [])
 
@@ -562,90 +697,66 @@ def _populate_room_boq_sheet(sheet, items, room_name, styles, usd_to_inr_rate, g
                 item.get('brand', 'Unknown'),
                 item.get('model_number', 'N/A'),
                 item.get('quantity', 1),
-                unit_price_inr,
-                subtotal,
+                line.unit_price_inr,
+                line.subtotal,
                 item.get('warranty', 'Not Specified'),
-                f"{sgst_rate}%", sgst_amount,
-                f"{cgst_rate}%", cgst_amount,
-                total_tax, 
-                total_with_gst,
+                f"{line.sgst_rate}%", line.sgst_amount,
+                f"{line.cgst_rate}%", line.cgst_amount,
+                line.total_tax, 
+                line.total_with_gst,
                 top_3_reasons,
                 ''  # Image column MOVED TO END (will be populated separately)
             ]
             
             sheet.append(row_data)
             current_row = sheet.max_row
+            _style_row(sheet, current_row, BOQ_ITEM_ROW_STYLES)
             
             # === ADD PRODUCT IMAGE ===
-            try:
-                # Extract display size if applicable
-                size_inches = None
-                if item.get('category') == 'Displays':
-                    size_inches = extract_display_size(item.get('name', ''))
-                
-                # Generate product info card
-                img_buffer = generate_product_info_card(
-                    product_name=item.get('name', 'Unknown Product'),
-                    brand=item.get('brand', 'N/A'),
-                    model=item.get('model_number', 'N/A'),
-                    category=item.get('category', 'General AV'),
-                    size_inches=size_inches
-                )
+            if include_product_images:
+                try:
+                    # Product info card (pre-rendered by generate_company_excel)
+                    card_spec = _product_card_spec(item)
+                    card_png = ((product_cards or {}).get(product_card_key(**card_spec))
+                                or get_product_card_png(**card_spec))
                 
-                if img_buffer:
-                    # CRITICAL: Ensure buffer is at position 0
-                    img_buffer.seek(0)
+                    if card_png:
+                        # Fresh stream per image - openpyxl reads it when the workbook is saved
+                        excel_img = ExcelImage(BytesIO(card_png))
+                        # Scale to fit Excel cell
+                        excel_img.width = 150
+                        excel_img.height = 100
                     
-                    excel_img = ExcelImage(img_buffer)
-                    # Scale to fit Excel cell
-                    excel_img.width = 150
-                    excel_img.height = 100
+                        # CRITICAL: Anchor properly to cell
+                        cell_anchor = f'P{current_row}'
+                        sheet.add_image(excel_img, cell_anchor)
                     
-                    # CRITICAL: Anchor properly to cell
-                    cell_anchor = f'P{current_row}'
-                    sheet.add_image(excel_img, cell_anchor)
+                        # CRITICAL: Set row height AFTER adding image
+                        sheet.row_dimensions[current_row].height = 85 # INCREASED from 80
                     
-                    # CRITICAL: Set row height AFTER adding image
-                    sheet.row_dimensions[current_row].height = 85 # INCREASED from 80
+                        print(f"DEBUG: Added image for {item.get('name', 'Unknown')[:30]}")
+                    else:
+                        print(f"DEBUG: No image buffer generated for {item.get('name', 'Unknown')}")
                     
-                    print(f"DEBUG: Added image for {item.get('name', 'Unknown')[:30]}")
-                else:
-                    print(f"DEBUG: No image buffer generated for {item.get('name', 'Unknown')}")
-                    
-            except Exception as e:
-                # Fail gracefully - don't break BOQ generation
-                print(f"ERROR: Could not add product image for {item.get('name', 'Unknown')}: {e}")
-                import traceback
-                traceback.print_exc()
+                except Exception as e:
+                    # Fail gracefully - don't break BOQ generation
+                    print(f"ERROR: Could not add product image for {item.get('name', 'Unknown')}: {e}")
+                    import traceback
+                    traceback.print_exc()
             
             item_s_no += 1
 
     # === ADD SERVICES (Installation, Warranty, PM) ===
-    services = [
-        ("Installation & Commissioning", 0.15),
-        ("System Warranty (3 Years)", 0.05),
-        ("Project Management", 0.10)
-    ]
+    services = room_totals.services
     services_letter = chr(ord('A') + len(grouped_items))
-    services_gst_rate = gst_rates.get('Services', 18)
 
-    if services and total_before_gst_hardware > 0:
+    if services and room_totals.hardware_subtotal > 0:
         sheet.append([services_letter, "Services"])
         cat_row_idx = sheet.max_row
         sheet.merge_cells(f'B{cat_row_idx}:P{cat_row_idx}')
-        for cell in sheet[cat_row_idx]:
-            cell.fill = styles['boq_category_fill']
-            cell.font = styles['bold_font']
-            cell.border = styles['thin_border']
-
-        for service_name, percentage in services:
-            service_amount_inr = total_before_gst_hardware * percentage
-            sgst_rate = cgst_rate = services_gst_rate / 2
-            service_sgst = service_amount_inr * (sgst_rate / 100)
-            service_cgst = service_amount_inr * (cgst_rate / 100)
-            service_total_tax = service_sgst + service_cgst
-            service_total = service_amount_inr + service_total_tax
-            
+        _style_row(sheet, cat_row_idx, BOQ_CATEGORY_ROW_STYLES)
+
+        for service in services:
             service_reasons = {
                 "Installation & Commissioning": "1. Professional on-site installation\n2. System configuration and testing\n3. Integration with existing infrastructure",
                 "System Warranty (3 Years)": "1. Comprehensive parts and labor coverage\n2. Priority support and rapid response\n3. Regular maintenance and health checks",
@@ -654,55 +765,41 @@ def _populate_room_boq_sheet(sheet, items, room_name, styles, usd_to_inr_rate, g
             
             row_data = [
                 item_s_no, 
-                service_name, 
+                service.name, 
                 "AllWave AV", 
                 "Professional Service", 
                 1,
-                service_amount_inr, 
-                service_amount_inr, 
+                service.amount, 
+                service.amount, 
                 "As per terms", 
-                f"{sgst_rate}%", service_sgst, 
-                f"{cgst_rate}%", service_cgst,
-                service_total_tax, 
-                service_total,
-                service_reasons.get(service_name, "Standard professional service"),
+                f"{service.sgst_rate}%", service.sgst_amount, 
+                f"{service.cgst_rate}%", service.cgst_amount,
+                service.total_tax, 
+                service.total,
+                service_reasons.get(service.name, "Standard professional service"),
                 ''  # No image for services
             ]
             sheet.append(row_data)
-            # ADDED - Styling for service reasons column
             current_service_row = sheet.max_row
-            sheet[f'O{current_service_row}'].alignment = Alignment(wrap_text=True, vertical='top')
+            _style_row(sheet, current_service_row, BOQ_ITEM_ROW_STYLES)
             sheet.row_dimensions[current_service_row].height = 60
             
             item_s_no += 1
             
     # === ADD TOTALS ROW ===
+    spacer_row = sheet.max_row + 1
     sheet.append([]) # Add spacing
-    
-    # Calculate BOQ totals
-    total_before_tax = total_before_gst_hardware + (total_before_gst_hardware * 0.30)  # Hardware + Services
-    total_tax_amount = total_gst_hardware + (total_before_gst_hardware * 0.30 * (gst_rates.get('Services', 18) / 100))
-    grand_total_boq = total_before_tax + total_tax_amount
+    _style_row(sheet, spacer_row, BOQ_BLANK_ROW_STYLES)
     
     # Merge cells for "GRAND TOTAL" label
     sheet.append(['', 'GRAND TOTAL', '', '', '', '', '', '', '', '', '', '', '', '', '', ''])
     totals_row = sheet.max_row
     sheet.merge_cells(f'B{totals_row}:H{totals_row}')
     
-    # Style the totals row
-    for cell in sheet[totals_row]:
-        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-        cell.font = Font(bold=True, size=11)
-        cell.border = styles['thin_border']
-    
-    # Add total values
-    sheet[f'M{totals_row}'].value = total_tax_amount
-    sheet[f'M{totals_row}'].number_format = styles['currency_format']
-    sheet[f'M{totals_row}'].alignment = Alignment(horizontal='right', vertical='center')
-    
-    sheet[f'N{totals_row}'].value = grand_total_boq
-    sheet[f'N{totals_row}'].number_format = styles['currency_format']
-    sheet[f'N{totals_row}'].alignment = Alignment(horizontal='right', vertical='center')
+    # Add total values and style the totals row
+    sheet[f'M{totals_row}'].value = room_totals.gst
+    sheet[f'N{totals_row}'].value = room_totals.total
+    _style_row(sheet, totals_row, BOQ_TOTAL_ROW_STYLES)
     
     sheet.row_dimensions[totals_row].height = 25
 
@@ -728,23 +825,6 @@ def _populate_room_boq_sheet(sheet, items, room_name, styles, usd_to_inr_rate, g
     
     for col, width in column_widths.items():
         sheet.column_dimensions[col].width = width
-    
-    # === APPLY BORDERS AND NUMBER FORMATS ===
-    for row in sheet.iter_rows(min_row=header_start_row + 2):
-        for cell in row:
-            # Currency formatting for price columns
-            if cell.column >= 6 and cell.column <= 14 and isinstance(cell.value, (int, float)):
-                cell.number_format = styles['currency_format']
-            
-            cell.border = styles['thin_border']
-            
-            # Center align specific columns
-            if cell.column in [1, 5]:  # Sr. No and Qty
-                cell.alignment = Alignment(horizontal='center', vertical='top')
-            elif cell.column == 15:  # Top 3 Reasons - wrap text
-                cell.alignment = Alignment(wrap_text=True, vertical='top')
-            else:
-                cell.alignment = Alignment(vertical='top')
 
 
 # ==================== SCOPE OF WORK SHEET ====================
@@ -841,13 +921,18 @@ def _add_scope_of_work_sheet(workbook, styles):
         sheet.row_dimensions[row_cursor].height = 25
         row_cursor += 1
 
+    return sheet
+
 
 # ==================== PROPOSAL SUMMARY SHEET (FIXED VERSION) ====================
-def _add_proposal_summary_sheet(workbook, rooms_data, project_details, styles):
+def _add_proposal_summary_sheet(workbook, rooms_data, project_details, styles, totals):
     """
     Creates the Proposal Summary sheet with FULL CALCULATIONS from BOQ sheets.
     Now includes PSNI/Client Type highlights.
+    ENHANCED: Table rows are styled through the workbook's named styles.
+    ENHANCED: Figures come from totals (the shared ProjectTotals - same numbers as the BOQ sheets).
     """
+    _ensure_named_styles(workbook, styles)
     sheet = workbook.create_sheet(title="Proposal Summary", index=3) # CHANGED index from 2 to 3
     _create_sheet_header(sheet)
     sheet.sheet_view.showGridLines = False
@@ -882,12 +967,8 @@ def _add_proposal_summary_sheet(workbook, rooms_data, project_details, styles):
     # === TABLE HEADERS (ROW 1) ===
     headers_row1 = ['Sr. No', 'Description', 'Total Qty', '', 'INR Supply', '', '']
     for col_idx, header in enumerate(headers_row1, 1):
-        cell = sheet.cell(row=row_cursor, column=col_idx)
-        cell.value = header
-        cell.fill = styles['table_header_blue_fill']
-        cell.font = styles['bold_font']
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.border = styles['thin_border']
+        sheet.cell(row=row_cursor, column=col_idx).value = header
+    _style_row(sheet, row_cursor, ['summary_header'] * len(headers_row1))
     
     # Merge "INR Supply" across columns D-G
     sheet.merge_cells(f'D{row_cursor}:G{row_cursor}')
@@ -896,74 +977,29 @@ def _add_proposal_summary_sheet(workbook, rooms_data, project_details, styles):
     # === TABLE HEADERS (ROW 2 - Sub-headers) ===
     headers_row2 = ['', '', '', 'Rate w/o TAX', 'Amount w/o TAX', 'Total TAX Amount', 'Amount with Tax']
     for col_idx, header in enumerate(headers_row2, 1):
-        cell = sheet.cell(row=row_cursor, column=col_idx)
-        cell.value = header
-        cell.fill = styles['table_header_blue_fill']
-        cell.font = styles['bold_font']
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        cell.border = styles['thin_border']
+        sheet.cell(row=row_cursor, column=col_idx).value = header
+    _style_row(sheet, row_cursor, ['summary_header_wrap'] * len(headers_row2))
     
     sheet.row_dimensions[row_cursor].height = 30  # Extra height for wrapped text
     row_cursor += 1
     
-    # === ROOM DATA WITH CALCULATIONS ===
-    grand_subtotal = 0
-    grand_tax = 0
-    grand_total = 0
-    
-    for idx, room in enumerate(rooms_data, 1):
-        # Calculate room totals (these should already be in room dict from main function)
-        room_subtotal = room.get('subtotal', 0)
-        room_tax = room.get('gst', 0)
-        room_total = room.get('total', 0)
-        
-        # Fallback calculation if totals weren't pre-calculated
-        if room_subtotal == 0 and room.get('boq_items'):
-            try:
-                from components.boq_generator import boq_to_dataframe, calculate_boq_summary
-                boq_df = boq_to_dataframe(room['boq_items'])
-                summary = calculate_boq_summary(boq_df)
-                room_subtotal = summary.get('subtotal', 0)
-                room_tax = summary.get('total_gst', 0)
-                room_total = summary.get('grand_total', 0)
-            except ImportError:
-                pass
-
-        grand_subtotal += room_subtotal
-        grand_tax += room_tax
-        grand_total += room_total
-        
-        # Calculate average rate (Amount / Quantity)
-        total_qty = sum(item.get('quantity', 1) for item in room.get('boq_items', []))
-        avg_rate = room_subtotal / total_qty if total_qty > 0 else room_subtotal
-        
-        # Populate row
+    # === ROOM DATA ===
+    for idx, (room, room_totals) in enumerate(zip(rooms_data, totals.rooms), 1):
+        # Populate row (rate = Amount / Quantity)
         row_data = [
             idx,
             room.get('name', f'Room {idx}'),
-            total_qty,
-            avg_rate,
-            room_subtotal,
-            room_tax,
-            room_total
+            room_totals.total_qty,
+            room_totals.avg_rate,
+            room_totals.subtotal,
+            room_totals.gst,
+            room_totals.total
         ]
         
         for col_idx, value in enumerate(row_data, 1):
-            cell = sheet.cell(row=row_cursor, column=col_idx)
-            cell.value = value
-            cell.border = styles['thin_border']
-            cell.fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid") # ADD THIS LINE
-            
-            # Apply number formatting to currency columns
-            if col_idx >= 4: # Rate and all amount columns
-                cell.number_format = styles['currency_format']
-                cell.alignment = Alignment(horizontal='right', vertical='center')
-            elif col_idx == 1: # Sr. No
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-            elif col_idx == 3: # Qty
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-            else: # Description
-                cell.alignment = Alignment(horizontal='left', vertical='center')
+            sheet.cell(row=row_cursor, column=col_idx).value = value
+        # Sr. No / Qty centred, description left, rate and amounts as currency
+        _style_row(sheet, row_cursor, PROPOSAL_ROW_STYLES)
         
         sheet.row_dimensions[row_cursor].height = 20 # ADD THIS LINE for consistency
         row_cursor += 1
@@ -975,29 +1011,21 @@ def _add_proposal_summary_sheet(workbook, rooms_data, project_details, styles):
     sheet.merge_cells(f'A{row_cursor}:C{row_cursor}')
     total_label_cell = sheet[f'A{row_cursor}']
     total_label_cell.value = "GRAND TOTAL"
-    total_label_cell.font = Font(bold=True, size=12)
-    total_label_cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid") # CHANGED COLOR
-    total_label_cell.alignment = Alignment(horizontal='center', vertical='center')
-    total_label_cell.border = styles['thin_border']
+    total_label_cell.style = 'proposal_total_label'
     
     # Add grand totals to columns D-G
     grand_total_data = [
         '',  # Rate w/o TAX (not applicable for total)
-        grand_subtotal,
-        grand_tax,
-        grand_total
+        totals.subtotal,
+        totals.gst,
+        totals.total
     ]
     
     for col_idx, value in enumerate(grand_total_data, 4):
         cell = sheet.cell(row=row_cursor, column=col_idx)
         cell.value = value
-        cell.font = Font(bold=True, size=11)
-        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid") # CHANGED COLOR
-        cell.border = styles['thin_border']
-        
-        if value:  # Only format if not empty
-            cell.number_format = styles['currency_format']
-            cell.alignment = Alignment(horizontal='right', vertical='center')
+        # Only format as currency if not empty
+        cell.style = 'summary_total_currency' if value else 'summary_total'
     
     sheet.row_dimensions[row_cursor].height = 25
     
@@ -1040,8 +1068,7 @@ def _add_proposal_summary_sheet(workbook, rooms_data, project_details, styles):
     ct_header.alignment = Alignment(horizontal='center', vertical='center')
     ct_header.border = styles['thin_border']
     # ADD BORDERS TO MERGED CELLS
-    for col in ['B', 'C', 'D', 'E', 'F', 'G']:
-        sheet[f'{col}{row_cursor}'].border = styles['thin_border']
+    _style_row(sheet, row_cursor, ['bordered'] * 6, min_col=2)
     row_cursor += 1
     
     # Add basic commercial terms
@@ -1065,35 +1092,29 @@ def _add_proposal_summary_sheet(workbook, rooms_data, project_details, styles):
             continue
         
         sheet.merge_cells(f'A{row_cursor}:E{row_cursor}')
-        label_cell = sheet[f'A{row_cursor}']
-        label_cell.value = term_label
-        label_cell.border = styles['thin_border']
-        label_cell.alignment = Alignment(wrap_text=True, vertical='center')
-        # ADD BORDERS TO MERGED CELLS
-        for col in ['B', 'C', 'D', 'E']:
-            sheet[f'{col}{row_cursor}'].border = styles['thin_border']
-        
-        if is_header:
-            label_cell.font = styles['bold_font']
-            label_cell.fill = styles['header_light_green_fill']
-        
+        sheet[f'A{row_cursor}'].value = term_label
         sheet.merge_cells(f'F{row_cursor}:G{row_cursor}')
-        value_cell = sheet[f'F{row_cursor}']
-        value_cell.value = term_value
-        value_cell.border = styles['thin_border']
-        value_cell.alignment = Alignment(wrap_text=True, vertical='center')
-        sheet[f'G{row_cursor}'].border = styles['thin_border'] # ADD THIS
+        sheet[f'F{row_cursor}'].value = term_value
+        # Label (A:E) and value (F:G) cells, with borders on the merged cells
+        _style_row(sheet, row_cursor, [
+            'terms_header' if is_header else 'terms_cell', 'bordered', 'bordered', 'bordered', 'bordered',
+            'terms_cell', 'bordered'
+        ])
         
         sheet.row_dimensions[row_cursor].height = 20 if len(term_label) < 50 else 30
         row_cursor += 1
 
+    return sheet
+
 
 # ==================== EXECUTIVE SUMMARY SHEET (NEW) ====================
-def generate_budget_summary_sheet(workbook, rooms_data, project_details, styles):
+def generate_budget_summary_sheet(workbook, rooms_data, project_details, styles, totals):
     """
     Create executive-level budget summary (1-page overview)
+    ENHANCED: Table rows are styled through the workbook's named styles.
+    ENHANCED: Figures come from totals (the shared ProjectTotals - same numbers as the BOQ sheets).
     """
-    
+    _ensure_named_styles(workbook, styles)
     sheet = workbook.create_sheet(title="Executive Summary", index=1)
     _create_sheet_header(sheet)
     sheet.sheet_view.showGridLines = False
@@ -1104,9 +1125,7 @@ def generate_budget_summary_sheet(workbook, rooms_data, project_details, styles)
     sheet.merge_cells(f'A{row}:F{row}')
     header = sheet[f'A{row}']
     header.value = "PROJECT OVERVIEW"
-    header.fill = styles['table_header_blue_fill']
-    header.font = Font(bold=True, color="FFFFFF")
-    header.alignment = Alignment(horizontal='center', vertical='center')
+    header.style = 'section_banner'
     row += 2
     
     overview_data = [
@@ -1119,7 +1138,7 @@ def generate_budget_summary_sheet(workbook, rooms_data, project_details, styles)
     
     for label, value in overview_data:
         sheet[f'A{row}'] = label
-        sheet[f'A{row}'].font = styles['bold_font']
+        sheet[f'A{row}'].style = 'bold_label'
         sheet.merge_cells(f'B{row}:F{row}')
         sheet[f'B{row}'] = value
         row += 1
@@ -1130,62 +1149,30 @@ def generate_budget_summary_sheet(workbook, rooms_data, project_details, styles)
     sheet.merge_cells(f'A{row}:F{row}')
     header = sheet[f'A{row}']
     header.value = "BUDGET BREAKDOWN BY SPACE"
-    header.fill = styles['table_header_blue_fill']
-    header.font = Font(bold=True, color="FFFFFF")
-    header.alignment = Alignment(horizontal='center', vertical='center')
+    header.style = 'section_banner'
     row += 1
     
     # Table headers
     headers = ['Room Name', 'Area (sqft)', 'Equipment Cost', 'Services', 'Tax', 'Total']
     for col_idx, header_text in enumerate(headers, 1):
-        cell = sheet.cell(row=row, column=col_idx)
-        cell.value = header_text
-        cell.fill = styles['header_light_green_fill']
-        cell.font = styles['bold_font']
-        cell.border = styles['thin_border']
-        cell.alignment = Alignment(horizontal='center', vertical='center')
+        sheet.cell(row=row, column=col_idx).value = header_text
+    _style_row(sheet, row, ['summary_subheader'] * len(headers))
     row += 1
     
     # Room data
-    grand_equipment = 0
-    grand_services = 0
-    grand_tax = 0
-    grand_total = 0
-    
-    for room in rooms_data:
-        # Based on services being 30% of hardware cost, subtotal = 1.3 * hardware
-        # Hardware = subtotal / 1.3 ~= subtotal * 0.77
-        # Services = (subtotal / 1.3) * 0.3 ~= subtotal * 0.23
-        equipment_cost = room.get('subtotal', 0) / 1.30
-        services_cost = equipment_cost * 0.30
-        tax = room.get('gst', 0)
-        total = room.get('total', 0)
-        
-        grand_equipment += equipment_cost
-        grand_services += services_cost
-        grand_tax += tax
-        grand_total += total
-        
+    for room, room_totals in zip(rooms_data, totals.rooms):
         room_data = [
             room.get('name', 'Unknown'),
             f"{room.get('area', 0):.0f}",
-            equipment_cost,
-            services_cost,
-            tax,
-            total
+            room_totals.hardware_subtotal,
+            room_totals.services_total,
+            room_totals.gst,
+            room_totals.total
         ]
         
         for col_idx, value in enumerate(room_data, 1):
-            cell = sheet.cell(row=row, column=col_idx)
-            cell.value = value
-            cell.border = styles['thin_border']
-            
-            if col_idx >= 3:
-                cell.number_format = styles['currency_format']
-                cell.alignment = Alignment(horizontal='right', vertical='center')
-            else:
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-
+            sheet.cell(row=row, column=col_idx).value = value
+        _style_row(sheet, row, EXEC_ROOM_ROW_STYLES)
         
         row += 1
     
@@ -1193,22 +1180,11 @@ def generate_budget_summary_sheet(workbook, rooms_data, project_details, styles)
     sheet.merge_cells(f'A{row}:B{row}')
     total_label = sheet[f'A{row}']
     total_label.value = "TOTAL PROJECT INVESTMENT"
-    total_label.font = Font(bold=True, size=12)
-    total_label.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-    total_label.border = styles['thin_border']
-    sheet[f'B{row}'].border = styles['thin_border']
-
-    
-    totals = [grand_equipment, grand_services, grand_tax, grand_total]
-    for col_idx, value in enumerate(totals, 3):
-        cell = sheet.cell(row=row, column=col_idx)
-        if value is not None:
-            cell.value = value
-            cell.number_format = styles['currency_format']
-            cell.alignment = Alignment(horizontal='right', vertical='center')
-        cell.font = Font(bold=True, size=11)
-        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-        cell.border = styles['thin_border']
+    
+    grand_totals = [totals.equipment, totals.services, totals.gst, totals.total]
+    for col_idx, value in enumerate(grand_totals, 3):
+        sheet.cell(row=row, column=col_idx).value = value
+    _style_row(sheet, row, ['exec_total_label', 'bordered'] + ['summary_total_currency'] * len(grand_totals))
     
     # Set column widths
     sheet.column_dimensions['A'].width = 30
@@ -1218,76 +1194,128 @@ def generate_budget_summary_sheet(workbook, rooms_data, project_details, styles)
     sheet.column_dimensions['E'].width = 18
     sheet.column_dimensions['F'].width = 20
 
+    return sheet
+
+
+# ==================== ROOM SHEET BUILDER ====================
+def _room_sheet_title(room):
+    safe_name = re.sub(r'[\\/*?:"<>|]', '', room['name'])[:25]
+    return f"BOQ - {safe_name}"
+
+
+def _add_room_boq_sheet(workbook, room, styles, usd_to_inr_rate, gst_rates, include_product_images=True,
+                        room_totals=None, product_cards=None):
+    """Creates and populates one 'BOQ - <room>' sheet."""
+    print(f"DEBUG: Creating sheet for room: {room['name']}")
+    
+    # Create safe sheet name (Excel has 31 char limit)
+    room_sheet = workbook.create_sheet(title=_room_sheet_title(room))
+    
+    _populate_room_boq_sheet(
+        room_sheet, 
+        room['boq_items'], 
+        room['name'], 
+        styles,
+        usd_to_inr_rate, 
+        gst_rates,
+        include_product_images=include_product_images,
+        room_totals=room_totals,
+        product_cards=product_cards
+    )
+    
+    print(f"DEBUG: Successfully created sheet for {room['name']}")
+    return room_sheet
+
+
+def _company_sheet_builders(project_details, rooms_data, usd_to_inr_rate, styles, include_product_images, totals,
+                            product_cards=None):
+    """
+    NEW: One (title, room, callable) per sheet, in workbook order. Each callable
+    takes a workbook, adds its sheet and returns it - shared by the in-memory and
+    streaming writers. room is None for the project-level sheets.
+    """
+    gst_rates = project_details.get('gst_rates', {})
+    builders = [
+        # === SHEET 1: VERSION CONTROL ===
+        ("Version Control", None, lambda wb: _add_version_control_sheet(wb, project_details, styles)),
+        # === SHEET 2: EXECUTIVE SUMMARY ===
+        ("Executive Summary", None,
+         lambda wb: generate_budget_summary_sheet(wb, rooms_data, project_details, styles, totals)),
+        # === SHEET 3: SCOPE OF WORK ===
+        ("Scope of Work", None, lambda wb: _add_scope_of_work_sheet(wb, styles)),
+        # === SHEET 4: PROPOSAL SUMMARY ===
+        ("Proposal Summary", None,
+         lambda wb: _add_proposal_summary_sheet(wb, rooms_data, project_details, styles, totals)),
+        # === SHEET 5: TERMS & CONDITIONS ===
+        ("Terms & Conditions", None, lambda wb: _add_terms_and_conditions_sheet(wb, styles)),
+    ]
+    # === SHEET 6+: ROOM BOQ SHEETS ===
+    for room, room_totals in zip(rooms_data, totals.rooms):
+        if room.get('boq_items') and len(room['boq_items']) > 0:
+            builders.append((
+                _room_sheet_title(room),
+                room,
+                lambda wb, room=room, room_totals=room_totals: _add_room_boq_sheet(
+                    wb, room, styles, usd_to_inr_rate, gst_rates, include_product_images, room_totals,
+                    product_cards)
+            ))
+    return builders
+
+
+def _prepare_export(project_details, rooms_data, usd_to_inr_rate, include_product_images, card_workers):
+    """
+    Project totals and product-card pre-render, common to both writers.
+    Returns (the ProjectTotals every sheet reads, {card key: PNG bytes}).
+    """
+    # === ONE FINANCIAL MODEL PASS FOR ALL SHEETS ===
+    totals = compute_project_totals(rooms_data, usd_to_inr_rate, project_details.get('gst_rates', {}))
+
+    # === PRE-RENDER PRODUCT CARDS ===
+    # Distinct cards across all rooms are rendered in parallel up front; the
+    # sheet writers then only read these PNG bytes (not the size-bounded cache).
+    product_cards = {}
+    if include_product_images:
+        product_cards = prerender_product_cards(
+            (_product_card_spec(item) for room in rooms_data for item in room.get('boq_items') or []),
+            max_workers=card_workers
+        )
+    return totals, product_cards
+
 
 # ==================== MAIN ENTRY POINT (UPDATED) ====================
-def generate_company_excel(project_details, rooms_data, usd_to_inr_rate):
+def generate_company_excel(project_details, rooms_data, usd_to_inr_rate, include_product_images=True,
+                           card_workers=None, progress=None, template_path=None):
     """
     Main function to generate the complete Excel workbook.
     Enhanced with executive summary.
+    NEW: include_product_images=False skips the product info-card images.
+    NEW: card_workers sets the card pre-render process pool size (None = CPU count).
+    NEW: progress(sheets_done, sheets_total, sheet_title) is called after each sheet.
+    NEW: template_path (e.g. DEFAULT_TEMPLATE_PATH) takes the static sheets from the
+    company template file - see write_company_excel_streaming().
+    For very large projects see write_company_excel_streaming().
     """
     workbook = openpyxl.Workbook()
     styles = _define_styles()
+    template = get_workbook_template(template_path) if template_path else None
+    if template is not None:
+        # Copied sheets are appended - the default sheet must not shift the builders' indexes
+        workbook.remove(workbook.active)
+        style_cache = _share_template_styles(workbook, template)
+        template_values = _template_cell_values(project_details)
 
-    # === CALCULATE ROOM TOTALS FIRST ===
-    for room in rooms_data:
-        if room.get('boq_items') and len(room['boq_items']) > 0:
-            # Calculate hardware subtotal
-            subtotal_hardware = sum(
-                item.get('price', 0) * item.get('quantity', 1) 
-                for item in room['boq_items']
-            ) * usd_to_inr_rate
-            
-            # Calculate services total (based on hardware subtotal)
-            services_total = subtotal_hardware * 0.30  # 15% + 10% + 5% for services
-            total_without_gst = subtotal_hardware + services_total
-            
-            # GST calculation
-            gst_electronics = sum(
-                (item.get('price', 0) * item.get('quantity', 1) * usd_to_inr_rate) * (item.get('gst_rate', 18) / 100)
-                for item in room['boq_items']
-            )
-            gst_services = services_total * (project_details.get('gst_rates', {}).get('Services', 18) / 100)
-            total_gst = gst_electronics + gst_services
-            
-            # Store in room dict for Proposal Summary
-            room['subtotal'] = total_without_gst
-            room['gst'] = total_gst
-            room['total'] = total_without_gst + total_gst
-
-    # === SHEET 1: VERSION CONTROL ===
-    _add_version_control_sheet(workbook, project_details, styles)
-    
-    # === SHEET 2: EXECUTIVE SUMMARY (NEW!) ===
-    generate_budget_summary_sheet(workbook, rooms_data, project_details, styles)
+    totals, product_cards = _prepare_export(project_details, rooms_data, usd_to_inr_rate,
+                                            include_product_images, card_workers)
 
-    # === SHEET 3: SCOPE OF WORK ===
-    _add_scope_of_work_sheet(workbook, styles)
-    
-    # === SHEET 4: PROPOSAL SUMMARY (NOW WITH CALCULATIONS) ===
-    _add_proposal_summary_sheet(workbook, rooms_data, project_details, styles)
-    
-    # === SHEET 5: TERMS & CONDITIONS ===
-    _add_terms_and_conditions_sheet(workbook, styles)
-    
-    # === SHEET 6+: ROOM BOQ SHEETS ===
-    for room in rooms_data:
-        if room.get('boq_items') and len(room['boq_items']) > 0:
-            print(f"DEBUG: Creating sheet for room: {room['name']}")
-            
-            # Create safe sheet name (Excel has 31 char limit)
-            safe_name = re.sub(r'[\\/*?:"<>|]', '', room['name'])[:25]
-            room_sheet = workbook.create_sheet(title=f"BOQ - {safe_name}")
-            
-            _populate_room_boq_sheet(
-                room_sheet, 
-                room['boq_items'], 
-                room['name'], 
-                styles,
-                usd_to_inr_rate, 
-                project_details.get('gst_rates', {})
-            )
-            
-            print(f"DEBUG: Successfully created sheet for {room['name']}")
+    builders = _company_sheet_builders(project_details, rooms_data, usd_to_inr_rate,
+                                       styles, include_product_images, totals, product_cards)
+    for done, (title, room, build_sheet) in enumerate(builders, start=1):
+        if room is None and template is not None and title in template.sheetnames:
+            sheet = _copy_template_sheet(workbook, template[title], style_cache, template_values.get(title))
+        else:
+            sheet = build_sheet(workbook)
+        if progress:
+            progress(done, len(builders), sheet.title)
 
     # === CLEANUP ===
     # Remove default sheet
@@ -1303,3 +1331,380 @@ def generate_company_excel(project_details, rooms_data, usd_to_inr_rate):
     excel_buffer.seek(0)
     
     return excel_buffer.getvalue()
+
+
+# ==================== STREAMING EXPORT (LARGE PROJECTS) ====================
+def _copy_cell_style(out, cell, style_cache):
+    """
+    Give `out` the formatting of `cell` (from another workbook).
+    style_cache None: both workbooks share style tables (_share_template_styles).
+    """
+    if style_cache is None:
+        out._style = copy(cell._style)
+    elif cell.has_style:
+        # Source style ids -> target style ids, so each distinct style is copied only once
+        style_key = tuple(cell._style)
+        target_style = style_cache.get(style_key)
+        if target_style is None:
+            out.font = copy(cell.font)
+            out.fill = copy(cell.fill)
+            out.border = copy(cell.border)
+            out.alignment = copy(cell.alignment)
+            out.number_format = cell.number_format
+            style_cache[style_key] = copy(out._style)
+        else:
+            out._style = copy(target_style)
+
+
+def _write_only_cell(target_sheet, cell, style_cache):
+    """Copy value and formatting of a regular cell into a WriteOnlyCell."""
+    out = WriteOnlyCell(target_sheet, value=cell.value)
+    _copy_cell_style(out, cell, style_cache)
+    return out
+
+
+def _copy_sheet_layout(target, sheet):
+    """Gridline setting, column widths and row heights of `sheet` onto `target`"""
+    target.sheet_view.showGridLines = sheet.sheet_view.showGridLines
+    for key, dimension in sheet.column_dimensions.items():
+        if dimension.width:
+            target_dimension = target.column_dimensions[key]
+            target_dimension.width = dimension.width
+            target_dimension.min, target_dimension.max = dimension.min, dimension.max
+    for row_idx, dimension in sheet.row_dimensions.items():
+        if dimension.height:
+            target.row_dimensions[row_idx].height = dimension.height
+
+
+def _copy_image(image):
+    """A fresh Image for the same picture (openpyxl closes an image's stream once saved)"""
+    source = image.ref
+    if hasattr(source, 'getvalue'):
+        source = BytesIO(source.getvalue())
+    clone = ExcelImage(source)
+    clone.width, clone.height = image.width, image.height
+    clone.anchor = copy(image.anchor)  # The writer attaches the picture to the anchor
+    return clone
+
+
+def _stream_sheet(workbook, sheet, style_cache, title=None, values=None):
+    """
+    NEW: Write a fully built worksheet into a write-only workbook row by row,
+    keeping column widths, row heights, merges, images and gridline setting.
+    The source sheet is left untouched, so it can be streamed again later.
+    values (optional) maps cell coordinates to values written instead of the source's.
+    """
+    target = workbook.create_sheet(title=title or sheet.title)
+    # Style ids are per workbook - keep one cache per source workbook
+    source_styles = style_cache.setdefault(id(sheet.parent), {})
+    
+    # Dimensions must be in place before the rows that use them are written
+    _copy_sheet_layout(target, sheet)
+    
+    for row in sheet.iter_rows(min_row=1, max_row=sheet.max_row, max_col=sheet.max_column):
+        cells = [_write_only_cell(target, cell, source_styles) for cell in row]
+        if values:
+            for source, out in zip(row, cells):
+                if source.coordinate in values:
+                    out.value = values[source.coordinate]
+        target.append(cells)
+    
+    for merged_range in sheet.merged_cells.ranges:
+        target.merged_cells.add(merged_range.coord)
+    for image in sheet._images:
+        target.add_image(_copy_image(image))
+    return target
+
+
+def _new_scratch_workbook():
+    """Regular workbook the sheets are built in before being streamed out"""
+    scratch = openpyxl.Workbook()
+    scratch.remove(scratch.active)
+    return scratch
+
+
+def _stream_company_workbook(output, project_details, rooms_data, usd_to_inr_rate, include_product_images,
+                             card_workers, scratch, room_sheets=None, progress=None, template=None):
+    """
+    Build each sheet in `scratch`, stream it into a write-only workbook and save
+    that to `output` (path or file object).
+    room_sheets (optional) maps room_sheet_fingerprint -> already built room sheet
+    in `scratch`: matching rooms are streamed from it instead of being rebuilt, and
+    on return it holds exactly this project's room sheets. Without it every sheet
+    is dropped as soon as it is written.
+    template (optional, from get_workbook_template) supplies ready-made sheets,
+    streamed with only their project cells filled in.
+    progress(sheets_done, sheets_total, sheet_title) is called after each sheet.
+    Returns (room sheets reused, room sheets built).
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    styles = _define_styles()
+    style_cache = _share_template_styles(workbook, template) if template is not None else {}
+    gst_rates = project_details.get('gst_rates', {})
+    reused = built = 0
+    current_sheets = {}
+    template_values = _template_cell_values(project_details) if template is not None else {}
+
+    totals, product_cards = _prepare_export(project_details, rooms_data, usd_to_inr_rate,
+                                            include_product_images, card_workers)
+
+    builders = _company_sheet_builders(project_details, rooms_data, usd_to_inr_rate,
+                                       styles, include_product_images, totals, product_cards)
+    for done, (title, room, build_sheet) in enumerate(builders, start=1):
+        if room is None and template is not None and title in template.sheetnames:
+            # === TEMPLATE SHEET: copied, only the project cells filled in ===
+            target = _stream_sheet(workbook, template[title], style_cache, values=template_values.get(title))
+        elif room is None or room_sheets is None:
+            sheet = build_sheet(scratch)
+            target = _stream_sheet(workbook, sheet, style_cache)
+            scratch.remove(sheet)
+        else:
+            sheet_key = room_sheet_fingerprint(room, usd_to_inr_rate, gst_rates, include_product_images)
+            sheet = current_sheets.get(sheet_key) or room_sheets.get(sheet_key)
+            if sheet is None:
+                sheet = build_sheet(scratch)
+                built += 1
+            else:
+                reused += 1
+            current_sheets[sheet_key] = sheet
+            # Cached sheets may carry a de-duplicated title from the scratch workbook
+            target = _stream_sheet(workbook, sheet, style_cache, title=title)
+        if progress:
+            progress(done, len(builders), target.title)
+
+    if room_sheets is not None:
+        # === EVICT ROOM SHEETS THAT ARE NO LONGER IN THE PROJECT ===
+        for sheet_key, sheet in room_sheets.items():
+            if sheet_key not in current_sheets:
+                scratch.remove(sheet)
+        room_sheets.clear()
+        room_sheets.update(current_sheets)
+
+    workbook.save(output)
+    return reused, built
+
+
+def write_company_excel_streaming(project_details, rooms_data, usd_to_inr_rate, output_path=None,
+                                  include_product_images=True, card_workers=None, progress=None,
+                                  template_path=None):
+    """
+    NEW: Same workbook as generate_company_excel, streamed to a file instead of RAM.
+    Each sheet is built on its own, written to an openpyxl write-only workbook and
+    dropped, so memory stays at about one sheet however many rooms there are.
+    Returns the path of the .xlsx (a new temp file when output_path is None -
+    the caller deletes it).
+    NEW: With template_path the static sheets come from that template workbook
+    (loaded once per process) instead of being built in code.
+    """
+    if output_path is None:
+        fd, output_path = tempfile.mkstemp(prefix='boq_', suffix='.xlsx')
+        os.close(fd)
+
+    _stream_company_workbook(output_path, project_details, rooms_data, usd_to_inr_rate,
+                             include_product_images, card_workers, _new_scratch_workbook(), progress=progress,
+                             template=get_workbook_template(template_path) if template_path else None)
+    return output_path
+
+
+# ==================== TEMPLATE MODE ====================
+# Sheets taken from the template file; every other sheet is built per export
+TEMPLATE_SHEETS = ("Version Control", "Scope of Work")
+
+# Contact rows of the code-built Version Control sheet that the template lacks -
+# added below its contact table, formatted like the Location row (row 10)
+TEMPLATE_EXTRA_CONTACT_ROWS = {12: "PSNI Referral", 13: "Client Type"}
+
+
+def _template_cell_values(project_details):
+    """Per-export cells of the template sheets, by sheet title"""
+    today = datetime.now().strftime("%d-%b-%Y")
+    return {
+        "Version Control": {
+            'B7': today,                # Date of First Draft
+            'B11': "1.0",               # Version No.
+            'C11': today,               # Published Date
+            'F6': project_details.get("Design Engineer", ""),
+            'F7': project_details.get("Account Manager", ""),
+            'F8': project_details.get("Client Name", ""),
+            'F9': project_details.get("Key Client Personnel", ""),
+            'F10': project_details.get("Location", ""),
+            'F11': project_details.get("Key Comments", ""),
+            'F12': "✅ YES" if project_details.get("PSNI Referral") == "Yes" else "No",
+            'F13': project_details.get("Client Type", "International"),
+        },
+    }
+
+
+def _copy_template_sheet(workbook, sheet, style_cache, values=None):
+    """
+    NEW: Copy a template sheet into a regular workbook - cells, formatting, merges
+    and images - with `values` written over the given cells.
+    """
+    target = workbook.create_sheet(title=sheet.title)
+    source_styles = style_cache.setdefault(id(sheet.parent), {})
+    _copy_sheet_layout(target, sheet)
+    for row in sheet.iter_rows():
+        for cell in row:
+            if cell.value is None and not cell.has_style:
+                continue
+            out = target.cell(row=cell.row, column=cell.column, value=cell.value)
+            _copy_cell_style(out, cell, source_styles)
+    for coordinate, value in (values or {}).items():
+        target[coordinate].value = value
+    for merged_range in sheet.merged_cells.ranges:
+        target.merged_cells.add(merged_range.coord)
+    for image in sheet._images:
+        target.add_image(_copy_image(image))
+    return target
+
+
+def _share_template_styles(workbook, template):
+    """
+    Start a new workbook with copies of the template's style tables and theme, so
+    template cells keep their style ids as they are copied over.
+    Returns a style cache for _stream_sheet/_copy_template_sheet that knows this.
+    """
+    for table in ('_fonts', '_alignments', '_borders', '_fills', '_number_formats', '_protections', '_cell_styles'):
+        setattr(workbook, table, IndexedList(getattr(template, table)))
+    workbook._date_formats = dict(template._date_formats)
+    workbook._timedelta_formats = dict(template._timedelta_formats)
+    workbook._named_styles = NamedStyleList(template._named_styles)
+    workbook.loaded_theme = template.loaded_theme
+    return {id(template): None}
+
+
+def _prepare_template_version_control(sheet):
+    """Blank the template's stray A1 marker and add the rows in TEMPLATE_EXTRA_CONTACT_ROWS"""
+    sheet['A1'].value = None
+    sheet['A1']._style = StyleArray()
+    for row, label in TEMPLATE_EXTRA_CONTACT_ROWS.items():
+        for column in ('E', 'F'):
+            sheet[f'{column}{row}']._style = copy(sheet[f'{column}10']._style)
+        sheet[f'E{row}'].value = label
+        sheet.row_dimensions[row].height = sheet.row_dimensions[10].height
+
+
+@lru_cache(maxsize=4)
+def _load_workbook_template(template_path, modified):
+    template = openpyxl.load_workbook(template_path)
+    for sheet in list(template.worksheets):
+        if sheet.title not in TEMPLATE_SHEETS:
+            template.remove(sheet)
+    if "Version Control" in template.sheetnames:
+        _prepare_template_version_control(template["Version Control"])
+    # Terms & Conditions hold no project data either - built here once instead of per export
+    styles = _define_styles()
+    _ensure_named_styles(template, styles)
+    _add_terms_and_conditions_sheet(template, styles)
+    # iter_rows() creates missing cells - do it once here, so concurrent exports only read
+    for sheet in template.worksheets:
+        for _ in sheet.iter_rows():
+            pass
+    return template
+
+
+def get_workbook_template(template_path=DEFAULT_TEMPLATE_PATH):
+    """
+    NEW: The template workbook, loaded once per process (reloaded if the file changes).
+    Treat it as read-only - exports stream copies of its sheets.
+    """
+    return _load_workbook_template(os.path.abspath(template_path), os.path.getmtime(template_path))
+
+
+# ==================== CACHED EXPORT (INTERACTIVE UI) ====================
+def _fingerprint(payload):
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def project_fingerprint(project_details, rooms_data, usd_to_inr_rate, **options):
+    """
+    NEW: Stable hash of everything that ends up in the workbook - project details,
+    rooms and their BOQ items, exchange rate and any export options. The date is
+    included because the sheets are dated.
+    """
+    return _fingerprint({
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'project': project_details,
+        'rooms': [{'name': room.get('name'), 'type': room.get('type'), 'area': room.get('area'),
+                   'boq_items': room.get('boq_items') or []} for room in rooms_data],
+        'usd_to_inr_rate': usd_to_inr_rate,
+        'options': options,
+    })
+
+
+def room_sheet_fingerprint(room, usd_to_inr_rate, gst_rates, include_product_images=True):
+    """NEW: Hash of everything a room's BOQ sheet is built from"""
+    return _fingerprint({
+        'name': room.get('name'),
+        'boq_items': room.get('boq_items') or [],
+        'usd_to_inr_rate': usd_to_inr_rate,
+        'gst_rates': gst_rates,
+        'images': include_product_images,
+    })
+
+
+class CachedWorkbookExporter:
+    """
+    NEW: Company workbook export for interactive sessions.
+    The last workbook is kept by project fingerprint, so repeated requests for an
+    unchanged project cost nothing; when the project does change, room sheets whose
+    inputs are unchanged are re-streamed from the previous build instead of rebuilt.
+    Projects of STREAMING_ROOM_THRESHOLD rooms or more are streamed without keeping
+    room sheets, to hold memory down.
+    """
+
+    def __init__(self, include_product_images=True, card_workers=None, max_cached_rooms=STREAMING_ROOM_THRESHOLD,
+                 template_path=None):
+        self.include_product_images = include_product_images
+        self.card_workers = card_workers
+        self.template_path = template_path
+        self.max_cached_rooms = max_cached_rooms
+        self.stats = {'hits': 0, 'builds': 0, 'room_sheets_reused': 0, 'room_sheets_built': 0}
+        self._scratch = _new_scratch_workbook()
+        self._room_sheets = {}
+        self._key = None
+        self._data = None
+        self._lock = threading.Lock()
+
+    def cached(self, key):
+        """Workbook bytes for this fingerprint if it was the last one built, else None"""
+        return self._data if key is not None and key == self._key else None
+
+    def export(self, project_details, rooms_data, usd_to_inr_rate, key=None, progress=None):
+        """
+        Workbook bytes for the project, rebuilt only when its fingerprint changed.
+        progress is passed through to the sheet writer (not called on a cache hit).
+        """
+        if key is None:
+            key = project_fingerprint(project_details, rooms_data, usd_to_inr_rate,
+                                      include_product_images=self.include_product_images,
+                                      template_path=self.template_path)
+        with self._lock:
+            if key == self._key:
+                self.stats['hits'] += 1
+                return self._data
+
+            if len(rooms_data) >= self.max_cached_rooms:
+                self.clear()
+                room_sheets = None
+            else:
+                room_sheets = self._room_sheets
+
+            buffer = BytesIO()
+            reused, built = _stream_company_workbook(
+                buffer, project_details, rooms_data, usd_to_inr_rate,
+                self.include_product_images, self.card_workers, self._scratch, room_sheets, progress,
+                get_workbook_template(self.template_path) if self.template_path else None
+            )
+            self._key, self._data = key, buffer.getvalue()
+            self.stats['builds'] += 1
+            self.stats['room_sheets_reused'] += reused
+            self.stats['room_sheets_built'] += built
+            return self._data
+
+    def clear(self):
+        """Drop the cached workbook and room sheets"""
+        self._scratch = _new_scratch_workbook()
+        self._room_sheets = {}
+        self._key = self._data = None
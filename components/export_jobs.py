@@ -0,0 +1,258 @@
+# components/export_jobs.py
+"""
+Background Export Jobs
+Runs workbook exports on a small thread pool so a Streamlit script run never
+waits for them. Each job reports per-sheet progress; finished workbooks are kept
+on disk in a per-user download queue until they expire.
+
+Threads rather than processes: a job needs the session's CachedWorkbookExporter
+(room sheets from earlier builds) and the process-wide product card cache, and
+the CPU-heavy card rendering already fans out to a process pool.
+"""
+
+import copy
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+from components.excel_generator import generate_company_excel
+
+DEFAULT_EXPORT_WORKERS = 2
+DEFAULT_DOWNLOAD_TTL = 30 * 60  # Seconds a finished workbook stays downloadable
+MAX_JOBS_PER_OWNER = 10
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+@dataclass
+class ExportJob:
+    """State of one export. The runner hands out copies, never the live record."""
+    job_id: str
+    owner: str
+    filename: str
+    key: Optional[str] = None  # Project fingerprint the workbook was built from
+    label: str = ''
+    status: str = QUEUED
+    sheets_done: int = 0
+    sheets_total: int = 0
+    current_sheet: str = ''
+    created_at: float = 0.0
+    finished_at: Optional[float] = None
+    path: Optional[str] = None
+    error: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def fraction(self) -> float:
+        """Share of sheets written, 0.0 - 1.0"""
+        if self.status == DONE:
+            return 1.0
+        return self.sheets_done / self.sheets_total if self.sheets_total else 0.0
+
+
+class ExportJobRunner:
+    """
+    NEW: Thread pool + download queue for workbook exports.
+    A build callable takes update(**fields) - to report sheets_done, sheets_total,
+    current_sheet or metadata - and returns the workbook bytes.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_EXPORT_WORKERS, ttl: float = DEFAULT_DOWNLOAD_TTL,
+                 download_dir: Optional[str] = None, max_jobs_per_owner: int = MAX_JOBS_PER_OWNER):
+        self.ttl = ttl
+        self.max_jobs_per_owner = max_jobs_per_owner
+        self.download_dir = download_dir or tempfile.mkdtemp(prefix='boq_exports_')
+        os.makedirs(self.download_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='boq-export')
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+
+    # === SUBMIT / RUN ===
+
+    def submit(self, owner: str, build: Callable[[Callable[..., None]], bytes], filename: str,
+               key: Optional[str] = None, label: str = '') -> ExportJob:
+        """Queue an export and return at once"""
+        self.purge_expired()
+        job = ExportJob(job_id=uuid.uuid4().hex, owner=owner, filename=filename, key=key,
+                        label=label, created_at=time.time())
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._trim_owner(owner)
+            snapshot = replace(job)
+        self._executor.submit(self._run, job.job_id, build)
+        return snapshot
+
+    def _update(self, job_id: str, **fields) -> bool:
+        """Set fields on a live job; False when the job has been removed"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            for name, value in fields.items():
+                setattr(job, name, value)
+            return True
+
+    def _run(self, job_id: str, build: Callable):
+        job = self.get(job_id)
+        if job is None or not self._update(job_id, status=RUNNING):
+            return
+        try:
+            data = build(lambda **fields: self._update(job_id, **fields))
+            if not data:
+                raise RuntimeError("Export produced no workbook")
+            extension = os.path.splitext(job.filename)[1] or '.xlsx'
+            path = os.path.join(self.download_dir, job_id + extension)
+            with open(path, 'wb') as f:
+                f.write(data)
+        except Exception as e:
+            print(f"❌ Export job {job_id[:8]} failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+            return
+
+        if not self._update(job_id, status=DONE, path=path, finished_at=time.time()):
+            # Removed while it was running - nobody will download it
+            self._delete_file(path)
+
+    # === QUEUE ===
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def jobs_for(self, owner: str) -> List[ExportJob]:
+        """The owner's jobs, newest first"""
+        self.purge_expired()
+        with self._lock:
+            jobs = [replace(job) for job in self._jobs.values() if job.owner == owner]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def find(self, owner: str, key: str) -> Optional[ExportJob]:
+        """Newest queued, running or finished (not failed) job of the owner for this fingerprint"""
+        for job in self.jobs_for(owner):
+            if job.key == key and job.status != FAILED:
+                return job
+        return None
+
+    def read(self, job_id: str) -> Optional[bytes]:
+        """Bytes of a finished workbook, None if it is not (or no longer) available"""
+        job = self.get(job_id)
+        if job is None or job.status != DONE or not job.path:
+            return None
+        try:
+            with open(job.path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def expires_in(self, job: ExportJob) -> Optional[float]:
+        """Seconds until a finished job is purged"""
+        if job.finished_at is None:
+            return None
+        return max(0.0, job.finished_at + self.ttl - time.time())
+
+    def remove(self, job_id: str):
+        """Drop a job from the queue (a running export finishes and is discarded)"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job and job.path:
+            self._delete_file(job.path)
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Remove finished jobs older than the TTL; returns how many went"""
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.finished_at is not None and now - job.finished_at > self.ttl]
+            for job in expired:
+                del self._jobs[job.job_id]
+        for job in expired:
+            if job.path:
+                self._delete_file(job.path)
+        return len(expired)
+
+    def _trim_owner(self, owner: str):
+        """Keep at most max_jobs_per_owner jobs per owner by dropping the oldest finished ones (lock held)"""
+        jobs = sorted((job for job in self._jobs.values() if job.owner == owner), key=lambda job: job.created_at)
+        excess = len(jobs) - self.max_jobs_per_owner
+        for job in jobs:
+            if excess <= 0:
+                break
+            if not job.active:
+                del self._jobs[job.job_id]
+                if job.path:
+                    self._delete_file(job.path)
+                excess -= 1
+
+    @staticmethod
+    def _delete_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers and delete the download directory"""
+        self._executor.shutdown(wait=wait)
+        shutil.rmtree(self.download_dir, ignore_errors=True)
+
+
+# Process-wide runner shared by all sessions
+_runner: Optional[ExportJobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_export_runner() -> ExportJobRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            workers = int(os.environ.get('BOQ_EXPORT_WORKERS', DEFAULT_EXPORT_WORKERS))
+            _runner = ExportJobRunner(max_workers=workers)
+        return _runner
+
+
+def submit_company_export(owner: str, project_details: Dict, rooms_data: List[Dict], usd_to_inr_rate: float,
+                          filename: str, key: Optional[str] = None, optimizer=None, exporter=None,
+                          runner: Optional[ExportJobRunner] = None) -> ExportJob:
+    """
+    NEW: Queue the company workbook export (optionally preceded by the multi-room
+    optimizer) in the background. With an exporter (CachedWorkbookExporter) unchanged
+    room sheets from its earlier builds are reused.
+    The inputs are copied, so the caller may keep editing them.
+    """
+    runner = runner or get_export_runner()
+    project_details = copy.deepcopy(project_details)
+    rooms_data = copy.deepcopy(rooms_data)
+
+    def build(update):
+        rooms = rooms_data
+        if optimizer is not None:
+            update(current_sheet='Multi-room optimization')
+            optimized_result = optimizer.optimize_multi_room_project(rooms)
+            rooms = optimized_result['rooms']
+            update(metadata={
+                'optimization': optimized_result.get('optimization'),
+                'savings_pct': optimized_result.get('savings_pct', 0),
+                'shared_infrastructure': optimized_result.get('shared_infrastructure', {}),
+                'room_count': len(rooms),
+            })
+
+        def progress(done, total, sheet_title):
+            update(sheets_done=done, sheets_total=total, current_sheet=sheet_title)
+
+        if exporter is not None:
+            return exporter.export(project_details, rooms, usd_to_inr_rate, progress=progress)
+        return generate_company_excel(project_details, rooms, usd_to_inr_rate, progress=progress)
+
+    return runner.submit(owner, build, filename, key=key,
+                         label=project_details.get('Project Name', filename))
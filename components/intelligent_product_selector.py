@@ -1,8 +1,11 @@
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, field
-import streamlit as st
+from dataclasses import dataclass, field, replace
 import pandas as pd
+import numpy as np
+
+from components.alternatives_engine import AlternativesEngine
 
 @dataclass
 class ProductRequirement:
@@ -36,65 +39,144 @@ class ProductRequirement:
     
     # NEW: Strict category validation (prevents cross-category contamination)
     strict_category_match: bool = True
+    
+    # NEW: Precompiled filter plan (set by blueprint templates; not part of equality)
+    filter_plan: Optional['FilterPlan'] = field(default=None, compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class FilterPlan:
+    """
+    NEW: Stage 1-4.5 inputs of a requirement prepared once, at template compile
+    time: a hashable cache key and the escaped keyword regexes.
+    """
+    key: Tuple
+    required_pattern: Optional[str]
+    blacklist_patterns: Tuple[Tuple[str, str], ...]  # (keyword, escaped pattern)
+    
+    @classmethod
+    def build(cls, key: Tuple, required_keywords, blacklist_keywords) -> 'FilterPlan':
+        return cls(
+            key=key,
+            required_pattern='|'.join(re.escape(kw) for kw in required_keywords) if required_keywords else None,
+            blacklist_patterns=tuple((kw, re.escape(kw)) for kw in (blacklist_keywords or ()))
+        )
 
 # CRITICAL FIX: Enhanced Brand Compatibility & Ecosystem Logic
+# Brand family relationships (ecosystem consistency)
+BRAND_ECOSYSTEMS = {
+    'microsoft': {
+        'primary': 'Microsoft',
+        'vc_partners': ['Yealink', 'Poly', 'Cisco', 'Logitech'],
+        'audio_partners': ['Shure', 'QSC', 'Biamp'],
+        'control_partners': ['Crestron', 'Extron', 'AMX'],
+        'ecosystem_score': 0.8  # How much we penalize switching
+    },
+    'zoom': {
+        'primary': 'Zoom',
+        'vc_partners': ['Poly', 'Logitech', 'Yealink'],
+        'audio_partners': ['Bose', 'Shure', 'QSC'],
+        'control_partners': ['Crestron'],
+        'ecosystem_score': 0.75
+    },
+    'cisco': {
+        'primary': 'Cisco',
+        'vc_partners': ['Cisco', 'Polycom'],
+        'audio_partners': ['QSC', 'Shure'],
+        'control_partners': ['Crestron', 'Extron'],
+        'ecosystem_score': 0.85
+    }
+}
+
+# Brand substitution matrix (when preferred brand unavailable)
+BRAND_SUBSTITUTIONS = {
+    'displays': {
+        'Samsung': ['LG', 'Sony', 'NEC'],
+        'LG': ['Samsung', 'Sony'],
+        'Sony': ['Samsung', 'LG', 'NEC'],
+        'NEC': ['Sharp', 'Panasonic']
+    },
+    'video_conferencing': {
+        'Yealink': ['Poly', 'Logitech'],  # Compatible, similar quality tier
+        'Poly': ['Yealink', 'Logitech'],
+        'Cisco': ['Polycom'],
+        'Logitech': ['Poly', 'Yealink']
+    },
+    'audio': {
+        'QSC': ['Biamp', 'Shure'],
+        'Biamp': ['QSC'],
+        'Shure': ['Sennheiser'],
+        'Bose': ['Shure']
+    },
+    'control': {
+        'Crestron': ['Extron', 'AMX'],
+        'Extron': ['Crestron', 'Kramer'],
+        'AMX': ['Crestron']
+    }
+}
+
+# Certified audio brands per VC platform (lowercase)
+PLATFORM_AUDIO_BRANDS = {
+    'teams': frozenset(['shure', 'biamp', 'qsc', 'bose', 'sennheiser', 'poly', 'yealink']),
+    'zoom': frozenset(['shure', 'biamp', 'qsc', 'bose', 'poly', 'logitech'])
+}
+
+# Control brands required for platform certification (lowercase)
+PLATFORM_CONTROL_BRANDS = {
+    'teams': frozenset(['crestron', 'logitech', 'poly'])
+}
+
+# Native component pairings: (anchor role, dependent role) -> {anchor brand: dependent brand}
+COMPONENT_PAIRINGS = {
+    ('codec', 'camera'): {'cisco': 'cisco'},
+    ('dsp', 'microphone'): {'qsc': 'qsc'}
+}
+
+# Score by (audio partner?, control partner?)
+ECOSYSTEM_SCORE_TABLE = [[0.5, 0.8], [0.8, 1.0]]
+
+
 class BrandEcosystemManager:
     """
     Manages brand compatibility, ecosystem consistency, and intelligent fallbacks
+    ENHANCED: Rules are compiled once into dense partner matrices and lookup tables;
+    use get_brand_ecosystem_manager() for the shared instance.
     """
     
     def __init__(self):
-        # Brand family relationships (ecosystem consistency)
-        self.brand_ecosystems = {
-            'microsoft': {
-                'primary': 'Microsoft',
-                'vc_partners': ['Yealink', 'Poly', 'Cisco', 'Logitech'],
-                'audio_partners': ['Shure', 'QSC', 'Biamp'],
-                'control_partners': ['Crestron', 'Extron', 'AMX'],
-                'ecosystem_score': 0.8  # How much we penalize switching
-            },
-            'zoom': {
-                'primary': 'Zoom',
-                'vc_partners': ['Poly', 'Logitech', 'Yealink'],
-                'audio_partners': ['Bose', 'Shure', 'QSC'],
-                'control_partners': ['Crestron'],
-                'ecosystem_score': 0.75
-            },
-            'cisco': {
-                'primary': 'Cisco',
-                'vc_partners': ['Cisco', 'Polycom'],
-                'audio_partners': ['QSC', 'Shure'],
-                'control_partners': ['Crestron', 'Extron'],
-                'ecosystem_score': 0.85
-            }
-        }
-        
-        # Brand substitution matrix (when preferred brand unavailable)
-        self.brand_substitutions = {
-            'displays': {
-                'Samsung': ['LG', 'Sony', 'NEC'],
-                'LG': ['Samsung', 'Sony'],
-                'Sony': ['Samsung', 'LG', 'NEC'],
-                'NEC': ['Sharp', 'Panasonic']
-            },
-            'video_conferencing': {
-                'Yealink': ['Poly', 'Logitech'],  # Compatible, similar quality tier
-                'Poly': ['Yealink', 'Logitech'],
-                'Cisco': ['Polycom'],
-                'Logitech': ['Poly', 'Yealink']
-            },
-            'audio': {
-                'QSC': ['Biamp', 'Shure'],
-                'Biamp': ['QSC'],
-                'Shure': ['Sennheiser'],
-                'Bose': ['Shure']
-            },
-            'control': {
-                'Crestron': ['Extron', 'AMX'],
-                'Extron': ['Crestron', 'Kramer'],
-                'AMX': ['Crestron']
-            }
+        self.brand_ecosystems = BRAND_ECOSYSTEMS
+        self.brand_substitutions = BRAND_SUBSTITUTIONS
+        self._build_lookup_tables()
+    
+    def _build_lookup_tables(self):
+        """Compile ecosystem rules into partner matrices and substitute lists"""
+        self._platform_keys = list(self.brand_ecosystems.keys())
+        
+        brands = sorted({
+            brand
+            for ecosystem in self.brand_ecosystems.values()
+            for role in ('audio_partners', 'control_partners')
+            for brand in ecosystem.get(role, [])
+        })
+        self._brand_index = {brand: i for i, brand in enumerate(brands)}
+        
+        # Rows: platform, columns: brand -> is partner
+        self._audio_matrix = np.zeros((len(self._platform_keys), len(brands)), dtype=np.int8)
+        self._control_matrix = np.zeros((len(self._platform_keys), len(brands)), dtype=np.int8)
+        for row, key in enumerate(self._platform_keys):
+            for brand in self.brand_ecosystems[key].get('audio_partners', []):
+                self._audio_matrix[row, self._brand_index[brand]] = 1
+            for brand in self.brand_ecosystems[key].get('control_partners', []):
+                self._control_matrix[row, self._brand_index[brand]] = 1
+        self._score_table = np.array(ECOSYSTEM_SCORE_TABLE)
+        
+        self._substitutes = {
+            (category_key, brand): tuple(subs)
+            for category_key, table in self.brand_substitutions.items()
+            for brand, subs in table.items()
         }
+        self._platform_rows = {}
+        self._score_cache = {}
     
     def get_substitute_brands(self, category, preferred_brand):
         """Get ordered list of acceptable substitute brands"""
@@ -108,26 +190,126 @@ class BrandEcosystemManager:
             'Signal Management': 'control'
         }
         lookup_key = category_key_map.get(category, category.lower())
-        category_subs = self.brand_substitutions.get(lookup_key, {})
-        return category_subs.get(preferred_brand, [])
+        return list(self._substitutes.get((lookup_key, preferred_brand), ()))
+    
+    def _platform_row(self, vc_platform):
+        """Row of the first ecosystem whose key appears in the VC platform name"""
+        vc_lower = vc_platform.lower()
+        if vc_lower not in self._platform_rows:
+            self._platform_rows[vc_lower] = next(
+                (row for row, key in enumerate(self._platform_keys) if key in vc_lower), None
+            )
+        return self._platform_rows[vc_lower]
     
     def is_ecosystem_compatible(self, vc_platform, audio_brand, control_brand):
         """Check if brands form a compatible ecosystem"""
-        vc_lower = vc_platform.lower()
+        cache_key = (vc_platform, audio_brand, control_brand)
+        if cache_key in self._score_cache:
+            return self._score_cache[cache_key]
         
-        for ecosystem_key, ecosystem in self.brand_ecosystems.items():
-            if ecosystem_key in vc_lower:
-                audio_compatible = audio_brand in ecosystem.get('audio_partners', [])
-                control_compatible = control_brand in ecosystem.get('control_partners', [])
-                
-                if audio_compatible and control_compatible:
-                    return True, 1.0  # Perfect match
-                elif audio_compatible or control_compatible:
-                    return True, 0.8  # Partial match
-                else:
-                    return False, 0.5  # Mismatch
-        
-        return True, 0.7  # Default: assume compatible
+        row = self._platform_row(vc_platform)
+        if row is None:
+            result = (True, 0.7)  # Default: assume compatible
+        else:
+            audio_idx = self._brand_index.get(audio_brand)
+            control_idx = self._brand_index.get(control_brand)
+            audio_ok = int(self._audio_matrix[row, audio_idx]) if audio_idx is not None else 0
+            control_ok = int(self._control_matrix[row, control_idx]) if control_idx is not None else 0
+            score = float(self._score_table[audio_ok, control_ok])
+            # Perfect (1.0) or partial (0.8) match is compatible; 0.5 is a mismatch
+            result = (score > 0.5, score)
+        
+        self._score_cache[cache_key] = result
+        return result
+    
+    @staticmethod
+    def resolve_vc_platform(vc_platform) -> Optional[str]:
+        """Map a VC platform name onto a platform rule key ('teams', 'zoom')"""
+        vc_lower = (vc_platform or '').lower()
+        if 'teams' in vc_lower or 'microsoft' in vc_lower:
+            return 'teams'
+        if 'zoom' in vc_lower:
+            return 'zoom'
+        return None
+    
+    def platform_audio_brands(self, vc_platform) -> frozenset:
+        """Certified audio brands (lowercase) for a VC platform"""
+        return PLATFORM_AUDIO_BRANDS.get(self.resolve_vc_platform(vc_platform), frozenset())
+    
+    def platform_control_brands(self, vc_platform) -> Optional[frozenset]:
+        """Control brands (lowercase) required by a VC platform, or None if unrestricted"""
+        # Teams certification is keyed on the platform name containing 'teams'
+        if 'teams' not in (vc_platform or '').lower():
+            return None
+        return PLATFORM_CONTROL_BRANDS['teams']
+    
+    def native_pairing_brand(self, anchor_role, anchor_brand, dependent_role) -> Optional[str]:
+        """Brand the dependent component should have to pair natively with the anchor"""
+        pairings = COMPONENT_PAIRINGS.get((anchor_role, dependent_role), {})
+        anchor_lower = anchor_brand.lower()
+        for brand_key, paired_brand in pairings.items():
+            if brand_key in anchor_lower:
+                return paired_brand
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_brand_ecosystem_manager() -> BrandEcosystemManager:
+    """Shared BrandEcosystemManager (lookup tables are built once per process)"""
+    return BrandEcosystemManager()
+
+
+class SharedCatalog:
+    """
+    NEW: Standardized, read-only product catalog plus its partition index.
+    Build once and pass in place of a DataFrame so many selectors (e.g. parallel
+    room workers) share one copy instead of each copying and re-indexing it.
+    """
+    
+    def __init__(self, product_df: pd.DataFrame):
+        prepared = IntelligentProductSelector(product_df)
+        self.product_df = prepared.product_df
+        self.partition_index = IntelligentProductSelector._build_partition_index(self.product_df)
+    
+    def __len__(self):
+        return len(self.product_df)
+
+
+class FilterPlanCache:
+    """
+    NEW: Stage 1-4.5 candidate sets keyed by requirement.
+    Those stages depend only on the requirement and the catalog, so selectors over
+    the same catalog (e.g. design-sweep variants) can share one cache. Validation
+    warnings raised while filtering are stored and replayed on every hit.
+    """
+    
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(requirement: 'ProductRequirement'):
+        # Template-built requirements carry a precompiled key
+        if requirement.filter_plan is not None:
+            return requirement.filter_plan.key
+        # Quantity and justification text never reach the filter stages
+        return repr(replace(requirement, quantity=0, justification=''))
+    
+    def get(self, requirement: 'ProductRequirement') -> Optional[Tuple[Dict, List[Dict]]]:
+        entry = self._entries.get(self.key(requirement))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        stages, warnings = entry
+        return dict(stages), [dict(w) for w in warnings]
+    
+    def put(self, requirement: 'ProductRequirement', stages: Dict, warnings: List[Dict]):
+        self._entries[self.key(requirement)] = (dict(stages), [dict(w) for w in warnings])
+    
+    def __len__(self):
+        return len(self._entries)
 
 
 class IntelligentProductSelector:
@@ -136,22 +318,43 @@ class IntelligentProductSelector:
     """
     
     def __init__(self, product_df, client_preferences=None, budget_tier='Standard'):
-        self.product_df = product_df.copy()
         self.client_preferences = client_preferences or {}
         self.budget_tier = budget_tier
         self.selection_log = []
         self.existing_selections = []
         self.validation_warnings = []  # NEW: Track validation issues
         
-        # Standardize columns
-        self._standardize_price_column()
-        self._normalize_dataframe_categories()
+        # NEW: Lazily built (category, sub_category) -> row positions index
+        self._partition_index = None
+        
+        if isinstance(product_df, SharedCatalog):
+            # NEW: Already standardized and indexed - share it read-only, no copy
+            self.product_df = product_df.product_df
+            self._partition_index = product_df.partition_index
+        else:
+            self.product_df = product_df.copy()
+            
+            # Standardize columns
+            self._standardize_price_column()
+            self._normalize_dataframe_categories()
         
         # NEW: Build category validation database
         self._build_category_validators()
 
         # NEW: Unified context (from PHASE 4)
         self.unified_context = None  # Will be set by BOQ generator
+        
+        # NEW: Per-component stage candidates from the last select_blueprint() call
+        self.blueprint_stage_sets = {}
+        
+        # NEW: Optional FilterPlanCache shared with other selectors on this catalog
+        self.filter_cache = None
+        
+        # NEW: Neighbour index for suggest_alternatives (built on first use)
+        self.alternatives_engine = None
+        
+        # NEW: Shared, precompiled brand ecosystem tables
+        self.ecosystem = get_brand_ecosystem_manager()
     
     def _standardize_price_column(self):
         """Ensure consistent 'price' column"""
@@ -333,6 +536,96 @@ class IntelligentProductSelector:
         """
         ENHANCED: Multi-stage product selection with strict validation and detailed logging
         """
+        candidates = self._filter_candidates(requirement)
+        if candidates is None:
+            return None
+        
+        return self._finalize_selection(candidates, requirement)
+    
+    def select_blueprint(self, blueprint: Dict[str, ProductRequirement]) -> Dict[str, Optional[Dict]]:
+        """
+        NEW: Resolve a whole room blueprint in one pass over the catalog.
+        Requirements are grouped by catalog partition (category/sub-category); each
+        partition is sliced and service-filtered once and every requirement's filter
+        plan (stages 1-4.5) runs on that slice. The order-dependent preference,
+        ecosystem and budget stages then run in blueprint order.
+        Returns {component_key: product dict or None}.
+        """
+        partitions = {}
+        for component_key, requirement in blueprint.items():
+            partitions.setdefault(self._partition_key(requirement), []).append(component_key)
+        
+        self.log(f"\n📦 Batch selection: {len(blueprint)} components across {len(partitions)} catalog partitions")
+        
+        # PASS 1: Filter plans, one catalog slice per partition (sliced only on a cache miss)
+        stage_sets = {}
+        for component_keys in partitions.values():
+            first_req = blueprint[component_keys[0]]
+            partition_df = None
+            for component_key in component_keys:
+                requirement = blueprint[component_key]
+                cached = self.filter_cache.get(requirement) if self.filter_cache is not None else None
+                if cached is not None:
+                    stage_sets[component_key], warnings = cached
+                    self.validation_warnings.extend(warnings)
+                    self.log(f"♻️ Reusing cached filter plan for: {requirement.sub_category}")
+                    continue
+                
+                if partition_df is None:
+                    partition_df = self._filter_service_contracts(self._get_partition(first_req), first_req)
+                stage_sets[component_key] = {}
+                warnings_before = len(self.validation_warnings)
+                self._filter_candidates(requirement, partition_df, stage_sets[component_key])
+                if self.filter_cache is not None:
+                    self.filter_cache.put(requirement, stage_sets[component_key],
+                                          self.validation_warnings[warnings_before:])
+        
+        # PASS 2: Sequential selection (depends on earlier selections)
+        selections = {}
+        for component_key, requirement in blueprint.items():
+            # Own copy: the filter cache shares the stage 1-4.5 dict across selectors
+            stages = stage_sets[component_key] = dict(stage_sets[component_key])
+            candidates = stages.get('validated')
+            selected = self._finalize_selection(candidates, requirement, stages) if candidates is not None else None
+            if not selected:
+                selected = self._fallback_selection(requirement, stages)
+            selections[component_key] = selected
+        
+        self.blueprint_stage_sets = stage_sets
+        return selections
+    
+    def budget_alternatives(self, component_key: str, requirement: ProductRequirement) -> Optional[pd.DataFrame]:
+        """
+        NEW: Products a room-level optimizer may swap in for a blueprint component:
+        the strict path's post-ecosystem candidates that also pass Stage 7 (category)
+        and Stage 7.5 (AVIXA display sizing). None when the component's selection
+        came from a fallback.
+        """
+        preferred = self.blueprint_stage_sets.get(component_key, {}).get('preferred')
+        if preferred is None or preferred.empty:
+            return None
+        
+        avixa_calcs = self.unified_context.avixa_calculations if self.unified_context else None
+        keep = []
+        for product in preferred.to_dict('records'):
+            is_valid, _ = self._validate_product_category(product, requirement)
+            if is_valid and avixa_calcs is not None:
+                is_valid, _ = self._validate_avixa_display_sizing(product, avixa_calcs)
+            keep.append(is_valid)
+        alternatives = preferred[keep]
+        return alternatives if not alternatives.empty else None
+    
+    def _filter_candidates(self, requirement: ProductRequirement, partition_df=None, stages=None):
+        """
+        Stages 1-4.5: Filter the catalog down to valid candidates for a requirement.
+        partition_df: optional pre-sliced, service-filtered partition (batch mode).
+        stages: optional dict that receives the candidate set after each stage, so
+        fallbacks can resume from the last valid stage instead of re-filtering.
+        Returns None when no candidates survive (selection aborts before stage 5).
+        """
+        if stages is None:
+            stages = {}
+        
         self.log(f"\n{'='*60}")
         self.log(f"🎯 Selecting product for: {requirement.sub_category}")
         self.log(f"    Category: {requirement.category}")
@@ -341,31 +634,42 @@ class IntelligentProductSelector:
         self.log(f"    Blacklist: {requirement.blacklist_keywords}")
         self.log(f"    Min Price: ${requirement.min_price}")
         
-        # STAGE 1: Category Filter
-        candidates = self._filter_by_category(requirement)
-        if candidates.empty:
-            self.log(f"❌ No products found in category: {requirement.category}/{requirement.sub_category}")
-            return None
-        
-        # STAGE 2: Service Contract Filter
-        candidates = self._filter_service_contracts(candidates, requirement)
-        if candidates.empty:
-            self.log(f"❌ All products were service contracts")
-            return None
+        if partition_df is None:
+            # STAGE 1: Category Filter
+            candidates = self._filter_by_category(requirement)
+            stages['category'] = candidates
+            if candidates.empty:
+                self.log(f"❌ No products found in category: {requirement.category}/{requirement.sub_category}")
+                return None
+            
+            # STAGE 2: Service Contract Filter
+            candidates = self._filter_service_contracts(candidates, requirement)
+            stages['service'] = candidates
+            if candidates.empty:
+                self.log(f"❌ All products were service contracts")
+                return None
+        else:
+            # STAGES 1-2 already applied to the partition; only price bounds remain
+            candidates = self._apply_price_bounds(partition_df, requirement)
+            self.log(f"    Stage 1/2 - Partition filter: {len(candidates)} products")
+            stages['category'] = stages['service'] = candidates
+            if candidates.empty:
+                self.log(f"❌ No products found in category: {requirement.category}/{requirement.sub_category}")
+                return None
         
         # STAGE 3: Keyword Filters
-        candidates = self._apply_keyword_filters(candidates, requirement)
-        if candidates.empty:
+        keyword_candidates = self._apply_keyword_filters(candidates, requirement)
+        stages['keyword'] = keyword_candidates
+        if keyword_candidates.empty:
             self.log(f"❌ No products passed keyword filters")
             return None
         
         # STAGE 4: Specification Matching (with size validation)
-        candidates = self._match_specifications(candidates, requirement)
+        candidates = self._match_specifications(keyword_candidates, requirement)
         if candidates.empty:
             self.log(f"⚠️ No products matched specifications, using broader search")
-            candidates = self._filter_by_category(requirement)
-            candidates = self._filter_service_contracts(candidates, requirement)
-            candidates = self._apply_keyword_filters(candidates, requirement)
+            candidates = keyword_candidates
+        stages['spec'] = candidates
         
         # NEW STAGE 4.5: Strict Category Validation
         candidates = self._apply_strict_validation(candidates, requirement)
@@ -373,6 +677,13 @@ class IntelligentProductSelector:
             self.log(f"❌ No products passed strict validation for {requirement.category}")
             return None
         
+        stages['validated'] = candidates
+        return candidates
+    
+    def _finalize_selection(self, candidates, requirement: ProductRequirement, stages=None) -> Optional[Dict]:
+        """
+        Stages 5-8: Preference, ecosystem and budget selection plus final validation
+        """
         # STAGE 5: Client Preference Weighting
         candidates = self._apply_client_preferences(candidates, requirement)
         
@@ -413,6 +724,10 @@ class IntelligentProductSelector:
                         'severity': 'HIGH'
                     })
             
+            # Only a strict-path pick makes the post-ecosystem set a pool of valid alternatives
+            if stages is not None:
+                stages['preferred'] = candidates
+            
             price = selected.get('price', 0)
             self.log(f"✅ SELECTED: {selected['brand']} {selected['model_number']}")
             self.log(f"    Price: ${price:.2f}")
@@ -464,17 +779,29 @@ class IntelligentProductSelector:
         ENHANCED: Try strict selection first, then intelligent fallbacks
         """
         
-        # Attempt 1: Strict selection
-        selected = self.select_product(requirement)
+        # Attempt 1: Strict selection (keeping every stage's candidates)
+        stages = {}
+        candidates = self._filter_candidates(requirement, stages=stages)
+        selected = self._finalize_selection(candidates, requirement) if candidates is not None else None
         
         if selected:
             return selected
         
+        return self._fallback_selection(requirement, stages)
+    
+    def _fallback_selection(self, requirement: ProductRequirement, stages: Dict = None) -> Optional[Dict]:
+        """
+        Attempts 2-4 of the fallback chain, after strict selection failed.
+        Resumes from the strict attempt's stage candidates and never mutates the requirement.
+        """
+        stages = stages or {}
+        
         # Attempt 2: Relax brand preference if nothing found
-        if requirement.client_preference_weight == 1.0:
+        # Stages 1-4.5 don't depend on brand weight, so resume from stage 5
+        if requirement.client_preference_weight == 1.0 and stages.get('validated') is not None:
             self.log(f"    🔄 No products found with strict brand preference, trying alternates...")
-            requirement.client_preference_weight = 0.5
-            selected = self.select_product(requirement)
+            relaxed_req = replace(requirement, client_preference_weight=0.5)
+            selected = self._finalize_selection(stages['validated'], relaxed_req)
             
             if selected:
                 self.validation_warnings.append({
@@ -488,14 +815,19 @@ class IntelligentProductSelector:
         self.log(f"    🔄 Attempting broader category search...")
         
         if requirement.category == 'Video Conferencing' and 'PTZ Camera' in requirement.sub_category:
-            # Try room kits that include cameras
-            requirement.sub_category = 'Room Kit / Codec'
-            requirement.required_keywords = ['room kit', 'camera', 'system']
-            selected = self.select_product(requirement)
+            # Try room kits that include cameras (different partition, so filter afresh).
+            # Drop the PTZ filter plan: its regexes and cache key belong to the camera keywords
+            room_kit_req = replace(
+                requirement,
+                sub_category='Room Kit / Codec',
+                required_keywords=['room kit', 'camera', 'system'],
+                filter_plan=None
+            )
+            selected = self.select_product(room_kit_req)
             
             if selected:
                 self.validation_warnings.append({
-                    'component': requirement.sub_category,
+                    'component': room_kit_req.sub_category,
                     'issue': 'Using room kit instead of standalone PTZ camera',
                     'severity': 'LOW'
                 })
@@ -511,52 +843,24 @@ class IntelligentProductSelector:
         
         return None
     
-    def suggest_alternatives(self, selected_product: Dict, requirement: ProductRequirement, count: int = 3) -> List[Dict]:
+    def suggest_alternatives(self, selected_product: Dict, requirement: ProductRequirement, count: int = 3,
+                             price_direction: str = 'any', brands: Optional[List[str]] = None) -> List[Dict]:
         """
         Suggest alternative products if client wants options
+        ENHANCED: Served from precomputed neighbour lists (spec similarity + price distance)
+        price_direction: 'any', 'cheaper' or 'pricier'; brands: optional brand whitelist
         """
-        
-        alternatives = []
-        
-        # Get similar products
-        similar_products = self.product_df[
-            (self.product_df['category'] == requirement.category) &
-            (self.product_df['sub_category'] == requirement.sub_category)
-        ].copy()
-        
-        # Remove the selected product
-        similar_products = similar_products[
-            similar_products['model_number'] != selected_product.get('model_number')
-        ]
-        
-        if similar_products.empty:
-            return []
-        
-        # Score alternatives based on:
-        # 1. Price similarity (±20%)
-        # 2. Brand reputation
-        # 3. Feature richness
-        
-        selected_price = selected_product.get('price', 0)
-        
-        similar_products['price_similarity'] = similar_products['price'].apply(
-            lambda x: 100 - abs(x - selected_price) / selected_price * 100 if selected_price > 0 else 0
+        if self.alternatives_engine is None:
+            self.alternatives_engine = AlternativesEngine(self.product_df)
+        
+        return self.alternatives_engine.top_k(
+            selected_product,
+            count=count,
+            price_direction=price_direction,
+            brands=brands,
+            category=requirement.category,
+            sub_category=requirement.sub_category
         )
-        
-        # Sort by quality score and price similarity
-        similar_products = similar_products.sort_values(
-            by=['data_quality_score', 'price_similarity'],
-            ascending=[False, False]
-        )
-        
-        # Return top alternatives
-        for _, product in similar_products.head(count).iterrows():
-            alt = product.to_dict()
-            alt['price_difference'] = product['price'] - selected_price
-            alt['price_difference_pct'] = (alt['price_difference'] / selected_price * 100) if selected_price > 0 else 0
-            alternatives.append(alt)
-        
-        return alternatives
 
     def _validate_avixa_display_sizing(self, product: Dict, avixa_calcs: Dict) -> Tuple[bool, str]:
         """
@@ -643,26 +947,48 @@ class IntelligentProductSelector:
     def _filter_by_category(self, req: ProductRequirement):
         """Stage 1: Filter by category"""
         
+        df = self._apply_price_bounds(self._get_partition(req), req)
+        
+        self.log(f"    Stage 1 - Category filter: {len(df)} products")
+        return df
+
+    def _partition_key(self, req: ProductRequirement) -> Tuple[str, str]:
+        """Catalog partition a requirement draws its candidates from"""
+        return (req.category, req.sub_category or '')
+
+    def _get_partition(self, req: ProductRequirement):
+        """
+        NEW: Category slice for a requirement. Exact category/sub-category slices are
+        served from an index built with a single groupby over the catalog.
+        """
         if req.category == 'General AV':
-            df = self.product_df[
+            return self.product_df[
                 self.product_df['name'].str.contains(req.sub_category, case=False, na=False) |
                 self.product_df['description'].str.contains(req.sub_category, case=False, na=False)
             ].copy()
-        elif req.sub_category:
-            df = self.product_df[
-                (self.product_df['category'] == req.category) &
-                (self.product_df['sub_category'] == req.sub_category)
-            ].copy()
-        else:
-            df = self.product_df[self.product_df['category'] == req.category].copy()
         
-        # Apply minimum/maximum price if specified
+        if not req.sub_category:
+            return self.product_df[self.product_df['category'] == req.category].copy()
+        
+        if self._partition_index is None:
+            self._partition_index = self._build_partition_index(self.product_df)
+        
+        positions = self._partition_index.get((req.category, req.sub_category))
+        if positions is None:
+            return self.product_df.iloc[0:0].copy()
+        return self.product_df.iloc[positions].copy()
+
+    @staticmethod
+    def _build_partition_index(product_df) -> Dict[Tuple[str, str], Any]:
+        """(category, sub_category) -> row positions, from one groupby"""
+        return product_df.groupby(['category', 'sub_category'], sort=False).indices
+
+    def _apply_price_bounds(self, df, req: ProductRequirement):
+        """Apply minimum/maximum price if specified"""
         if hasattr(req, 'min_price') and req.min_price:
             df = df[df['price'] >= req.min_price]
         if hasattr(req, 'max_price') and req.max_price:
             df = df[df['price'] <= req.max_price]
-        
-        self.log(f"    Stage 1 - Category filter: {len(df)} products")
         return df
 
     def _filter_service_contracts(self, df, req: ProductRequirement):
@@ -691,17 +1017,18 @@ class IntelligentProductSelector:
     def _apply_keyword_filters(self, df, req: ProductRequirement):
         """Stage 3: Apply required and blacklist keywords"""
         
+        plan = req.filter_plan or FilterPlan.build((), req.required_keywords, req.blacklist_keywords)
+        
         # Required keywords
-        if req.required_keywords:
-            pattern = '|'.join([re.escape(kw) for kw in req.required_keywords])
-            df = df[df['name'].str.contains(pattern, case=False, na=False, regex=True)]
+        if plan.required_pattern:
+            df = df[df['name'].str.contains(plan.required_pattern, case=False, na=False, regex=True)]
             self.log(f"    Stage 3a - Required keywords: {len(df)} products")
         
         # Blacklist keywords
-        if req.blacklist_keywords:
-            for keyword in req.blacklist_keywords:
+        if plan.blacklist_patterns:
+            for keyword, pattern in plan.blacklist_patterns:
                 before = len(df)
-                df = df[~df['name'].str.contains(re.escape(keyword), case=False, na=False, regex=True)]
+                df = df[~df['name'].str.contains(pattern, case=False, na=False, regex=True)]
                 removed = before - len(df)
                 if removed > 0:
                     self.log(f"    Stage 3b - Blacklist '{keyword}': removed {removed}")
@@ -1002,8 +1329,7 @@ class IntelligentProductSelector:
         # Tier-equivalent substitutes (only for non-VC)
         self.log(f"    ⚠️ BRAND NOT FOUND: '{preferred_brand}' not in {req.category}")
         
-        ecosystem_mgr = BrandEcosystemManager()
-        substitute_brands = ecosystem_mgr.get_substitute_brands(req.category, preferred_brand)
+        substitute_brands = self.ecosystem.get_substitute_brands(req.category, preferred_brand)
         
         if substitute_brands:
             self.log(f"    🔄 Searching tier-equivalent substitutes: {', '.join(substitute_brands)}")
@@ -1062,31 +1388,20 @@ class IntelligentProductSelector:
             # Find the VC platform from requirements context
             vc_platform = None
             # (PHASE 4) - Check for unified_context
-            if hasattr(self, 'unified_context'):
-                vc_platform = self.unified_context.technical.vc_platform.lower()
+            if self.unified_context:
+                vc_platform = self.unified_context.technical.vc_platform
             
             # If we have a VC platform, ensure audio is compatible
+            # (Microsoft Teams / Zoom certified audio brands from the ecosystem tables)
             if vc_platform and req.category == 'Audio':
+                certified_brands = self.ecosystem.platform_audio_brands(vc_platform)
                 
-                # Microsoft Teams requires specific audio brands
-                if 'teams' in vc_platform or 'microsoft' in vc_platform:
-                    teams_audio_brands = ['shure', 'biamp', 'qsc', 'bose', 'sennheiser', 'poly', 'yealink']
-                    
-                    # Filter for Teams-certified audio
-                    brand_matches = df[df['brand'].str.lower().isin(teams_audio_brands)]
-                    
-                    if not brand_matches.empty:
-                        self.log(f"    ✅ Filtering for Microsoft Teams-certified audio brands")
-                        return brand_matches
-                
-                # Zoom has different preferences
-                elif 'zoom' in vc_platform:
-                    zoom_audio_brands = ['shure', 'biamp', 'qsc', 'bose', 'poly', 'logitech']
-                    
-                    brand_matches = df[df['brand'].str.lower().isin(zoom_audio_brands)]
+                if certified_brands:
+                    brand_matches = df[df['brand'].str.lower().isin(certified_brands)]
                     
                     if not brand_matches.empty:
-                        self.log(f"    ✅ Filtering for Zoom-compatible audio brands")
+                        platform_name = 'Microsoft Teams-certified' if self.ecosystem.resolve_vc_platform(vc_platform) == 'teams' else 'Zoom-compatible'
+                        self.log(f"    ✅ Filtering for {platform_name} audio brands")
                         return brand_matches
             
             # Audio accessory matching with existing VC bar
@@ -1194,7 +1509,7 @@ class IntelligentProductSelector:
         """
         NEW: Validate that selected brands form a coherent ecosystem
         """
-        ecosystem_mgr = BrandEcosystemManager()
+        ecosystem_mgr = self.ecosystem
         
         # Extract selected brands by category
         selected_brands = {}
@@ -1208,7 +1523,7 @@ class IntelligentProductSelector:
                 selected_brands[category] = brand
             
             # (PHASE 4) - Check for unified_context
-            if 'Video Conferencing' in category and hasattr(self, 'unified_context'):
+            if 'Video Conferencing' in category and self.unified_context:
                 vc_platform = self.unified_context.technical.vc_platform
         
         # Check ecosystem compatibility
@@ -1235,51 +1550,56 @@ class IntelligentProductSelector:
     def _validate_cross_component_compatibility(self, boq_items: List[Dict]) -> List[str]:
         """
         ✅ NEW: Check compatibility between selected components in the final BOQ
+        ENHANCED: One pass to tag component roles, then ecosystem table lookups
         """
         warnings = []
         
-        # Check 1: Codec and Camera Brand Matching
-        codecs = [item for item in boq_items if 'Codec' in item.get('sub_category', '')]
-        cameras = [item for item in boq_items if 'Camera' in item.get('sub_category', '')]
+        # Tag roles in a single pass (first item per role anchors the checks)
+        roles = {}
+        mic_brands = set()
+        for item in boq_items:
+            sub_category = item.get('sub_category', '')
+            if 'Codec' in sub_category:
+                roles.setdefault('codec', item)
+            if 'Camera' in sub_category:
+                roles.setdefault('camera', item)
+            if 'DSP' in sub_category:
+                roles.setdefault('dsp', item)
+            if 'Microphone' in sub_category:
+                mic_brands.add(item.get('brand', '').lower())
+            if 'Control' in item.get('category', ''):
+                roles.setdefault('control', item)
         
-        if codecs and cameras:
-            codec_brand = codecs[0].get('brand', '').lower()
-            camera_brand = cameras[0].get('brand', '').lower()
-            
-            # Cisco codec should have Cisco camera
-            if 'cisco' in codec_brand and 'cisco' not in camera_brand:
+        # Check 1: Codec and Camera Brand Matching
+        # (Cisco codec should have Cisco camera)
+        if 'codec' in roles and 'camera' in roles:
+            paired = self.ecosystem.native_pairing_brand('codec', roles['codec'].get('brand', ''), 'camera')
+            if paired and paired not in roles['camera'].get('brand', '').lower():
                 warnings.append(
                     f"⚠️ Cisco codec typically pairs best with Cisco cameras. "
-                    f"Selected: {cameras[0].get('brand')} camera"
+                    f"Selected: {roles['camera'].get('brand')} camera"
                 )
         
         # Check 2: DSP and Microphone Ecosystem
-        dsps = [item for item in boq_items if 'DSP' in item.get('sub_category', '')]
-        mics = [item for item in boq_items if 'Microphone' in item.get('sub_category', '')]
-        
-        if dsps and mics:
-            dsp_brand = dsps[0].get('brand', '').lower()
-            mic_brands = set(mic.get('brand', '').lower() for mic in mics)
-            
-            # QSC DSP works best with QSC mics
-            if 'qsc' in dsp_brand and 'qsc' not in mic_brands:
+        # (QSC DSP works best with QSC mics)
+        if 'dsp' in roles and mic_brands:
+            paired = self.ecosystem.native_pairing_brand('dsp', roles['dsp'].get('brand', ''), 'microphone')
+            if paired and paired not in mic_brands:
                 warnings.append(
                     f"💡 QSC DSP recommended with QSC microphones for optimal integration"
                 )
         
         # Check 3: Control System and VC Platform
-        controls = [item for item in boq_items if 'Control' in item.get('category', '')]
-        
         # (PHASE 4) - Check for unified_context
-        if controls and hasattr(self, 'unified_context'):
-            vc_platform = self.unified_context.technical.vc_platform.lower()
-            control_brand = controls[0].get('brand', '').lower()
+        if 'control' in roles and self.unified_context:
+            required_brands = self.ecosystem.platform_control_brands(self.unified_context.technical.vc_platform)
+            control_brand = roles['control'].get('brand', '').lower()
             
             # Teams Rooms requires specific control brands
-            if 'teams' in vc_platform and control_brand not in ['crestron', 'logitech', 'poly']:
+            if required_brands and control_brand not in required_brands:
                 warnings.append(
                     f"⚠️ Microsoft Teams Rooms certification requires Crestron, Logitech, or Poly control. "
-                    f"Selected: {controls[0].get('brand')}"
+                    f"Selected: {roles['control'].get('brand')}"
                 )
         
         return warnings
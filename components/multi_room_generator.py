@@ -0,0 +1,138 @@
+# components/multi_room_generator.py
+"""
+Parallel Multi-Room BOQ Generation
+Runs headless room generation for every room of a project across a worker pool
+"""
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from components.requirements_context import UnifiedRequirementsContext
+from components.intelligent_product_selector import SharedCatalog
+from components.optimized_boq_generator import run_room_generation, RoomBOQResult
+
+DEFAULT_CEILING_HEIGHT_FT = 10.0
+DEFAULT_ASPECT_RATIO = 1.5  # length : width for rooms that only store an area
+
+# progress(room_index, fraction 0..1, message), done(room_index, result)
+RoomProgressCallback = Callable[[int, float, str], None]
+RoomDoneCallback = Callable[[int, RoomBOQResult], None]
+
+
+def room_dimensions(room: Dict[str, Any]) -> Tuple[float, float, float]:
+    """(length, width, ceiling height) for a project_rooms entry; older entries only store 'area'"""
+    height = float(room.get('ceiling_height') or DEFAULT_CEILING_HEIGHT_FT)
+    if room.get('length') and room.get('width'):
+        return float(room['length']), float(room['width']), height
+
+    area = float(room.get('area') or 0) or 400.0
+    width = math.sqrt(area / DEFAULT_ASPECT_RATIO)
+    return area / width, width, height
+
+
+def build_room_contexts(base_context: UnifiedRequirementsContext,
+                        rooms: List[Dict[str, Any]]) -> List[UnifiedRequirementsContext]:
+    """One independent context per project room (same brands/technical/project choices)"""
+    contexts = []
+    for room in rooms:
+        length, width, height = room_dimensions(room)
+        contexts.append(base_context.for_room(
+            room_name=room.get('name', f"Room {len(contexts) + 1}"),
+            room_type=room.get('type') or base_context.room.room_type,
+            length_ft=length,
+            width_ft=width,
+            ceiling_height_ft=height,
+            seating_capacity=room.get('seating_capacity')
+        ))
+    return contexts
+
+
+# --- Process-pool workers get the catalog once, at start-up ---
+_worker_catalog = None
+
+
+def _init_process_worker(catalog: SharedCatalog):
+    global _worker_catalog
+    _worker_catalog = catalog
+
+
+def _generate_in_process(index: int, context: UnifiedRequirementsContext) -> Tuple[int, RoomBOQResult]:
+    result = run_room_generation(context, _worker_catalog)
+    result.selector = None  # Holds the whole catalog - not worth sending back
+    result.generator = None
+    return index, result
+
+
+def _failed_result(context: UnifiedRequirementsContext, error: Exception) -> RoomBOQResult:
+    message = f"❌ Generation failed for {context.room.room_name}: {error}"
+    return RoomBOQResult(
+        items=[],
+        validation={'issues': [message], 'warnings': [], 'avixa_compliance_report': {}, 'compliance_score': 0},
+        context=context,
+        messages=[('error', message)]
+    )
+
+
+def generate_project_boqs(contexts: List[UnifiedRequirementsContext], catalog,
+                          max_workers: Optional[int] = None, use_processes: bool = False,
+                          on_room_progress: Optional[RoomProgressCallback] = None,
+                          on_room_done: Optional[RoomDoneCallback] = None) -> List[RoomBOQResult]:
+    """
+    Generate BOQs for many rooms concurrently.
+
+    Args:
+        contexts: One context per room (see build_room_contexts)
+        catalog: Product DataFrame or SharedCatalog; prepared once and shared read-only
+        use_processes: Process pool instead of threads (catalog is sent once per worker)
+        on_room_progress: Per-room stage progress; called from worker threads (thread pool only)
+        on_room_done: Called in the calling thread as each room finishes
+
+    Returns:
+        RoomBOQResult list in the same order as contexts. A room that raises gets an
+        empty result with the error in its validation issues.
+    """
+    results: List[Optional[RoomBOQResult]] = [None] * len(contexts)
+    if not contexts:
+        return []
+
+    shared = catalog if isinstance(catalog, SharedCatalog) else SharedCatalog(catalog)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(contexts)))
+
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_process_worker,
+                                       initargs=(shared,))
+        submit = lambda i, ctx: executor.submit(_generate_in_process, i, ctx)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='boq-room')
+
+        def run_thread(i, ctx):
+            progress = (lambda fraction, message: on_room_progress(i, fraction, message)) if on_room_progress else None
+            return i, run_room_generation(ctx, shared, progress=progress)
+
+        submit = lambda i, ctx: executor.submit(run_thread, i, ctx)
+
+    with executor:
+        futures = {submit(i, ctx): i for i, ctx in enumerate(contexts)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                _, result = future.result()
+            except Exception as e:
+                result = _failed_result(contexts[index], e)
+            results[index] = result
+            if on_room_done:
+                on_room_done(index, result)
+
+    return results
+
+
+def merge_into_project_rooms(project_rooms: List[Dict[str, Any]], results: List[RoomBOQResult]):
+    """Write results back into project_rooms entries, in room order"""
+    for room, result in zip(project_rooms, results):
+        room['boq_items'] = result.items
+        room['validation_results'] = result.validation
+        room['quality_score'] = result.quality_score
+        if result.context is not None:
+            room['avixa_calculations'] = result.context.avixa_calculations
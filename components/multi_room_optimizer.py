@@ -6,7 +6,10 @@ Consolidates shared infrastructure across multiple rooms for cost savings
 
 import math
 from typing import List, Dict, Any, Optional
-import streamlit as st
+try:
+    import streamlit as st
+except ImportError:  # Headless use without Streamlit installed
+    st = None
 
 
 class MultiRoomOptimizer:
@@ -14,8 +17,26 @@ class MultiRoomOptimizer:
     Analyzes multiple rooms and consolidates equipment where beneficial
     """
     
-    def __init__(self):
+    def __init__(self, optimization_enabled: Optional[bool] = None,
+                 rooms_are_adjacent: Optional[bool] = None):
+        """
+        NEW: Settings can be passed explicitly (headless use); when omitted they
+        are read from the Streamlit sidebar toggles.
+        """
         self.optimization_threshold = 3  # Minimum rooms for optimization
+        self.optimization_enabled = optimization_enabled
+        self.rooms_are_adjacent = rooms_are_adjacent
+    
+    def _setting(self, value: Optional[bool], session_key: str, default: bool) -> bool:
+        """Explicit setting, else the Streamlit session toggle, else the default"""
+        if value is not None:
+            return value
+        if st is None:
+            return default
+        try:
+            return bool(st.session_state.get(session_key, default))
+        except Exception:  # No Streamlit session (batch/worker use)
+            return default
         
     def optimize_multi_room_project(self, rooms_data: List[Dict]) -> Dict[str, Any]:
         """
@@ -37,7 +58,7 @@ class MultiRoomOptimizer:
             }
         
         # Check if optimization is enabled (user toggle)
-        if not st.session_state.get('multi_room_optimization_enabled', True):
+        if not self._setting(self.optimization_enabled, 'multi_room_optimization_enabled', True):
             return {
                 'optimization': 'disabled',
                 'savings_pct': 0,
@@ -227,7 +248,7 @@ class MultiRoomOptimizer:
         )
         
         # Only consolidate if user confirms rooms are adjacent
-        if st.session_state.get('rooms_are_adjacent', False):
+        if self._setting(self.rooms_are_adjacent, 'rooms_are_adjacent', False):
             return {
                 'enabled': True,
                 'type': 'Centralized Multi-Zone Amplifier',
@@ -377,7 +398,7 @@ class MultiRoomOptimizer:
         Check if rooms are physically adjacent (requires user input)
         For MVP, return False. In production, prompt user.
         """
-        return st.session_state.get('rooms_are_adjacent', False)
+        return self._setting(self.rooms_are_adjacent, 'rooms_are_adjacent', False)
 
 
 # ==================== HELPER FUNCTIONS ====================
@@ -1,408 +1,258 @@
 # components/optimized_boq_generator.py
 # ENHANCED VERSION - PHASE 4: UnifiedRequirementsContext Integration
 
-import streamlit as st
-from typing import Dict, List, Any, Tuple
+from dataclasses import dataclass, field, asdict, replace
+from typing import Dict, List, Any, Tuple, Optional, Callable
 import pandas as pd
-import math
+import time
 
 # NEW: Import the unified context
 from components.requirements_context import UnifiedRequirementsContext
 # OLD: ClientRequirements is no longer needed
 # from components.smart_questionnaire import ClientRequirements
 from components.room_profiles import ROOM_SPECS
-from components.intelligent_product_selector import IntelligentProductSelector, ProductRequirement
+from components.intelligent_product_selector import IntelligentProductSelector, ProductRequirement, FilterPlanCache
+from components.room_budget_optimizer import RoomBudgetOptimizer
 from components.av_designer import calculate_avixa_recommendations
+from components.avixa_engine import AVIXAEngine, analyze_room
+from components.boq_columns import BOQColumns
+from components.blueprint_templates import instantiate, room_template
 
-# PRODUCTION: Room-specific display constraints
-ROOM_DISPLAY_CONSTRAINTS = {
-    'Small Huddle Room (2-3 People)': {'min': 43, 'max': 55},
-    'Medium Huddle Room (4-6 People)': {'min': 50, 'max': 65},
-    'Standard Conference Room (6-8 People)': {'min': 55, 'max': 75},
-    'Large Conference Room (8-12 People)': {'min': 65, 'max': 85},
-    'Executive Boardroom (10-16 People)': {'min': 75, 'max': 98},
-    'Training Room (15-25 People)': {'min': 75, 'max': 98},
-    'Large Training/Presentation Room (25-40 People)': {'min': 98, 'max': 110},
-    'Multipurpose Event Room (40+ People)': {'min': 98, 'max': 120},
+# NEW: Headless callback signatures - progress(fraction 0..1, message), log(message, level)
+ProgressCallback = Callable[[float, str], None]
+LogCallback = Callable[[str, str], None]
+
+# NEW: Incremental regeneration dependency map.
+# Selection inputs that are NOT part of a component's ProductRequirement:
+# context field -> categories to re-select when it changes ('*' = every component).
+# Anything that reaches the blueprint is caught by comparing requirements directly.
+SELECTION_FIELD_DEPENDENCIES = {
+    'project.budget_tier': {'*'},
+    'brands.displays': {'Displays'},
+    'brands.video_conferencing': {'Video Conferencing'},
+    'brands.audio': {'Audio'},
+    'brands.control': {'Control Systems', 'Signal Management', 'Lighting'},
+    'brands.vc_ecosystem_brand': {'Video Conferencing'},
+    'technical.vc_platform': {'Audio', 'Video Conferencing', 'Control Systems'},
+}
+
+# Context fields written by the generator itself (outputs, not inputs)
+DERIVED_CONTEXT_FIELDS = {
+    'technical.display_size_avixa', 'technical.display_size_final',
+    'technical.microphone_count_avixa', 'technical.speaker_count_avixa',
+    'brands.audio_ecosystem_brand',
 }
 
-class EnhancedAVIXACalculator:
+class EnhancedAVIXACalculator(AVIXAEngine):
     """
     Implements ALL AVIXA calculations from guidelines document
+    ✅ CONSOLIDATED: Formulas now live in components/avixa_engine.py
+    """
+
+
+class OptimizedBOQGenerator:
+    """
+    ENHANCED: Now uses full AVIXA calculations and production-ready logic
     """
     
-    @staticmethod
-    def calculate_display_size_discas(room_length: float, room_width: float, content_type: str = "BDM") -> Dict:
+    def __init__(self, product_df: pd.DataFrame, unified_context: 'UnifiedRequirementsContext',
+                 progress_callback: Optional[ProgressCallback] = None,
+                 log_callback: Optional[LogCallback] = None,
+                 camera_selects_codec: bool = False):
         """
-        AVIXA DISCAS - Display Image Size for 2D Content
-        Section 1 of guidelines
+        UPDATED: Now accepts UnifiedRequirementsContext instead of ClientRequirements
+        NEW: Optional progress/log callbacks (the generator itself never touches the UI)
+        NEW: camera_selects_codec - a PTZ / multi-camera camera_type gets the codec
+        system in any room size (design sweeps only; rooms are sized by area otherwise)
         """
-        # Maximum viewing distance (85% of room length for furniture)
-        max_viewing_distance = max(room_length, room_width) * 0.85
+        self.product_df = product_df
+        self.context = unified_context  # The single source of truth
+        self.progress_callback = progress_callback
+        self.log_callback = log_callback
+        self.camera_selects_codec = camera_selects_codec
+        self.avixa_calc = EnhancedAVIXACalculator()
         
-        if content_type == "ADM":  # Analytical Decision Making
-            # Formula: Image Height = (Farthest Viewer Distance ÷ 3438) × Vertical Resolution
-            min_image_height = (max_viewing_distance / 3438) * 1080  # Assuming 1080p
-            
-        elif content_type == "BDM":  # Basic Decision Making (presentations)
-            # Formula: Image Height = (Farthest Viewer Distance ÷ 200) ÷ Element Height %
-            element_height_percent = 0.04  # 4% for standard presentations
-            min_image_height = (max_viewing_distance / 200) / element_height_percent
-            
-        else:  # Passive viewing
-            # Formula: Image Height = Viewing Distance ÷ 8
-            min_image_height = max_viewing_distance / 8
+        self.selector = IntelligentProductSelector(
+            product_df=product_df,
+            client_preferences=unified_context.brands.__dict__,
+            budget_tier=unified_context.project.budget_tier
+        )
         
-        # Convert to diagonal (16:9 aspect ratio)
-        recommended_diagonal = min_image_height * 2.22
+        # Pass unified context to selector
+        self.selector.unified_context = unified_context
         
-        # Snap to available sizes
-        available_sizes = [43, 55, 65, 75, 85, 98]
-        selected_size = min((size for size in available_sizes if size >= recommended_diagonal), default=98)
+        # NEW: State of the last generation, for regenerate_boq_for_room()
+        self._last_generation = None
+        self.last_reselected = []
         
-        return {
-            'max_viewing_distance_ft': max_viewing_distance,
-            'min_image_height_inches': min_image_height,
-            'recommended_diagonal_inches': recommended_diagonal,
-            'selected_size_inches': selected_size,
-            'content_type': content_type
-        }
+        # NEW: Columnar view built by the last validate_boq() call (reused for scoring)
+        self.last_boq_columns = None
     
-    @staticmethod
-    def validate_viewing_angles(room_width: float, display_width_inches: float, seating_rows: int) -> Dict:
-        """
-        AVIXA Viewing Angle Standards
-        Section 1 of guidelines
-        """
-        display_width_ft = display_width_inches / 12 * 0.871  # 16:9 conversion
-        
-        # Calculate horizontal viewing angles
-        optimal_viewing_zone = room_width * 0.6  # 60% of room width
-        
-        # Maximum offset for 45° viewing angle
-        max_offset = display_width_ft / 2 + math.tan(math.radians(45)) * 10  # Assuming 10ft viewing distance
-        
-        seats_within_optimal = optimal_viewing_zone >= room_width * 0.8
-        
-        return {
-            'optimal_viewing_zone_ft': optimal_viewing_zone,
-            'max_acceptable_offset_ft': max_offset,
-            'all_seats_acceptable': seats_within_optimal,
-            'horizontal_angle_max': 45,
-            'vertical_angle_max': 30
-        }
+    def _notify(self, message: str, level: str = 'success'):
+        """Forward a user-facing status message to the log callback, if any"""
+        if self.log_callback:
+            self.log_callback(message, level)
     
-    @staticmethod
-    def calculate_audio_coverage_a102(room_area: float, ceiling_height: float, 
-                                       room_type: str, occupancy: int = None) -> Dict:
-        """
-        ENHANCED: Now scales with actual occupancy, not just area
-        AVIXA A102.01:2017 - Audio Coverage Uniformity
-        Section 2 of guidelines
-        """
-        # Base coverage (area-based)
-        if ceiling_height <= 9:
-            coverage_per_speaker = 150
-        elif ceiling_height <= 12:
-            coverage_per_speaker = 200
-        else:
-            coverage_per_speaker = 250
-
-        # Room type adjustment
-        if room_type in ["Conference", "Meeting"]:
-            coverage_per_speaker *= 0.8
-        elif room_type in ["Training", "Classroom"]:
-            coverage_per_speaker *= 0.9
-
-        area_based_speakers = max(2, math.ceil(room_area / coverage_per_speaker))
-
-        # NEW: Occupancy-based validation
-        if occupancy:
-            # AVIXA guideline: 1 speaker per 6-8 people in training/presentation environments
-            if "Training" in room_type or "Presentation" in room_type:
-                occupancy_based_speakers = max(2, math.ceil(occupancy / 7))
-                
-                # Use the HIGHER of the two calculations
-                speakers_needed = max(area_based_speakers, occupancy_based_speakers)
-            else:
-                speakers_needed = area_based_speakers
-        else:
-            speakers_needed = area_based_speakers
-
-        # Target STI
-        target_sti = 0.70 if "Executive" in room_type or "Critical" in room_type else 0.60
-
-        return {
-            'speakers_needed': speakers_needed,
-            'calculation_basis': 'area + occupancy' if occupancy else 'area only',
-            'coverage_per_speaker_sqft': coverage_per_speaker,
-            'target_sti': target_sti,
-            'spl_uniformity_target': '±3 dB (500Hz-4kHz)',
-            'ceiling_height_ft': ceiling_height
-        }
-
-    @staticmethod
-    def calculate_microphone_coverage(room_area: float, table_config: str) -> Dict:
-        """
-        AVIXA Microphone Coverage Standards
-        Section 2 of guidelines
-        """
-        if table_config == "round_table":
-            mic_coverage_area = 80  # sq ft per microphone
-            mic_type = "Table/Boundary Microphone"
-            
-        elif table_config == "conference_table":
-            mic_spacing_ft = 6  # feet between mics
-            table_length = math.sqrt(room_area) * 0.7  # Estimate
-            mics_needed = max(2, math.ceil(table_length / mic_spacing_ft))
-            return {
-                'mics_needed': mics_needed,
-                'mic_type': "Gooseneck/Array Microphone",
-                'spacing_ft': mic_spacing_ft,
-                'pickup_pattern': "Cardioid/Supercardioid"
-            }
-            
-        else:  # Open floor plan
-            mic_coverage_area = 150  # sq ft per ceiling mic
-            mic_type = "Ceiling Array Microphone"
-        
-        mics_needed = max(2, math.ceil(room_area / mic_coverage_area))
-        
-        return {
-            'mics_needed': mics_needed,
-            'mic_type': mic_type,
-            'coverage_area_sqft': mic_coverage_area,
-            'pickup_pattern': 'Omnidirectional (ceiling)' if 'Ceiling' in mic_type else 'Cardioid'
-        }
+    def _progress(self, fraction: float, message: str):
+        """Report generation progress (0.0 - 1.0) to the progress callback, if any"""
+        if self.progress_callback:
+            self.progress_callback(fraction, message)
     
-    @staticmethod
-    def calculate_required_amplifier_power(room_volume: float, target_spl: float, speaker_sensitivity: float = 89) -> Dict:
+    def generate_boq_for_room(self) -> Tuple[List[Dict], Dict[str, Any]]:
         """
-        AVIXA SPL Calculation
-        Section 2 of guidelines
+        UPDATED: Uses unified context instead of separate parameters
         """
-        # Distance to farthest listener (estimate)
-        room_length = (room_volume / 10) ** (1/3)  # Rough estimate
-        distance_meters = room_length * 0.3048 * 0.85
-        
-        # Account for room acoustics
-        if room_volume < 5000:
-            acoustic_loss = 3  # dB
-        elif room_volume < 15000:
-            acoustic_loss = 6
-        else:
-            acoustic_loss = 10
-        
-        adjusted_target_spl = target_spl + acoustic_loss
-        
-        # Power calculation
-        power_watts = 10 ** ((adjusted_target_spl - speaker_sensitivity + 20 * math.log10(distance_meters)) / 10)
+        # === COMPREHENSIVE AVIXA CALCULATIONS ===
+        self._progress(0.1, "📊 Running AVIXA Standards Analysis...")
+        self._run_avixa_analysis()
         
-        # Add headroom (safety factor)
-        recommended_power = power_watts * 2
+        # Build blueprint using AVIXA calculations
+        self._progress(0.25, "🎯 Building logical equipment blueprint...")
+        blueprint = self._build_avixa_compliant_blueprint()
         
-        return {
-            'required_power_watts': power_watts,
-            'recommended_power_watts': recommended_power,
-            'target_spl_db': target_spl,
-            'speaker_sensitivity_db': speaker_sensitivity,
-            'acoustic_loss_db': acoustic_loss
-        }
+        # Select products (whole blueprint in one catalog pass, with fallbacks)
+        self._progress(0.5, "🔍 Selecting optimal products...")
+        selections = self.selector.select_blueprint(blueprint)
+        self._remember_generation(blueprint, selections, dict(self.selector.blueprint_stage_sets))
+
+        # NEW: Optional room-level budget optimization
+        if self.context.project.room_budget_cap:
+            selections = self._apply_room_budget_cap(blueprint, selections)
+
+        return self._assemble_boq(blueprint, selections)
     
-    @staticmethod
-    def calculate_network_requirements(room_equipment: Dict) -> Dict:
-        """
-        AVIXA Network Infrastructure Standards
-        Section 5 of guidelines
-        """
-        total_bandwidth = 0
-        
-        # Video conferencing codec
-        if room_equipment.get("video_codec"):
-            codec_streams = room_equipment.get("cameras", 1) + 1  # +1 for content
-            total_bandwidth += codec_streams * 4  # Mbps per 1080p stream
-        
-        # Networked displays (AV over IP)
-        if room_equipment.get("network_displays"):
-            display_count = room_equipment["network_displays"]
-            total_bandwidth += display_count * 50  # Mbps per 4K display
-        
-        # Control system
-        total_bandwidth += 5  # Mbps for control traffic
-        
-        # Digital signage
-        if room_equipment.get("digital_signage"):
-            total_bandwidth += 10
-        
-        # Calculate switch requirements
-        required_ports = sum([
-            room_equipment.get("cameras", 0),
-            room_equipment.get("displays", 0),
-            room_equipment.get("network_displays", 0),
-            1,  # Codec/processor
-            1,  # Control system
-            2   # Spare ports
-        ])
-        
-        # Recommend switch tier
-        if total_bandwidth > 500:
-            switch_type = "10GbE Managed Switch"
-        elif total_bandwidth > 100:
-            switch_type = "1GbE Managed Switch with SFP+ uplink"
-        else:
-            switch_type = "1GbE Managed Switch"
-        
-        return {
-            'total_bandwidth_mbps': total_bandwidth,
-            'switch_type': switch_type,
-            'required_ports': required_ports,
-            'recommended_ports': math.ceil(required_ports / 8) * 8,
-            'poe_required': True,
-            'qos_required': True,
-            'vlan_structure': {
-                'AV_Production': 10,
-                'Video_Conferencing': 20,
-                'Control_Systems': 30
-            }
-        }
+    # ==================== INCREMENTAL REGENERATION ====================
     
-    @staticmethod
-    def calculate_power_requirements(boq_items: List[Dict]) -> Dict:
+    def regenerate_boq_for_room(self, context: Optional[UnifiedRequirementsContext] = None
+                                ) -> Tuple[List[Dict], Dict[str, Any]]:
         """
-        AVIXA Power & Electrical Standards
-        Section 6 of guidelines
+        NEW: Incremental regeneration after a context change.
+        AVIXA calcs and the blueprint are rebuilt (cheap); only components whose
+        requirement or selection inputs changed are re-selected; everything else
+        keeps its previous selection. Partner brands (DSP, camera, touch panel)
+        come from the context, so a partner whose inputs are unchanged stays valid.
+        Falls back to a full run the first time.
         """
-        power_ratings = {
-            'Displays': {'55-65': 200, '75-85': 375, '98': 600},
-            'Video Conferencing': {'codec': 75, 'camera_poe': 25},
-            'Audio': {'amplifier': 250, 'dsp': 40, 'speaker': 60},
-            'Control Systems': {'processor': 35},
-            'Infrastructure': {'switch_24port': 300}
-        }
+        if context is not None and context is not self.context:
+            self._bind_context(context)
+        previous = self._last_generation
+        if previous is None:
+            return self.generate_boq_for_room()
         
-        total_watts = 0
-        poe_watts = 0
+        snapshot = self._context_snapshot()
+        changed_fields = {key for key, value in snapshot.items() if previous['snapshot'].get(key) != value}
+        self.selector.budget_tier = self.context.project.budget_tier
         
-        for item in boq_items:
-            category = item.get('category', '')
-            quantity = item.get('quantity', 1)
-            
-            # Estimate power based on category
-            if category == 'Displays':
-                size = item.get('size_requirement', 65)
-                if size >= 98:
-                    total_watts += 600 * quantity
-                elif size >= 75:
-                    total_watts += 375 * quantity
-                else:
-                    total_watts += 200 * quantity
-                    
-            elif category == 'Audio':
-                if 'Amplifier' in item.get('sub_category', ''):
-                    total_watts += 250 * quantity
-                elif 'DSP' in item.get('sub_category', ''):
-                    total_watts += 40 * quantity
-                    
-            elif category == 'Video Conferencing':
-                if 'Camera' in item.get('sub_category', ''):
-                    poe_watts += 25 * quantity
-                else:
-                    total_watts += 75 * quantity
+        self._progress(0.1, "📊 Running AVIXA Standards Analysis...")
+        self._run_avixa_analysis()
         
-        # Add 20% safety factor
-        total_watts *= 1.2
-        poe_watts *= 1.2
+        self._progress(0.25, "🎯 Building logical equipment blueprint...")
+        blueprint = self._build_avixa_compliant_blueprint()
         
-        # Calculate circuit requirements (120V systems)
-        required_amps = total_watts / 120
-        recommended_circuits = math.ceil(required_amps / 15)  # 15A circuits
+        dirty = self._affected_components(blueprint, previous, changed_fields)
+        selections = {key: previous['selections'].get(key) for key in blueprint if key not in dirty}
+        stage_sets = {key: stages for key, stages in previous['stage_sets'].items()
+                      if key in blueprint and key not in dirty}
+        reselected = [key for key in blueprint if key in dirty]
+        
+        if reselected:
+            batch = {key: blueprint[key] for key in reselected}
+            self._progress(0.5, f"🔍 Re-selecting {len(batch)} of {len(blueprint)} components...")
+            self._drop_component_warnings(
+                {req.sub_category for req in batch.values()} |
+                {previous['blueprint'][key].sub_category for key in batch if key in previous['blueprint']}
+            )
+            selections.update(self.selector.select_blueprint(batch))
+            stage_sets.update(self.selector.blueprint_stage_sets)
+        
+        selections = {key: selections.get(key) for key in blueprint}
+        self.selector.blueprint_stage_sets = stage_sets
+        self.last_reselected = reselected
+        self._remember_generation(blueprint, selections, stage_sets)
+        self.context.log_decision(
+            f"Incremental regeneration: re-selected {len(reselected)}/{len(blueprint)} components"
+            + (f" (changed: {', '.join(sorted(changed_fields))})" if changed_fields else "")
+        )
         
-        if required_amps > 30:
-            recommended_circuits = math.ceil(required_amps / 20)
-            circuit_rating = "20A"
-        else:
-            circuit_rating = "15A"
+        if self.context.project.room_budget_cap:
+            self._drop_component_warnings({'Room Budget'})
+            selections = self._apply_room_budget_cap(blueprint, selections)
         
-        return {
-            'total_watts': total_watts,
-            'poe_watts': poe_watts,
-            'total_amps': required_amps,
-            'recommended_circuits': recommended_circuits,
-            'circuit_rating': circuit_rating,
-            'ups_recommended': total_watts > 500,
-            'ups_capacity_va': total_watts * 1.4 if total_watts > 500 else 0
+        return self._assemble_boq(blueprint, selections)
+    
+    def _bind_context(self, context: UnifiedRequirementsContext):
+        """Point the generator and its selector at a replacement context object"""
+        self.context = context
+        self.selector.unified_context = context
+        self.selector.client_preferences = context.brands.__dict__
+    
+    def _context_snapshot(self) -> Dict[str, Any]:
+        """Flattened copy of the context's input fields ('section.field' -> value)"""
+        snapshot = {}
+        for section in ('room', 'technical', 'brands', 'project'):
+            for name, value in asdict(getattr(self.context, section)).items():
+                key = f"{section}.{name}"
+                if key not in DERIVED_CONTEXT_FIELDS:
+                    snapshot[key] = value
+        return snapshot
+    
+    def _remember_generation(self, blueprint: Dict[str, ProductRequirement],
+                             selections: Dict[str, Optional[Dict]], stage_sets: Dict[str, Dict]):
+        """Keep what regenerate_boq_for_room() needs (selections are pre budget-cap)"""
+        self._last_generation = {
+            'snapshot': self._context_snapshot(),
+            'blueprint': blueprint,
+            'selections': dict(selections),
+            'stage_sets': stage_sets,
+            'display_calcs': dict(self.context.avixa_calculations.get('display', {})),
         }
     
+    def _affected_components(self, blueprint: Dict[str, ProductRequirement], previous: Dict,
+                             changed_fields: set) -> set:
+        """Components whose requirement or selection inputs changed since the last run"""
+        dirty = set()
+        for key, requirement in blueprint.items():
+            old_requirement = previous['blueprint'].get(key)
+            if old_requirement is None or self._selection_inputs(old_requirement) != self._selection_inputs(requirement):
+                dirty.add(key)
+        
+        categories = set()
+        for field_name in changed_fields:
+            categories |= SELECTION_FIELD_DEPENDENCIES.get(field_name, set())
+        # Display selection is validated against the DISCAS result
+        if previous['display_calcs'] != self.context.avixa_calculations.get('display', {}):
+            categories.add('Displays')
+        
+        dirty.update(
+            key for key, requirement in blueprint.items()
+            if '*' in categories or requirement.category in categories
+        )
+        return dirty
+    
     @staticmethod
-    def recommend_acoustic_treatment(room_volume: float, rt60_measured: float, room_type: str) -> Dict:
-        """
-        AVIXA Acoustic Treatment Standards
-        Section 3 of guidelines
-        """
-        target_rt60 = {
-            "Conference": 0.5,
-            "Training": 0.6,
-            "Boardroom": 0.4,
-            "Auditorium": 1.0
-        }.get(room_type, 0.6)
-        
-        if rt60_measured > target_rt60 * 1.5:
-            panel_coverage = room_volume / 100
-            return {
-                'treatment_level': 'Heavy',
-                'panel_area_sqft': panel_coverage,
-                'panel_nrc': 0.85,
-                'locations': ['ceiling', 'rear_wall', 'side_walls']
-            }
-            
-        elif rt60_measured > target_rt60 * 1.2:
-            panel_coverage = room_volume / 150
-            return {
-                'treatment_level': 'Moderate',
-                'panel_area_sqft': panel_coverage,
-                'panel_nrc': 0.70,
-                'locations': ['rear_wall', 'side_walls']
-            }
-        
-        return {'treatment_level': 'Minimal', 'panel_area_sqft': 0}
-
-
-class OptimizedBOQGenerator:
-    """
-    ENHANCED: Now uses full AVIXA calculations and production-ready logic
-    """
+    def _selection_inputs(requirement: ProductRequirement) -> ProductRequirement:
+        """Requirement minus the fields that don't influence product choice"""
+        return replace(requirement, quantity=0, justification='')
     
-    def __init__(self, product_df: pd.DataFrame, unified_context: 'UnifiedRequirementsContext'):
-        """
-        UPDATED: Now accepts UnifiedRequirementsContext instead of ClientRequirements
-        """
-        self.product_df = product_df
-        self.context = unified_context  # The single source of truth
-        self.avixa_calc = EnhancedAVIXACalculator()
-        
-        self.selector = IntelligentProductSelector(
-            product_df=product_df,
-            client_preferences=unified_context.brands.__dict__,
-            budget_tier=unified_context.project.budget_tier
-        )
-        
-        # Pass unified context to selector
-        self.selector.unified_context = unified_context
+    def _drop_component_warnings(self, components: set):
+        """Forget selector warnings for components that are about to be re-evaluated"""
+        self.selector.validation_warnings = [
+            warning for warning in self.selector.validation_warnings
+            if warning.get('component') not in components
+        ]
     
-    def generate_boq_for_room(self) -> Tuple[List[Dict], Dict[str, Any]]:
-        """
-        UPDATED: Uses unified context instead of separate parameters
-        """
+    def _run_avixa_analysis(self):
+        """Populate context.avixa_calculations and the AVIXA-derived technical fields"""
         room = self.context.room
         tech = self.context.technical
         
-        # === COMPREHENSIVE AVIXA CALCULATIONS ===
-        st.info("📊 Running AVIXA Standards Analysis...")
-        
-        # Display calculations (DISCAS)
-        display_calcs = self.avixa_calc.calculate_display_size_discas(
-            room.length_ft, room.width_ft, content_type="BDM"
+        # Display, audio, microphone, SPL and viewing-angle calculations
+        # (memoized per room geometry - repeat generations reuse the cached result)
+        core_calcs = analyze_room(
+            room.length_ft, room.width_ft, room.ceiling_height_ft,
+            room.room_type, room.seating_capacity, content_type="BDM"
         )
+        display_calcs = core_calcs['display']
         
         # Store AVIXA recommendation in context
         tech.display_size_avixa = display_calcs['selected_size_inches']
@@ -420,58 +270,32 @@ class OptimizedBOQGenerator:
                 f"Display size: Using AVIXA recommendation {tech.display_size_avixa}\""
             )
         
-        # Audio coverage (A102.01) - Pass occupancy
-        audio_calcs = self.avixa_calc.calculate_audio_coverage_a102(
-            room.area_sqft, 
-            room.ceiling_height_ft, 
-            room.room_type,
-            room.seating_capacity
-        )
-        
-        # Microphone coverage
-        table_config = "conference_table" if room.area_sqft < 600 else "conference_table"
-        mic_calcs = self.avixa_calc.calculate_microphone_coverage(room.area_sqft, table_config)
-        
         # Store in context
-        tech.microphone_count_avixa = mic_calcs['mics_needed']
-        tech.speaker_count_avixa = audio_calcs['speakers_needed']
-        
-        # SPL requirements
-        target_spl = 75  # Standard for conference rooms
-        spl_calcs = self.avixa_calc.calculate_required_amplifier_power(
-            room.volume_cuft, target_spl
-        )
+        tech.microphone_count_avixa = core_calcs['microphones']['mics_needed']
+        tech.speaker_count_avixa = core_calcs['audio']['speakers_needed']
         
-        # Viewing angles
-        viewing_calcs = self.avixa_calc.validate_viewing_angles(
-            room.width_ft, tech.display_size_final, seating_rows=2
-        )
+        # Viewing angles depend on the final display size, so only recompute on override
+        if tech.display_size_final != display_calcs['selected_size_inches']:
+            core_calcs['viewing_angles'] = self.avixa_calc.validate_viewing_angles(
+                room.width_ft, tech.display_size_final, seating_rows=2
+            )
         
         # Store all calculations in context
-        self.context.avixa_calculations = {
-            'display': display_calcs,
-            'audio': audio_calcs,
-            'microphones': mic_calcs,
-            'spl': spl_calcs,
-            'viewing_angles': viewing_calcs,
-            'room_area': room.area_sqft,
-            'room_volume': room.volume_cuft
-        }
-        
-        # Build blueprint using AVIXA calculations
-        blueprint = self._build_avixa_compliant_blueprint()
-        
-        # Select products
+        self.context.avixa_calculations = core_calcs
+    
+    def _assemble_boq(self, blueprint: Dict[str, ProductRequirement],
+                      selections: Dict[str, Optional[Dict]]) -> Tuple[List[Dict], Dict[str, Any]]:
+        """BOQ line items, network/power requirements and validation for a set of selections"""
         boq_items = []
         for component_key, requirement in blueprint.items():
-            # ✅ FIX: Use fallback version of product selection
-            product = self.selector.select_product_with_fallback(requirement)
-            
+            product = selections.get(component_key)
+
             if product:
                 justification = self._generate_avixa_justification(
                     component_key, product, self.context.avixa_calculations
                 )
                 
+                product = dict(product)
                 product.update({
                     'quantity': requirement.quantity,
                     'justification': justification['technical'],
@@ -483,25 +307,37 @@ class OptimizedBOQGenerator:
                 
                 boq_items.append(product)
         
+        self._progress(0.8, "✅ Validating AVIXA compliance...")
+        return boq_items, self.validate_boq(boq_items)
+    
+    def validate_boq(self, boq_items: List[Dict]) -> Dict[str, Any]:
+        """
+        NEW: Network/power estimates plus AVIXA and audio ecosystem validation.
+        Builds one BOQColumns view and shares it across every check, so
+        re-validating an edited BOQ is a single pass over its items.
+        """
+        columns = BOQColumns.of(boq_items)
+        self.last_boq_columns = columns
+        
         # Calculate network and power requirements
         network_reqs = self.avixa_calc.calculate_network_requirements({
-            'video_codec': any('Codec' in item.get('sub_category', '') for item in boq_items),
-            'cameras': sum(1 for item in boq_items if 'Camera' in item.get('sub_category', '')),
-            'displays': sum(1 for item in boq_items if item.get('category') == 'Displays'),
+            'video_codec': columns.has('codec'),
+            'cameras': columns.count('camera'),
+            'displays': columns.count('display'),
             'network_displays': 0,
             'digital_signage': 0
         })
         
-        power_reqs = self.avixa_calc.calculate_power_requirements(boq_items)
+        power_reqs = self.avixa_calc.calculate_power_requirements(columns)
         
         self.context.avixa_calculations['network'] = network_reqs
         self.context.avixa_calculations['power'] = power_reqs
         
         # Validate AVIXA compliance
-        validation_results = self._validate_avixa_compliance(boq_items, self.context.avixa_calculations)
+        validation_results = self._validate_avixa_compliance(columns, self.context.avixa_calculations)
 
         # ✅ NEW: Validate audio ecosystem
-        audio_warnings = self._validate_audio_ecosystem(boq_items)
+        audio_warnings = self._validate_audio_ecosystem(columns)
         if audio_warnings:
             if 'warnings' not in validation_results:
                 validation_results['warnings'] = []
@@ -512,8 +348,54 @@ class OptimizedBOQGenerator:
                 else:
                     validation_results['warnings'].append(warning)
 
-        return boq_items, validation_results
+        return validation_results
     
+    def _apply_room_budget_cap(self, blueprint: Dict[str, ProductRequirement],
+                               selections: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        NEW: Re-choose products so the whole room fits project.room_budget_cap.
+        Candidates are the strict path's validated alternatives (see
+        IntelligentProductSelector.budget_alternatives); components resolved by a
+        fallback keep their single selected product.
+        """
+        budget_cap = self.context.project.room_budget_cap
+
+        candidate_sets = {}
+        for component_key, product in selections.items():
+            if not product:
+                continue
+            alternatives = self.selector.budget_alternatives(component_key, blueprint[component_key])
+            candidate_sets[component_key] = alternatives if alternatives is not None else [product]
+
+        quantities = {key: blueprint[key].quantity for key in candidate_sets}
+        result = RoomBudgetOptimizer().optimize(
+            candidate_sets,
+            quantities,
+            budget_cap,
+            vc_platform=self.context.technical.vc_platform,
+            budget_tier=self.context.project.budget_tier
+        )
+        self.context.avixa_calculations['budget_optimization'] = {
+            key: value for key, value in result.items() if key != 'selections'
+        }
+
+        if not result['selections']:
+            self.selector.validation_warnings.append({
+                'component': 'Room Budget',
+                'issue': f"No product combination fits the ${budget_cap:,.0f} budget cap "
+                         f"({result['status']}); keeping tier-based selections",
+                'severity': 'HIGH'
+            })
+            return selections
+
+        self.context.log_decision(
+            f"Room budget: optimized to ${result['total_cost']:,.0f} of ${budget_cap:,.0f} cap "
+            f"({result['status']}, {result['elapsed_ms']:.0f} ms)"
+        )
+        optimized = dict(selections)
+        optimized.update({key: dict(product) for key, product in result['selections'].items()})
+        return optimized
+
     def _build_avixa_compliant_blueprint(
         self
     ) -> Dict[str, ProductRequirement]:
@@ -561,281 +443,116 @@ class OptimizedBOQGenerator:
         """
         Builds the equipment blueprint for a standard conference or boardroom.
         UPDATED: Now reads from self.context.technical and self.context.brands
+        ✅ COMPILED: Requirements come from blueprint_templates; only quantities,
+        sizes and brands are filled in here.
         """
         blueprint = {}
         # NEW: Get technical and brand context
         tech = self.context.technical
         brands = self.context.brands
+        room_tpl = room_template(room_type)
         
         # === DISPLAYS (Using final context-driven size) ===
-        display_size = tech.display_size_final
-        
-        # Apply room-specific constraints (this is now a secondary check, as final size is set)
-        room_constraints = ROOM_DISPLAY_CONSTRAINTS.get(room_type, {'min': 55, 'max': 98})
-        display_size = max(room_constraints['min'], min(display_size, room_constraints['max']))
+        # Room-specific constraints (a secondary check, as final size is already set)
+        display_size = room_tpl.clamp_display_size(tech.display_size_final, room_area)
 
-        if 'Executive' in room_type or 'Boardroom' in room_type:
-            display_size = max(75, display_size)
-        elif room_area > 600:
-            display_size = max(75, display_size)
+        self._notify(f"✅ Final Display Size: {display_size}\" for {room_type}")
+        display_qty = room_tpl.display_quantity(tech.dual_display_needed, room_area)
 
-        st.success(f"✅ Final Display Size: {display_size}\" for {room_type}")
-        display_qty = 2 if (tech.dual_display_needed or 'Executive' in room_type or 'Boardroom' in room_type or room_area > 600) else 1
-
-        blueprint['primary_display'] = ProductRequirement(
-            category='Displays',
-            sub_category='Interactive Display' if tech.interactive_display_needed else 'Professional Display',
-            quantity=display_qty,
-            priority=1,
-            justification=f'Final determined size: {display_size}" for {room_type}',
-            size_requirement=display_size,
-            required_keywords=['display', '4k', str(display_size)],
-            blacklist_keywords=['mount', 'bracket', 'stand', 'arm', 'cable', 'adapter', 'menu'],
-            min_price=500 if display_size < 70 else 1000,
-            max_price=30000,
-            client_preference_weight=1.0,
-            strict_category_match=True
+        blueprint['primary_display'] = instantiate(
+            'primary_display_interactive' if tech.interactive_display_needed else 'primary_display',
+            quantity=display_qty, size=display_size, room_type=room_type,
+            overrides={'min_price': 500 if display_size < 70 else 1000}
         )
 
         # ✅ FIX 3: CORRECT MOUNT SELECTION
-        blueprint['display_mount'] = ProductRequirement(
-            category='Mounts',
-            sub_category='Display Mount / Cart',
-            quantity=display_qty,
-            priority=2,
-            justification=f'Articulating wall mounts for dual {display_size}" displays',
-            mounting_type='wall',
-            size_requirement=display_size,
-            required_keywords=['wall mount', 'articulating', 'heavy duty', str(display_size)],
-            blacklist_keywords=['video wall', 'tile', 'array', 'ceiling', 'floor', 'camera', 'mic', 'speaker', 'touch', 'panel', 'controller', 'menu'],
-            min_price=300 if display_size >= 75 else 150,
-            max_price=1500,
-            strict_category_match=True
+        blueprint['display_mount'] = instantiate(
+            'display_mount', quantity=display_qty, size=display_size,
+            overrides={'min_price': 300 if display_size >= 75 else 150}
         )
 
         # === VIDEO CONFERENCING (WITH ECOSYSTEM ENFORCEMENT) ===
         is_large_room = room_area > 400
+        # NEW: In a design sweep, a PTZ / multi-camera variant gets the codec system in any room size
+        wants_codec_system = self.camera_selects_codec and any(
+            term in (tech.camera_type or '').lower() for term in ('ptz', 'multi-camera')
+        )
 
         # CRITICAL: Read VC brand from unified context
         vc_brand_preference = brands.vc_ecosystem_brand if brands.vc_ecosystem_brand else 'Poly'
 
         # Store the selected VC brand for ecosystem enforcement (already done in __init__)
-        st.info(f"🎯 Video Conferencing Ecosystem: **{vc_brand_preference}** (enforced for camera, codec, and touch panel)")
+        self._notify(f"🎯 Video Conferencing Ecosystem: **{vc_brand_preference}** (enforced for camera, codec, and touch panel)", level='info')
 
-        if room_area <= 250:  # Small huddle
-            blueprint['vc_system'] = ProductRequirement(
-                category='Video Conferencing',
-                sub_category='Video Bar',
-                quantity=1,
-                priority=3,
-                justification=f'All-in-one {vc_brand_preference} solution for small space',
-                required_keywords=['video bar', 'all-in-one', vc_brand_preference.lower()],
-                blacklist_keywords=['codec', 'ptz', 'camera'],
-                min_price=800,
-                max_price=3000,
-                client_preference_weight=1.0,  # ENFORCE brand
-                strict_category_match=True
-            )
+        if room_area <= 250 and not wants_codec_system:  # Small huddle
+            blueprint['vc_system'] = instantiate('vc_system_small', brand=vc_brand_preference)
 
-        elif 250 < room_area <= 400:  # Medium rooms
-            blueprint['vc_system'] = ProductRequirement(
-                category='Video Conferencing',
-                sub_category='Video Bar',
-                quantity=1,
-                priority=3,
-                justification=f'{vc_brand_preference} video bar with expansion capability',
-                required_keywords=['video bar', 'expansion', vc_brand_preference.lower()],
-                min_price=1200,
-                max_price=5000,
-                client_preference_weight=1.0,  # ENFORCE brand
-                strict_category_match=True
-            )
+        elif 250 < room_area <= 400 and not wants_codec_system:  # Medium rooms
+            blueprint['vc_system'] = instantiate('vc_system_medium', brand=vc_brand_preference)
 
-        else:  # Large rooms (>400 sqft) - Full codec + PTZ system with ENFORCED ECOSYSTEM
-            # CODEC
-            blueprint['vc_codec'] = ProductRequirement(
-                category='Video Conferencing',
-                sub_category='Room Kit / Codec',
-                quantity=1,
-                priority=3,
-                justification=f'{vc_brand_preference} codec for {tech.vc_platform}',
-                required_keywords=['codec', 'room kit', vc_brand_preference.lower()],
-                blacklist_keywords=['video bar', 'webcam', 'usb'],
-                min_price=1500,
-                max_price=15000,
-                client_preference_weight=1.0,  # ENFORCE brand
-                strict_category_match=True
-            )
-            
-            # PTZ CAMERA (SAME BRAND AS CODEC)
-            blueprint['ptz_camera'] = ProductRequirement(
-                category='Video Conferencing',
-                sub_category='PTZ Camera',
-                quantity=1,
-                priority=4,
-                justification=f'{vc_brand_preference} PTZ camera for ecosystem compatibility',
-                required_keywords=['ptz', 'camera', 'optical', 'zoom', vc_brand_preference.lower()],
-                blacklist_keywords=['controller', 'remote', 'mount', 'accessory', 'webcam'],
-                min_price=1000,
-                max_price=10000,
-                client_preference_weight=1.0,  # ENFORCE brand
-                strict_category_match=True
-            )
-            
-            # CAMERA MOUNT
-            blueprint['camera_mount'] = ProductRequirement(
-                category='Mounts',
-                sub_category='Camera Mount',
-                quantity=1,
-                priority=4.5,
-                justification=f'Mounting hardware for {vc_brand_preference} PTZ camera',
-                required_keywords=['camera', 'mount', 'ptz', 'bracket'],
-                blacklist_keywords=['display', 'speaker', 'projector'],
-                min_price=150,
-                max_price=400
-            )
-            
-            # TOUCH CONTROLLER (SAME BRAND AS CODEC)
-            blueprint['touch_controller'] = ProductRequirement(
-                category='Video Conferencing',
-                sub_category='Touch Controller / Panel',
-                quantity=1,
-                priority=5,
-                justification=f'{vc_brand_preference} touch controller for native integration',
-                required_keywords=['touch', 'controller', 'panel', vc_brand_preference.lower()],
-                blacklist_keywords=['crestron', 'extron', 'amx'] if vc_brand_preference != 'Crestron' else [],
-                min_price=300,
-                client_preference_weight=1.0,  # ENFORCE brand
-                strict_category_match=True
+        else:  # Large rooms (>400 sqft) or swept PTZ/multi-camera variant - Full codec + PTZ system with ENFORCED ECOSYSTEM
+            # CODEC, PTZ CAMERA and TOUCH CONTROLLER all share the codec brand
+            blueprint['vc_codec'] = instantiate('vc_codec', brand=vc_brand_preference, vc_platform=tech.vc_platform)
+            blueprint['ptz_camera'] = instantiate('ptz_camera', brand=vc_brand_preference)
+            blueprint['camera_mount'] = instantiate('camera_mount', brand=vc_brand_preference)
+            blueprint['touch_controller'] = instantiate(
+                'touch_controller', brand=vc_brand_preference,
+                overrides={'blacklist_keywords': ()} if vc_brand_preference == 'Crestron' else None
             )
 
         # === AUDIO SYSTEM (Using AVIXA A102.01) ===
-        st.success(f"✅ AVIXA A102.01: {avixa_calcs['audio']['speakers_needed']} speakers needed for ±3dB uniformity")
-        st.success(f"✅ AVIXA Microphone Coverage: {avixa_calcs['microphones']['mics_needed']} microphones required")
+        self._notify(f"✅ AVIXA A102.01: {avixa_calcs['audio']['speakers_needed']} speakers needed for ±3dB uniformity")
+        self._notify(f"✅ AVIXA Microphone Coverage: {avixa_calcs['microphones']['mics_needed']} microphones required")
         
         # Use mic type from context if available, otherwise calculate
         mic_type_pref = tech.microphone_type.lower()
         if 'ceiling' in mic_type_pref:
-            mic_type_sub = 'Ceiling Microphone'
+            mic_template = 'microphones_ceiling'
         elif 'table' in mic_type_pref or 'boundary' in mic_type_pref:
-             mic_type_sub = 'Table/Boundary Microphone'
+            mic_template = 'microphones_table'
         else: # Default
-            mic_type_sub = 'Ceiling Microphone' if room_area > 400 else 'Table/Boundary Microphone'
-            
-        min_mic_price = 400 if 'Ceiling' in mic_type_sub else 150
+            mic_template = 'microphones_ceiling' if room_area > 400 else 'microphones_table'
         
-        blueprint['microphones'] = ProductRequirement(
-            category='Audio', sub_category=mic_type_sub, quantity=avixa_calcs['microphones']['mics_needed'], priority=6,
-            justification=f"AVIXA-calculated {avixa_calcs['microphones']['mics_needed']}x mics for {room_area:.0f} sqft",
-            required_keywords=['microphone', 'ceiling' if 'Ceiling' in mic_type_sub else 'table', 'array'],
-            blacklist_keywords=['usb', 'webcam'] if 'Ceiling' in mic_type_sub else ['usb'], min_price=min_mic_price
+        blueprint['microphones'] = instantiate(
+            mic_template, quantity=avixa_calcs['microphones']['mics_needed'], room_area=room_area
         )
         
         if is_large_room:
             # ✅ CRITICAL: Brand matching with microphones
-            mic_brand = None
-            if 'microphones' in blueprint:
-                # Get the brand preference for microphones from context
-                mic_brand_pref = brands.audio
-                if mic_brand_pref != 'No Preference':
-                    mic_brand = mic_brand_pref
-            
-            # Build DSP requirement with brand matching
-            dsp_keywords = ['dsp', 'processor', 'digital signal processor', 'tesira', 'qsc core', 'biamp']
-            dsp_blacklist = ['mixer', 'amplifier', 'speaker', 'touchmix', 'live sound', 'portable mixer', 
-                             'analog mixer', 'powered mixer', 'summing']
+            mic_brand = brands.audio if brands.audio != 'No Preference' else None
             
             if mic_brand:
                 # Add brand to keywords for ecosystem matching
-                dsp_keywords.append(mic_brand.lower())
-                st.info(f"🎯 Audio Ecosystem: Matching DSP to {mic_brand} microphones")
+                self._notify(f"🎯 Audio Ecosystem: Matching DSP to {mic_brand} microphones", level='info')
                 # NEW: Set this in the context for the selector
                 brands.audio_ecosystem_brand = mic_brand
-            
-            blueprint['audio_dsp'] = ProductRequirement(
-                category='Audio',
-                sub_category='DSP / Audio Processor / Mixer',
-                quantity=1,
-                priority=7,
-                justification=f"AVIXA-required conferencing DSP with AEC for {room_area:.0f} sqft room",
-                required_keywords=dsp_keywords,
-                blacklist_keywords=dsp_blacklist,
-                min_price=1500,  # Real conferencing DSPs start at $1500
-                max_price=15000,
-                client_preference_weight=1.0 if mic_brand else 0.5,
-                strict_category_match=True
-            )
+                blueprint['audio_dsp'] = instantiate('audio_dsp_brand_matched', brand=mic_brand, room_area=room_area)
+            else:
+                blueprint['audio_dsp'] = instantiate('audio_dsp', room_area=room_area)
         
         # ✅ FIX 6: PREVENT SELECTING GRILLES INSTEAD OF SPEAKERS
-        blueprint['ceiling_speakers'] = ProductRequirement(
-            category='Audio', sub_category='Ceiling Loudspeaker', quantity=avixa_calcs['audio']['speakers_needed'], priority=8,
-            justification=f"AVIXA A102.01: {avixa_calcs['audio']['speakers_needed']}x speakers for uniform coverage",
-            required_keywords=['ceiling', 'speaker', 'in-ceiling'], 
-            blacklist_keywords=['portable', 'powered', 'grille', 'cover', 'trim', 'accessory'], 
-            min_price=100
+        blueprint['ceiling_speakers'] = instantiate(
+            'ceiling_speakers', quantity=avixa_calcs['audio']['speakers_needed']
         )
         
-        recommended_power = avixa_calcs['spl']['recommended_power_watts']
-        blueprint['power_amplifier'] = ProductRequirement(
-            category='Audio', sub_category='Amplifier', quantity=1, priority=9,
-            justification=f"AVIXA SPL: {recommended_power:.0f}W amplifier for {avixa_calcs['spl']['target_spl_db']}dB SPL",
-            required_keywords=['amplifier', 'power', 'channel'], blacklist_keywords=['dsp', 'mixer'], min_price=500
+        blueprint['power_amplifier'] = instantiate(
+            'power_amplifier',
+            power=avixa_calcs['spl']['recommended_power_watts'],
+            target_spl=avixa_calcs['spl']['target_spl_db']
         )
         
         # === INFRASTRUCTURE & CONNECTIVITY ===
         # ✅ FIX 1 & 2: ADD RACK AND PDU for systems with codecs/amps
         if is_large_room:
-            blueprint['av_rack'] = ProductRequirement(
-                category='Infrastructure',
-                sub_category='AV Rack',
-                quantity=1,
-                priority=10,
-                justification='Houses codec, DSP, amplifier, and network equipment (minimum 12U)',
-                required_keywords=['rack', '12u', 'equipment', 'enclosure'],
-                blacklist_keywords=['shelf', 'mount', 'bracket', 'accessory'],
-                min_price=500,
-                max_price=2500
-            )
-            blueprint['rack_pdu'] = ProductRequirement(
-                category='Infrastructure',
-                sub_category='Power (PDU/UPS)',
-                quantity=1,
-                priority=11,
-                justification='Rack-mount power distribution for all equipment',
-                required_keywords=['pdu', 'rack', 'power', '8 outlet', 'distribution'],
-                min_price=150,
-                max_price=800
-            )
+            blueprint['av_rack'] = instantiate('av_rack')
+            blueprint['rack_pdu'] = instantiate('rack_pdu')
 
-        blueprint['network_switch'] = ProductRequirement(
-            category='Networking', sub_category='Network Switch', quantity=1, priority=12,
-            justification='Managed PoE switch for VC system and other endpoints',
-            required_keywords=['switch', 'poe', 'managed', 'gigabit'],
-            blacklist_keywords=['unmanaged', 'hub'], min_price=300, max_price=1500
-        )
+        blueprint['network_switch'] = instantiate('network_switch')
         
         # ✅ FIX 5: ADD PROPER TABLE CONNECTIVITY BOX
-        blueprint['table_connectivity'] = ProductRequirement(
-            category='Cables & Connectivity',
-            sub_category='Wall & Table Plate Module',
-            quantity=1,
-            priority=13,
-            justification='Table-mount connectivity for HDMI/USB-C laptop input',
-            required_keywords=['table', 'connectivity', 'hdmi', 'usb-c', 'retractor', 'cubby'],
-            blacklist_keywords=['wall plate', 'single gang', 'mount', 'bracket'],
-            min_price=200,
-            max_price=800
-        )
-        blueprint['cables_hdmi'] = ProductRequirement(
-            category='Cables & Connectivity', sub_category='AV Cable', quantity=4, priority=14,
-            justification='HDMI cables for video distribution',
-            required_keywords=['hdmi', 'cable', 'certified', '4k'], min_price=20, max_price=150
-        )
-        blueprint['cables_network'] = ProductRequirement(
-            category='Cables & Connectivity', sub_category='AV Cable', quantity=6, priority=15,
-            justification='Cat6A network cables for endpoints',
-            required_keywords=['cat6', 'ethernet', 'network', 'cable'], min_price=15, max_price=80
-        )
+        blueprint['table_connectivity'] = instantiate('table_connectivity')
+        blueprint['cables_hdmi'] = instantiate('cables_hdmi')
+        blueprint['cables_network'] = instantiate('cables_network')
         
         return blueprint
 
@@ -923,7 +640,9 @@ class OptimizedBOQGenerator:
     def _validate_avixa_compliance(self, boq_items: List[Dict], avixa_calcs: Dict) -> Dict[str, Any]:
         """
         ENHANCED: Comprehensive AVIXA compliance validation with detailed reporting
+        boq_items may be a prebuilt BOQColumns view.
         """
+        columns = BOQColumns.of(boq_items)
         validation = {
             'issues': [],
             'warnings': [],
@@ -932,9 +651,9 @@ class OptimizedBOQGenerator:
         }
         
         # 1. Display Size Compliance (DISCAS)
-        display_items = [item for item in boq_items if item.get('category') == 'Displays']
-        if display_items and avixa_calcs.get('display'):
-            actual_size = display_items[0].get('size_requirement', 0)
+        first_display = columns.first('display')
+        if first_display and avixa_calcs.get('display'):
+            actual_size = first_display.get('size_requirement', 0)
             recommended_size = avixa_calcs['display']['selected_size_inches']
             viewing_distance = avixa_calcs['display']['max_viewing_distance_ft']
             
@@ -957,9 +676,8 @@ class OptimizedBOQGenerator:
                 )
         
         # 2. Audio Coverage (A102.01)
-        speaker_items = [item for item in boq_items if 'Speaker' in item.get('sub_category', '') or 'Loudspeaker' in item.get('sub_category', '')]
         if avixa_calcs.get('audio'):
-            actual_speakers = sum(item.get('quantity', 0) for item in speaker_items)
+            actual_speakers = columns.role_quantity['speaker']
             recommended_speakers = avixa_calcs['audio']['speakers_needed']
             
             if actual_speakers >= recommended_speakers:
@@ -981,9 +699,8 @@ class OptimizedBOQGenerator:
                 validation['compliance_score'] -= 20
         
         # 3. Microphone Coverage
-        mic_items = [item for item in boq_items if 'Microphone' in item.get('sub_category', '') or 'Mic' in item.get('sub_category', '')]
         if avixa_calcs.get('microphones'):
-            actual_mics = sum(item.get('quantity', 0) for item in mic_items)
+            actual_mics = columns.role_quantity['mic']
             recommended_mics = avixa_calcs['microphones']['mics_needed']
             
             if actual_mics >= recommended_mics:
@@ -1018,8 +735,7 @@ class OptimizedBOQGenerator:
         # 5. Power Requirements
         power_reqs = avixa_calcs.get('power', {})
         if power_reqs.get('ups_recommended'):
-            ups_items = [item for item in boq_items if 'UPS' in item.get('name', '').upper() or 'Power' in item.get('sub_category', '')]
-            if not ups_items:
+            if not columns.has('ups'):
                 validation['warnings'].append(
                     f"⚠️ AVIXA recommends UPS ({power_reqs['ups_capacity_va']:.0f}VA) "
                     f"for {power_reqs['total_watts']:.0f}W load"
@@ -1029,8 +745,7 @@ class OptimizedBOQGenerator:
         # 6. Network Requirements
         network_reqs = avixa_calcs.get('network', {})
         if network_reqs.get('total_bandwidth_mbps', 0) > 100:
-            switch_items = [item for item in boq_items if 'Switch' in item.get('sub_category', '')]
-            if not switch_items:
+            if not columns.has('switch'):
                 validation['warnings'].append(
                     f"⚠️ AVIXA network requirements: {network_reqs['switch_type']} "
                     f"needed for {network_reqs['total_bandwidth_mbps']}Mbps"
@@ -1055,37 +770,37 @@ class OptimizedBOQGenerator:
         NEW: Validate that audio components form a compatible ecosystem
         """
         warnings = []
+        columns = BOQColumns.of(boq_items)
         
         # Extract audio components
-        microphones = [item for item in boq_items if 'Microphone' in item.get('sub_category', '')]
-        dsp_items = [item for item in boq_items if 'DSP / Audio Processor / Mixer' in item.get('sub_category', '')]
+        first_mic = columns.first('microphone')
+        first_dsp = columns.first('conferencing_dsp')
         
-        if microphones and dsp_items:
-            mic_brand = microphones[0].get('brand', '').lower()
-            dsp_brand = dsp_items[0].get('brand', '').lower()
+        if first_mic and first_dsp:
+            mic_brand = first_mic.get('brand', '').lower()
+            dsp_brand = first_dsp.get('brand', '').lower()
             
             # Check for known brand mismatches
             if mic_brand == 'biamp' and dsp_brand != 'biamp':
                 warnings.append(
-                    f"⚠️ AUDIO ECOSYSTEM WARNING: Biamp microphones paired with {dsp_items[0].get('brand')} DSP. "
+                    f"⚠️ AUDIO ECOSYSTEM WARNING: Biamp microphones paired with {first_dsp.get('brand')} DSP. "
                     f"Recommend Biamp TesiraFORTE for optimal integration."
                 )
             elif mic_brand == 'shure' and dsp_brand not in ['shure', 'biamp', 'qsc']:
                 warnings.append(
-                    f"⚠️ AUDIO ECOSYSTEM WARNING: Shure microphones paired with {dsp_items[0].get('brand')} DSP. "
+                    f"⚠️ AUDIO ECOSYSTEM WARNING: Shure microphones paired with {first_dsp.get('brand')} DSP. "
                     f"Recommend Shure IntelliMix, Biamp, or QSC for optimal integration."
                 )
         
         # Check for mixer instead of DSP
-        for item in boq_items:
-            if 'DSP' in item.get('sub_category', ''):
-                product_name = item.get('name', '').lower()
-                if any(term in product_name for term in ['touchmix', 'mixer', 'mg', 'zm']):
-                    warnings.append(
-                        f"🚨 CRITICAL: {item.get('name')} is a MIXER, not a conferencing DSP! "
-                        f"This lacks Acoustic Echo Cancellation (AEC) and will NOT work for video conferencing. "
-                        f"Replace with Biamp TesiraFORTE, QSC Core, or Extron DMP."
-                    )
+        for item in columns.items_with('dsp'):
+            product_name = item.get('name', '').lower()
+            if any(term in product_name for term in ['touchmix', 'mixer', 'mg', 'zm']):
+                warnings.append(
+                    f"🚨 CRITICAL: {item.get('name')} is a MIXER, not a conferencing DSP! "
+                    f"This lacks Acoustic Echo Cancellation (AEC) and will NOT work for video conferencing. "
+                    f"Replace with Biamp TesiraFORTE, QSC Core, or Extron DMP."
+                )
         
         return warnings
     
@@ -1093,7 +808,9 @@ class OptimizedBOQGenerator:
         """
         ENHANCED: Quality score now includes AVIXA compliance
         UPDATED: Reads brand preferences from self.context
+        boq_items may be a prebuilt BOQColumns view.
         """
+        columns = BOQColumns.of(boq_items)
         score_breakdown = {
             'brand_compliance': 0,
             'component_completeness': 0,
@@ -1131,12 +848,7 @@ class OptimizedBOQGenerator:
                 brand_total += 1
                 actual_category = category_map.get(category_key)
                 
-                matching_items = [
-                    item for item in boq_items 
-                    if actual_category in item.get('category', '')
-                ]
-                
-                if any(item.get('brand', '').lower() == preferred_brand.lower() for item in matching_items):
+                if preferred_brand.lower() in columns.brands_in_category(actual_category):
                     brand_matches += 1
         
         if brand_total > 0:
@@ -1155,14 +867,10 @@ class OptimizedBOQGenerator:
         
         completeness_score = 0
         for category, points in essential_components.items():
-            if any(category in item.get('category', '') for item in boq_items):
+            if columns.has_category(category):
                 completeness_score += points
         
-        has_microphones = any(
-            'Microphone' in item.get('sub_category', '') or 'Mic' in item.get('sub_category', '')
-            for item in boq_items
-        )
-        if has_microphones:
+        if columns.has('mic'):
             completeness_score += 5
         
         score_breakdown['component_completeness'] = min(completeness_score, max_scores['component_completeness'])
@@ -1173,15 +881,7 @@ class OptimizedBOQGenerator:
         
         # 4. Integration Quality (15 points)
         integration_score = 15
-        brands_used = {}
-        for item in boq_items:
-            category = item.get('category', '')
-            brand = item.get('brand', '')
-            if category not in brands_used:
-                brands_used[category] = set()
-            brands_used[category].add(brand)
-        
-        for category, brands in brands_used.items():
+        for category, brands in columns.brands_by_category.items():
             if len(brands) > 2:
                 integration_score -= 3
         
@@ -1189,18 +889,14 @@ class OptimizedBOQGenerator:
         
         # 5. Pricing Accuracy (15 points)
         pricing_score = 15
+        min_prices = {
+            'Displays': 500,
+            'Video Conferencing': 800,
+            'Audio': 100,
+            'Control Systems': 300
+        }
         
-        for item in boq_items:
-            price = item.get('price', 0)
-            category = item.get('category', '')
-            
-            min_prices = {
-                'Displays': 500,
-                'Video Conferencing': 800,
-                'Audio': 100,
-                'Control Systems': 300
-            }
-            
+        for category, price in zip(columns.category, columns.price):
             expected_min = min_prices.get(category, 50)
             if price < expected_min:
                 pricing_score -= 2
@@ -1245,3 +941,92 @@ class OptimizedBOQGenerator:
             'max_breakdown': max_scores,
             'avixa_compliance_score': avixa_score
         }
+
+
+# ==============================================================================
+# HEADLESS GENERATION API
+# ==============================================================================
+
+@dataclass
+class RoomBOQResult:
+    """Everything a single room generation produces"""
+    items: List[Dict]
+    validation: Dict[str, Any]
+    quality_score: Dict[str, Any] = field(default_factory=dict)
+    selector: Optional[IntelligentProductSelector] = None
+    context: Optional[UnifiedRequirementsContext] = None
+    messages: List[Tuple[str, str]] = field(default_factory=list)  # (level, message)
+    elapsed_ms: float = 0.0
+    generator: Optional['OptimizedBOQGenerator'] = None  # Kept for regenerate_room_boq()
+
+
+def run_room_generation(context: UnifiedRequirementsContext, catalog,
+                        progress: Optional[ProgressCallback] = None,
+                        log: Optional[LogCallback] = None,
+                        previous: Optional[RoomBOQResult] = None,
+                        filter_cache: Optional[FilterPlanCache] = None,
+                        camera_selects_codec: bool = False) -> RoomBOQResult:
+    """
+    Pure-Python room BOQ generation (no Streamlit). UIs, workers and
+    batch jobs adapt the progress/log callbacks to their own output.
+    catalog is a product DataFrame or a SharedCatalog.
+    previous: an earlier result for the same room and catalog - only the
+    components affected by context changes are re-selected.
+    filter_cache: candidate filter results shared with other runs on the same catalog.
+    camera_selects_codec: see OptimizedBOQGenerator (set by design sweeps).
+    """
+    start = time.perf_counter()
+    messages = []
+    
+    def log_callback(message: str, level: str):
+        messages.append((level, message))
+        if log:
+            log(message, level)
+    
+    if previous is not None and previous.generator is not None:
+        generator = previous.generator
+        generator.progress_callback = progress
+        generator.log_callback = log_callback
+        generator.camera_selects_codec = camera_selects_codec
+        if filter_cache is not None:
+            generator.selector.filter_cache = filter_cache
+        items, validation = generator.regenerate_boq_for_room(context)
+    else:
+        generator = OptimizedBOQGenerator(
+            product_df=catalog,
+            unified_context=context,
+            progress_callback=progress,
+            log_callback=log_callback,
+            camera_selects_codec=camera_selects_codec
+        )
+        if filter_cache is not None:
+            generator.selector.filter_cache = filter_cache
+        items, validation = generator.generate_boq_for_room()
+    
+    generator._progress(0.9, "⚖️ Calculating Quality Score...")
+    columns = generator.last_boq_columns
+    quality_score = generator.calculate_boq_quality_score(
+        columns if columns is not None and columns.items is items else items, validation
+    )
+    generator._progress(1.0, "✅ BOQ generation complete!")
+    
+    return RoomBOQResult(
+        items=items,
+        validation=validation,
+        quality_score=quality_score,
+        selector=generator.selector,
+        context=context,
+        messages=messages,
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+        generator=generator
+    )
+
+
+def generate_room_boq(context: UnifiedRequirementsContext, catalog,
+                      progress: Optional[ProgressCallback] = None,
+                      log: Optional[LogCallback] = None) -> Tuple[List[Dict], Dict[str, Any]]:
+    """
+    Headless entry point: (boq_items, validation_results) for one room
+    """
+    result = run_room_generation(context, catalog, progress=progress, log=log)
+    return result.items, result.validation
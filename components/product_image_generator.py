@@ -2,7 +2,65 @@
 
 from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import json
+import os
 import re
+import threading
+
+import numpy as np
+
+# Bump when the card artwork changes so on-disk cached cards are not reused
+CARD_RENDER_VERSION = 3
+
+# Cards are saved as palette PNGs - see _card_palette()
+CARD_PALETTE_COLORS = 128
+CARD_PNG_COMPRESS_LEVEL = 3
+
+CARD_WIDTH, CARD_HEIGHT = 400, 250
+HEADER_HEIGHT = 45
+ICON_SIZE = 100
+ICON_MARGIN = 20
+
+# Category color coding
+CATEGORY_COLORS = {
+    'Displays': '#2563eb',
+    'Video Conferencing': '#10b981',
+    'Audio': '#f59e0b',
+    'Control Systems': '#8b5cf6',
+    'Signal Management': '#ec4899',
+    'Cables & Connectivity': '#6b7280',
+    'Infrastructure': '#ef4444',
+    'Mounts': '#14b8a6',
+    'Lighting': '#eab308',
+    'Software & Services': '#06b6d4',
+    'Networking': '#3b82f6',
+    'Computers': '#84cc16',
+    'Furniture': '#a855f7',
+}
+DEFAULT_CATEGORY_COLOR = '#6b7280'
+
+# Tried in order; Arial on Windows/macOS, DejaVu/Liberation on most Linux images
+CARD_FONT_FILES = {
+    False: ('arial.ttf', 'Arial.ttf', 'DejaVuSans.ttf', 'LiberationSans-Regular.ttf'),
+    True: ('arialbd.ttf', 'Arial Bold.ttf', 'DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf'),
+}
+
+
+@lru_cache(maxsize=None)
+def get_card_font(size: int, bold: bool = False):
+    """NEW: Font lookup resolved once per process (size, weight)"""
+    for font_file in CARD_FONT_FILES[bold]:
+        try:
+            return ImageFont.truetype(font_file, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
 
 # ==============================================================================
 # === FIX: ADDED THE MISSING HELPER FUNCTION ===================================
@@ -382,92 +440,47 @@ def generate_category_icon(draw, icon_area, category, sub_category):
     else:
         # Generic AV - Box with icon
         draw.rounded_rectangle([(x+15, y+15), (x+w-15, y+h-15)], radius=5, fill=primary_color, outline=accent_color, width=2)
-        try:
-            font_small = ImageFont.truetype("arial.ttf", 16)
-        except:
-            font_small = ImageFont.load_default()
-        draw.text((cx-12, cy-8), "AV", fill='white', font=font_small)
+        draw.text((cx-12, cy-8), "AV", fill='white', font=get_card_font(16))
 
 
-def generate_product_info_card(product_name, brand, model, category, sub_category=None, size_inches=None):
+@lru_cache(maxsize=None)
+def _gradient_background(width: int, height: int) -> Image.Image:
+    """Subtle top-to-bottom gradient, built once per size with NumPy"""
+    rows = np.arange(height)
+    column = np.stack([
+        np.maximum(230, 248 - (rows * 0.1).astype(int)),
+        np.maximum(235, 249 - (rows * 0.1).astype(int)),
+        np.maximum(240, 250 - (rows * 0.05).astype(int)),
+    ], axis=1).astype(np.uint8)
+    return Image.fromarray(np.ascontiguousarray(np.broadcast_to(column[:, None, :], (height, width, 3))), 'RGB')
+
+
+@lru_cache(maxsize=64)
+def _category_card_template(category: str) -> Image.Image:
     """
-    Creates a professional visual info card for products with category-specific icons.
-    
-    Args:
-        product_name: Full product name
-        brand: Manufacturer brand
-        model: Model number
-        category: Product category
-        sub_category: Product sub-category (optional, enhances icon accuracy)
-        size_inches: Display size (for displays only)
-    
-    Returns:
-        BytesIO object containing PNG image
+    NEW: Everything on a card that depends only on the category - gradient,
+    header bar, border, category badge, icon frame and footer. Built once per
+    category and copied per card.
     """
+    width, height = CARD_WIDTH, CARD_HEIGHT
+    category_color = CATEGORY_COLORS.get(category, DEFAULT_CATEGORY_COLOR)
+    font_small = get_card_font(12)
     
-    # Image dimensions
-    width, height = 400, 250
-    
-    # Create base image with gradient background
-    img = Image.new('RGB', (width, height), color='#f8f9fa')
+    img = _gradient_background(width, height).copy()
     draw = ImageDraw.Draw(img)
     
-    # Create subtle gradient effect
-    for i in range(height):
-        r = 248 - int(i * 0.1)
-        g = 249 - int(i * 0.1)
-        b = 250 - int(i * 0.05)
-        color = (max(230, r), max(235, g), max(240, b))
-        draw.rectangle([(0, i), (width, i+1)], fill=color)
-    
-    # Load fonts (with fallback)
-    try:
-        font_brand = ImageFont.truetype("arial.ttf", 18)
-        font_large = ImageFont.truetype("arial.ttf", 16)
-        font_medium = ImageFont.truetype("arialbd.ttf", 14)
-        font_small = ImageFont.truetype("arial.ttf", 12)
-    except:
-        font_brand = ImageFont.load_default()
-        font_large = ImageFont.load_default()
-        font_medium = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-    
-    # Category color coding
-    category_colors = {
-        'Displays': '#2563eb',
-        'Video Conferencing': '#10b981',
-        'Audio': '#f59e0b',
-        'Control Systems': '#8b5cf6',
-        'Signal Management': '#ec4899',
-        'Cables & Connectivity': '#6b7280',
-        'Infrastructure': '#ef4444',
-        'Mounts': '#14b8a6',
-        'Lighting': '#eab308',
-        'Software & Services': '#06b6d4',
-        'Networking': '#3b82f6',
-        'Computers': '#84cc16',
-        'Furniture': '#a855f7',
-    }
-    
-    category_color = category_colors.get(category, '#6b7280')
-    
     # Draw colored header bar
-    draw.rectangle([(0, 0), (width, 45)], fill=category_color)
+    draw.rectangle([(0, 0), (width, HEADER_HEIGHT)], fill=category_color)
     
     # Add main border
     draw.rectangle([(0, 0), (width-1, height-1)], outline=category_color, width=3)
     
-    # === BRAND/CATEGORY HEADER ===
-    # Brand name (white text on colored header)
-    draw.text((15, 12), brand.upper(), fill='white', font=font_brand)
-    
     # Category badge (right side of header)
-    category_text = category
     try:
-        bbox = draw.textbbox((0, 0), category_text, font=font_small)
+        bbox = draw.textbbox((0, 0), category, font=font_small)
         cat_width = bbox[2] - bbox[0]
-    except:
-        cat_width = len(category_text) * 7
+    except AttributeError:  # Pillow < 8 has no textbbox
+        cat_width = len(category) * 7
     
     badge_x = width - cat_width - 25
     draw.rounded_rectangle(
@@ -476,39 +489,53 @@ def generate_product_info_card(product_name, brand, model, category, sub_categor
         fill='white',
         outline='white'
     )
-    draw.text((badge_x + 8, 15), category_text, fill=category_color, font=font_small)
-    
-    # === ICON SECTION (Left side) ===
-    icon_size = 100
-    icon_margin = 20
-    icon_area = (icon_margin, 60, icon_size, icon_size)
+    draw.text((badge_x + 8, 15), category, fill=category_color, font=font_small)
     
-    # Draw icon background
-    icon_bg_x = icon_margin - 5
+    # Icon background
+    icon_bg_x = ICON_MARGIN - 5
     icon_bg_y = 55
     draw.rounded_rectangle(
-        [(icon_bg_x, icon_bg_y), (icon_bg_x + icon_size + 10, icon_bg_y + icon_size + 10)],
+        [(icon_bg_x, icon_bg_y), (icon_bg_x + ICON_SIZE + 10, icon_bg_y + ICON_SIZE + 10)],
         radius=8,
         fill='white',
         outline=category_color,
         width=2
     )
     
-    # Generate category-specific icon
+    # Footer
+    footer_y = height - 35
+    draw.line([(15, footer_y), (width - 15, footer_y)], fill=category_color, width=1)
+    draw.text((15, footer_y + 8), "Professional AV Equipment", fill='#9ca3af', font=font_small)
+    
+    return img
+
+
+def _draw_product_card(product_name, brand, model, category, sub_category=None, size_inches=None) -> Image.Image:
+    """Copies the pre-built category template and draws the per-product text and icon on top"""
+    img = _category_card_template(category).copy()
+    draw = ImageDraw.Draw(img)
+    
+    # === BRAND HEADER ===
+    # Brand name (white text on colored header)
+    draw.text((15, 12), brand.upper(), fill='white', font=get_card_font(18))
+    
+    # === ICON SECTION (Left side) ===
+    icon_area = (ICON_MARGIN, 60, ICON_SIZE, ICON_SIZE)
     generate_category_icon(draw, icon_area, category, sub_category or '')
     
     # === PRODUCT INFO SECTION (Right side) ===
-    info_x = icon_margin + icon_size + 30
+    info_x = ICON_MARGIN + ICON_SIZE + 30
     info_y = 60
+    font_small = get_card_font(12)
     
     # Product name (truncated if too long)
     max_name_length = 35
     display_name = product_name[:max_name_length] + '...' if len(product_name) > max_name_length else product_name
     
-    draw.text((info_x, info_y), display_name, fill='#1f2937', font=font_large)
+    draw.text((info_x, info_y), display_name, fill='#1f2937', font=get_card_font(16))
     
     # Model number
-    draw.text((info_x, info_y + 28), f"Model: {model}", fill='#4b5563', font=font_medium)
+    draw.text((info_x, info_y + 28), f"Model: {model}", fill='#4b5563', font=get_card_font(14, bold=True))
     
     # Sub-category (if available)
     if sub_category:
@@ -518,21 +545,241 @@ def generate_product_info_card(product_name, brand, model, category, sub_categor
     if size_inches and category == 'Displays':
         draw.text((info_x, info_y + 70), f"Size: {size_inches}\"", fill='#6b7280', font=font_small)
     
-    # === FOOTER ===
-    footer_y = height - 35
-    draw.line([(15, footer_y), (width - 15, footer_y)], fill=category_color, width=1)
+    return img
+
+
+@lru_cache(maxsize=256)
+def _card_palette(category: str, sub_category: str) -> Image.Image:
+    """
+    NEW: PNG palette for cards of one category/icon, taken once from a sample card.
+    Every card of the pair uses the same template, icon and text colours, so
+    mapping onto this palette is cheap and deterministic (same card, same bytes).
+    """
+    sample = _draw_product_card('Sample Product Name', 'Sample Brand', 'MODEL-0000', category, sub_category, 65)
+    return sample.quantize(CARD_PALETTE_COLORS, method=Image.Quantize.MEDIANCUT)
+
+
+def generate_product_info_card(product_name, brand, model, category, sub_category=None, size_inches=None):
+    """
+    Creates a professional visual info card for products with category-specific icons.
+    ENHANCED: Drawn on the pre-built category template and saved as a palette PNG
+    (an RGB PNG encode cost more than drawing the card).
     
-    # Footer text
-    draw.text((15, footer_y + 8), "Professional AV Equipment", fill='#9ca3af', font=font_small)
+    Args:
+        product_name: Full product name
+        brand: Manufacturer brand
+        model: Model number
+        category: Product category
+        sub_category: Product sub-category (optional, enhances icon accuracy)
+        size_inches: Display size (for displays only)
+    
+    Returns:
+        BytesIO object containing PNG image
+    """
+    img = _draw_product_card(product_name, brand, model, category, sub_category, size_inches)
+    img = img.quantize(palette=_card_palette(category, sub_category or ''), dither=Image.Dither.NONE)
     
     # Convert to BytesIO
     buffer = BytesIO()
-    img.save(buffer, format='PNG')
+    img.save(buffer, format='PNG', compress_level=CARD_PNG_COMPRESS_LEVEL)
     buffer.seek(0)
     
     return buffer
 
 
+# ==============================================================================
+# === CONTENT-ADDRESSED CARD CACHE =============================================
+# ==============================================================================
+def product_card_key(product_name, brand, model, category, sub_category=None, size_inches=None) -> str:
+    """Stable hash of everything drawn on a card (plus the renderer version)"""
+    content = json.dumps(
+        [CARD_RENDER_VERSION, str(product_name), str(brand), str(model), str(category),
+         sub_category or '', size_inches],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class ProductCardCache:
+    """
+    NEW: PNG bytes of rendered product cards keyed on card content.
+    In-memory LRU, optionally backed by a directory of <key>.png files that
+    survives restarts and is shared between worker processes.
+    """
+    
+    def __init__(self, max_entries: int = 1024, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+    
+    def get_png(self, product_name, brand, model, category, sub_category=None, size_inches=None) -> Optional[bytes]:
+        """Cached PNG bytes for a card, rendering it on a miss"""
+        key = product_card_key(product_name, brand, model, category, sub_category, size_inches)
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return png
+        
+        png = self._read_disk(key)
+        source = 'disk_hits'
+        if png is None:
+            source = 'misses'
+            buffer = generate_product_info_card(product_name, brand, model, category, sub_category, size_inches)
+            if buffer is None:
+                return None
+            png = buffer.getvalue()
+            self._write_disk(key, png)
+        
+        with self._lock:
+            self.stats[source] += 1
+        self.put(key, png)
+        return png
+    
+    def lookup(self, key: str) -> Optional[bytes]:
+        """Cached PNG bytes from memory or disk, without rendering (disk hits are promoted)"""
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                return png
+        png = self._read_disk(key)
+        if png is not None:
+            self.put(key, png)
+        return png
+    
+    def put(self, key: str, png: bytes, persist: bool = False):
+        """Store pre-rendered PNG bytes under a product_card_key()"""
+        if persist:
+            self._write_disk(key, png)
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.png")
+    
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _write_disk(self, key: str, png: bytes):
+        if not self.disk_dir:
+            return
+        tmp_path = f"{self._disk_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, self._disk_path(key))  # Atomic - readers never see partial files
+        except OSError as e:
+            print(f"WARNING: Could not write card cache file: {e}")
+    
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.max_entries, **self.stats}
+    
+    def clear(self):
+        """Drop the in-memory entries (disk files are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.stats.update(hits=0, disk_hits=0, misses=0)
+
+
+# Process-wide cache; set BOQ_CARD_CACHE_DIR to also persist cards on disk
+_card_cache = ProductCardCache(disk_dir=os.environ.get('BOQ_CARD_CACHE_DIR') or None)
+
+
+def get_card_cache() -> ProductCardCache:
+    return _card_cache
+
+
+def configure_card_cache(max_entries: int = 1024, disk_dir: Optional[str] = None) -> ProductCardCache:
+    """Replace the process-wide card cache (e.g. to enable the disk layer)"""
+    global _card_cache
+    _card_cache = ProductCardCache(max_entries=max_entries, disk_dir=disk_dir)
+    return _card_cache
+
+
+def get_product_card_png(product_name, brand, model, category, sub_category=None, size_inches=None) -> Optional[bytes]:
+    """
+    NEW: Cached product card PNG bytes - each distinct card is rendered once.
+    Wrap in a fresh BytesIO per use (openpyxl reads the stream at save time).
+    """
+    return _card_cache.get_png(product_name, brand, model, category, sub_category, size_inches)
+
+
+# ==============================================================================
+# === PARALLEL PRE-RENDER ======================================================
+# ==============================================================================
+CARD_SPEC_FIELDS = ('product_name', 'brand', 'model', 'category', 'sub_category', 'size_inches')
+MIN_PARALLEL_CARDS = 8  # Below this, process start-up costs more than it saves
+
+
+def _render_card_png(spec: tuple) -> Optional[bytes]:
+    """Process-pool worker: render one card spec to PNG bytes"""
+    buffer = generate_product_info_card(*spec)
+    return buffer.getvalue() if buffer is not None else None
+
+
+def prerender_product_cards(card_specs, max_workers: Optional[int] = None,
+                            min_parallel: int = MIN_PARALLEL_CARDS) -> Dict[str, bytes]:
+    """
+    NEW: Render every distinct, not yet cached card in a process pool and load the
+    results into the card cache.
+    card_specs: dicts with CARD_SPEC_FIELDS keys (missing keys default to None).
+    Returns {product_card_key: PNG bytes} for every distinct card - the export
+    reads from this, so a project with more cards than the cache holds never
+    re-renders its own evicted cards.
+    """
+    cache = get_card_cache()
+    cards = {}
+    pending = {}
+    for spec in card_specs:
+        values = tuple(spec.get(field) for field in CARD_SPEC_FIELDS)
+        key = product_card_key(*values)
+        if key in cards or key in pending:
+            continue
+        png = cache.lookup(key)
+        if png is not None:
+            cards[key] = png
+        else:
+            pending[key] = values
+    if not pending:
+        return cards
+    
+    keys = list(pending)
+    rendered = None
+    if len(keys) >= min_parallel and (max_workers or os.cpu_count() or 1) > 1:
+        try:
+            workers = min(max_workers or os.cpu_count() or 1, len(keys))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rendered = list(executor.map(_render_card_png, [pending[k] for k in keys],
+                                             chunksize=max(1, len(keys) // (workers * 4))))
+        except (OSError, BrokenProcessPool, RuntimeError) as e:
+            # No process support here (sandbox, frozen app) - render in this process instead
+            print(f"WARNING: Parallel card rendering unavailable ({e}); rendering serially")
+    if rendered is None:
+        rendered = [_render_card_png(pending[k]) for k in keys]
+    
+    for key, png in zip(keys, rendered):
+        if png is not None:
+            cache.put(key, png, persist=True)
+            cards[key] = png
+    return cards
+
+
 # Example usage function
 def create_sample_cards():
     """
@@ -0,0 +1,180 @@
+# components/project_totals.py
+"""
+Project Financial Model
+One vectorized pass over every BOQ line in a project: INR line totals, SGST/CGST
+split, service lines, room totals and grand totals. The result is immutable and
+every Excel sheet reads from it, so all sheets agree to the rupee.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Services are priced as a share of the room's hardware subtotal
+SERVICE_LINES = (
+    ("Installation & Commissioning", 0.15),
+    ("System Warranty (3 Years)", 0.05),
+    ("Project Management", 0.10),
+)
+DEFAULT_GST_RATE = 18
+
+
+@dataclass(frozen=True)
+class LineTotals:
+    """One BOQ line in INR (GST split equally into SGST and CGST)"""
+    unit_price_inr: float
+    subtotal: float
+    gst_rate: float
+    sgst_amount: float
+    cgst_amount: float
+    total_tax: float
+    total_with_gst: float
+
+    @property
+    def sgst_rate(self) -> float:
+        return self.gst_rate / 2
+
+    @property
+    def cgst_rate(self) -> float:
+        return self.gst_rate / 2
+
+
+@dataclass(frozen=True)
+class ServiceLine:
+    name: str
+    percentage: float
+    amount: float
+    gst_rate: float
+    sgst_amount: float
+    cgst_amount: float
+    total_tax: float
+    total: float
+
+    @property
+    def sgst_rate(self) -> float:
+        return self.gst_rate / 2
+
+    @property
+    def cgst_rate(self) -> float:
+        return self.gst_rate / 2
+
+
+@dataclass(frozen=True)
+class RoomTotals:
+    """Lines are in the order of the room's boq_items"""
+    name: str
+    lines: Tuple[LineTotals, ...]
+    services: Tuple[ServiceLine, ...]
+    total_qty: int
+    hardware_subtotal: float
+    hardware_tax: float
+    services_total: float
+    services_tax: float
+
+    @property
+    def subtotal(self) -> float:
+        """Hardware + services, before GST"""
+        return self.hardware_subtotal + self.services_total
+
+    @property
+    def gst(self) -> float:
+        return self.hardware_tax + self.services_tax
+
+    @property
+    def total(self) -> float:
+        return self.subtotal + self.gst
+
+    @property
+    def avg_rate(self) -> float:
+        """Subtotal per unit (Proposal Summary 'Rate w/o TAX')"""
+        return self.subtotal / self.total_qty if self.total_qty > 0 else self.subtotal
+
+
+@dataclass(frozen=True)
+class ProjectTotals:
+    """Rooms are in the order of rooms_data"""
+    rooms: Tuple[RoomTotals, ...]
+    equipment: float
+    services: float
+    subtotal: float
+    gst: float
+    total: float
+
+
+def compute_project_totals(rooms_data: List[Dict], usd_to_inr_rate: float,
+                           gst_rates: Optional[Dict] = None) -> ProjectTotals:
+    """
+    NEW: Price every line of every room in one vectorized pass.
+    Line GST defaults to gst_rates['Electronics'], services use gst_rates['Services'].
+    """
+    gst_rates = gst_rates or {}
+    default_gst = gst_rates.get('Electronics', DEFAULT_GST_RATE)
+    services_gst = gst_rates.get('Services', DEFAULT_GST_RATE)
+
+    room_items = [room.get('boq_items') or [] for room in rooms_data]
+    room_index = np.repeat(np.arange(len(room_items)), [len(items) for items in room_items])
+    flat_items = [item for items in room_items for item in items]
+
+    # === LINE TOTALS (all rooms at once) ===
+    price = np.array([item.get('price', 0) for item in flat_items], dtype=float)
+    quantity = np.array([item.get('quantity', 1) for item in flat_items], dtype=float)
+    gst_rate = np.array([item.get('gst_rate', default_gst) for item in flat_items], dtype=float)
+
+    unit_price_inr = price * usd_to_inr_rate
+    line_subtotal = unit_price_inr * quantity
+    half_tax = line_subtotal * (gst_rate / 2 / 100)
+    line_tax = half_tax * 2
+    line_total = line_subtotal + line_tax
+
+    # === ROOM SUMS ===
+    n_rooms = len(room_items)
+    hardware_subtotal = np.bincount(room_index, weights=line_subtotal, minlength=n_rooms)
+    hardware_tax = np.bincount(room_index, weights=line_tax, minlength=n_rooms)
+    total_qty = np.bincount(room_index, weights=quantity, minlength=n_rooms)
+
+    # === SERVICES (share of each room's hardware subtotal) ===
+    service_pct = np.array([pct for _, pct in SERVICE_LINES], dtype=float)
+    service_amount = hardware_subtotal[:, None] * service_pct[None, :]
+    service_half_tax = service_amount * (services_gst / 2 / 100)
+    service_tax = service_half_tax * 2
+
+    line_columns = list(zip(
+        unit_price_inr.tolist(), line_subtotal.tolist(), gst_rate.tolist(),
+        half_tax.tolist(), half_tax.tolist(), line_tax.tolist(), line_total.tolist()
+    ))
+    rooms = []
+    start = 0
+    for r, (room, items) in enumerate(zip(rooms_data, room_items)):
+        end = start + len(items)
+        services = tuple(
+            ServiceLine(name, pct, amount, services_gst, half, half, tax, amount + tax)
+            for (name, pct), amount, half, tax in zip(
+                SERVICE_LINES, service_amount[r].tolist(), service_half_tax[r].tolist(), service_tax[r].tolist())
+        )
+        rooms.append(RoomTotals(
+            name=room.get('name', f'Room {r + 1}'),
+            lines=tuple(LineTotals(*columns) for columns in line_columns[start:end]),
+            services=services,
+            total_qty=int(total_qty[r]),
+            hardware_subtotal=float(hardware_subtotal[r]),
+            hardware_tax=float(hardware_tax[r]),
+            services_total=float(service_amount[r].sum()),
+            services_tax=float(service_tax[r].sum()),
+        ))
+        start = end
+
+    return ProjectTotals(
+        rooms=tuple(rooms),
+        equipment=sum(room.hardware_subtotal for room in rooms),
+        services=sum(room.services_total for room in rooms),
+        subtotal=sum(room.subtotal for room in rooms),
+        gst=sum(room.gst for room in rooms),
+        total=sum(room.total for room in rooms),
+    )
+
+
+def compute_room_totals(boq_items: List[Dict], usd_to_inr_rate: float,
+                        gst_rates: Optional[Dict] = None, name: str = '') -> RoomTotals:
+    """Totals for a single room (same model as compute_project_totals)"""
+    return compute_project_totals([{'name': name, 'boq_items': boq_items}], usd_to_inr_rate, gst_rates).rooms[0]
@@ -4,8 +4,9 @@ Unified Requirements Context - The Single Source of Truth
 This object is passed to ALL systems to ensure coordination
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Dict, List, Any, Optional
+import copy
 import json
 
 @dataclass
@@ -87,6 +88,7 @@ class ProjectContext:
     project_name: str
     client_name: str
     budget_tier: str = "Standard"
+    room_budget_cap: Optional[float] = None  # NEW: Optional equipment budget cap (USD) for the room optimizer
     is_psni_referral: bool = False
     is_existing_customer: bool = False
     currency: str = "USD"
@@ -128,6 +130,47 @@ class UnifiedRequirementsContext:
             'decision_log': self.decision_log
         }
     
+    def for_room(self, room_name: str, room_type: str, length_ft: float, width_ft: float,
+                 ceiling_height_ft: float, seating_capacity: Optional[int] = None) -> 'UnifiedRequirementsContext':
+        """
+        NEW: Independent copy of this context for another room of the same project.
+        Brand, technical and project choices carry over; room geometry, AVIXA
+        results and the decision log start fresh.
+        """
+        if seating_capacity is None and room_type != self.room.room_type:
+            from components.room_profiles import ROOM_SPECS
+            capacity = ROOM_SPECS.get(room_type, {}).get('capacity')
+            seating_capacity = capacity[1] if capacity else None
+        elif seating_capacity is None:
+            seating_capacity = self.room.seating_capacity
+        
+        area = length_ft * width_ft
+        room = replace(
+            self.room,
+            room_name=room_name,
+            room_type=room_type,
+            length_ft=length_ft,
+            width_ft=width_ft,
+            ceiling_height_ft=ceiling_height_ft,
+            area_sqft=area,
+            volume_cuft=area * ceiling_height_ft,
+            seating_capacity=seating_capacity,
+            table_dimensions=copy.deepcopy(self.room.table_dimensions)
+        )
+        technical = copy.deepcopy(self.technical)
+        technical.display_size_avixa = None
+        technical.display_size_final = None
+        technical.microphone_count_avixa = None
+        technical.speaker_count_avixa = None
+        
+        return UnifiedRequirementsContext(
+            room=room,
+            technical=technical,
+            brands=copy.deepcopy(self.brands),
+            project=copy.deepcopy(self.project),
+            acim_responses=copy.deepcopy(self.acim_responses)
+        )
+    
     @classmethod
     def from_questionnaire(cls, questionnaire_responses: Dict, 
                            client_requirements: 'ClientRequirements') -> 'UnifiedRequirementsContext':
@@ -0,0 +1,206 @@
+# components/room_budget_optimizer.py
+"""
+Room Budget Optimizer
+Chooses the best-scoring product combination for a whole room under a budget cap
+"""
+
+import time
+from typing import Dict, List, Any, Optional
+
+from components.intelligent_product_selector import BrandEcosystemManager, get_brand_ecosystem_manager
+
+# Where in each candidate set's price range a tier should land
+# (mirrors the percentile bands used by IntelligentProductSelector._select_by_budget)
+TIER_PRICE_TARGETS = {
+    'Economy': 0.2,
+    'Standard': 0.5,
+    'Premium': 0.875,
+    'Executive': 0.875,
+    'Enterprise': 0.875,
+}
+
+ECOSYSTEM_WEIGHT = 1.0  # Bonus for a fully matched VC/audio/control ecosystem
+
+
+class RoomBudgetOptimizer:
+    """
+    Branch-and-bound search over pruned per-component candidate lists.
+    Maximises product quality + budget tier fit + ecosystem score, subject to
+    a total room cost cap, within a hard time budget.
+    """
+
+    def __init__(self, ecosystem_manager: Optional[BrandEcosystemManager] = None,
+                 time_budget_ms: float = 200, max_candidates: int = 8):
+        self.ecosystem_manager = ecosystem_manager or get_brand_ecosystem_manager()
+        self.time_budget_ms = time_budget_ms
+        self.max_candidates = max_candidates
+
+    def optimize(self, candidate_sets: Dict[str, Any], quantities: Dict[str, int],
+                 budget_cap: float, vc_platform: Optional[str] = None,
+                 budget_tier: str = 'Standard') -> Dict[str, Any]:
+        """
+        Args:
+            candidate_sets: {component_key: DataFrame or list of product dicts}
+            quantities: {component_key: quantity}
+            budget_cap: Maximum total equipment cost (same currency as 'price')
+            vc_platform: VC platform used for ecosystem scoring (e.g. 'Microsoft Teams')
+
+        Returns:
+            Dict with 'status' ('optimal', 'time_limit' or 'infeasible'), 'selections',
+            'total_cost', 'score', 'ecosystem_score', 'elapsed_ms', 'nodes_explored'
+        """
+        start = time.perf_counter()
+        deadline = start + self.time_budget_ms / 1000.0
+
+        components = self._prepare_components(candidate_sets, quantities, budget_tier)
+        if not components:
+            return self._result('infeasible', {}, 0, 0, None, start, 0, budget_cap)
+
+        # Ecosystem is decided by the first Audio and first Control Systems component
+        # (same rule as IntelligentProductSelector.validate_ecosystem_consistency)
+        audio_key = next((c['key'] for c in components if c['category'] == 'Audio'), None)
+        control_key = next((c['key'] for c in components if c['category'] == 'Control Systems'), None)
+        use_ecosystem = bool(vc_platform) and audio_key is not None
+
+        # Branch on the components with the widest cost spread first
+        components.sort(key=lambda c: c['options'][-1]['cost'] - c['options'][0]['cost'], reverse=True)
+        n = len(components)
+
+        # Suffix bounds: cheapest possible remaining cost, best possible remaining utility
+        min_cost_suffix = [0.0] * (n + 1)
+        max_utility_suffix = [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            min_cost_suffix[i] = min_cost_suffix[i + 1] + min(o['cost'] for o in components[i]['options'])
+            max_utility_suffix[i] = max_utility_suffix[i + 1] + max(o['utility'] for o in components[i]['options'])
+
+        if min_cost_suffix[0] > budget_cap:
+            return self._result('infeasible', {}, min_cost_suffix[0], 0, None, start, 0, budget_cap)
+
+        eco_bonus_bound = ECOSYSTEM_WEIGHT if use_ecosystem else 0.0
+        best = {'score': float('-inf'), 'choice': None, 'cost': 0.0, 'eco': None}
+        choice = [None] * n
+        state = {'nodes': 0, 'timed_out': False}
+
+        def ecosystem_score():
+            brands = {components[i]['key']: choice[i]['brand'] for i in range(n)}
+            audio_brand = brands.get(audio_key, '')
+            control_brand = brands.get(control_key, '') if control_key else ''
+            compatible, score = self.ecosystem_manager.is_ecosystem_compatible(
+                vc_platform, audio_brand, control_brand
+            )
+            # Only a full audio + control pairing can be ruled incompatible
+            if not compatible and control_brand:
+                return None
+            return score
+
+        def search(i, cost, utility):
+            state['nodes'] += 1
+            if time.perf_counter() > deadline:
+                state['timed_out'] = True
+                return
+
+            if i == n:
+                eco = ecosystem_score() if use_ecosystem else None
+                if use_ecosystem and eco is None:
+                    return
+                total = utility + (ECOSYSTEM_WEIGHT * eco if eco is not None else 0.0)
+                if total > best['score']:
+                    best.update(score=total, choice=list(choice), cost=cost, eco=eco)
+                return
+
+            for option in components[i]['options_by_utility']:
+                new_cost = cost + option['cost']
+                if new_cost + min_cost_suffix[i + 1] > budget_cap:
+                    continue
+                if utility + option['utility'] + max_utility_suffix[i + 1] + eco_bonus_bound <= best['score']:
+                    # Options are utility-sorted, so no later option can do better
+                    break
+                choice[i] = option
+                search(i + 1, new_cost, utility + option['utility'])
+                if state['timed_out']:
+                    return
+
+        search(0, 0.0, 0.0)
+
+        if best['choice'] is None:
+            status = 'time_limit' if state['timed_out'] else 'infeasible'
+            return self._result(status, {}, 0, 0, None, start, state['nodes'], budget_cap)
+
+        selections = {
+            components[i]['key']: best['choice'][i]['product'] for i in range(n)
+        }
+        status = 'time_limit' if state['timed_out'] else 'optimal'
+        return self._result(status, selections, best['cost'], best['score'], best['eco'],
+                            start, state['nodes'], budget_cap)
+
+    def _prepare_components(self, candidate_sets: Dict[str, Any], quantities: Dict[str, int],
+                            budget_tier: str) -> List[Dict]:
+        """Score candidates and prune each list to its cost/utility frontier"""
+        tier_target = TIER_PRICE_TARGETS.get(budget_tier, 0.5)
+        components = []
+
+        for key, candidates in candidate_sets.items():
+            if hasattr(candidates, 'to_dict'):
+                candidates = candidates.to_dict('records')
+            candidates = [c for c in (candidates or []) if c.get('price') is not None]
+            if not candidates:
+                continue
+
+            quantity = quantities.get(key, 1) or 1
+            candidates = sorted(candidates, key=lambda c: float(c.get('price', 0)))
+            span = max(len(candidates) - 1, 1)
+
+            options = []
+            for rank, product in enumerate(candidates):
+                quality = float(product.get('data_quality_score', 100) or 0) / 100.0
+                tier_fit = 1.0 - abs(rank / span - tier_target)
+                options.append({
+                    'product': product,
+                    'brand': str(product.get('brand', '')),
+                    'cost': float(product.get('price', 0)) * quantity,
+                    'utility': 0.5 * quality + 0.5 * tier_fit,
+                })
+
+            options = self._prune_options(options)
+            components.append({
+                'key': key,
+                'category': candidates[0].get('category', ''),
+                'options': options,  # cost-ascending
+                'options_by_utility': sorted(options, key=lambda o: o['utility'], reverse=True),
+            })
+
+        return components
+
+    def _prune_options(self, options: List[Dict]) -> List[Dict]:
+        """
+        Drop options dominated by a cheaper, better option of the same brand
+        (brand is kept because it drives the ecosystem score), then cap the list
+        to the cheapest option plus the highest-utility ones.
+        """
+        frontier = []
+        best_by_brand = {}
+        for option in options:  # cost-ascending
+            brand = option['brand'].lower()
+            if option['utility'] > best_by_brand.get(brand, float('-inf')):
+                best_by_brand[brand] = option['utility']
+                frontier.append(option)
+
+        if len(frontier) <= self.max_candidates:
+            return frontier
+
+        cheapest = frontier[0]
+        top = sorted(frontier[1:], key=lambda o: o['utility'], reverse=True)[:self.max_candidates - 1]
+        return sorted([cheapest] + top, key=lambda o: o['cost'])
+
+    @staticmethod
+    def _result(status, selections, total_cost, score, eco, start, nodes, budget_cap) -> Dict[str, Any]:
+        return {
+            'status': status,
+            'selections': selections,
+            'total_cost': total_cost,
+            'budget_cap': budget_cap,
+            'score': score,
+            'ecosystem_score': eco,
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+            'nodes_explored': nodes,
+        }
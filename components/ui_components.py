@@ -1,6 +1,7 @@
 # components/ui_components.py
 # COMPLETE ENHANCED VERSION - Aligned with boq_generator.py v2.0
 
+import uuid
 import streamlit as st
 import pandas as pd
 from datetime import datetime
@@ -29,6 +30,10 @@ except ImportError:
             return {'rooms': rooms, 'optimization': 'none'}
 
 
+# Seconds between export queue status refreshes while a job is running
+EXPORT_POLL_SECONDS = 2
+
+
 # ==================== MAIN UI SECTION BUILDERS ====================
 
 def create_project_header():
@@ -157,6 +162,87 @@ def create_advanced_requirements():
     }
 
 
+def _export_owner_id():
+    """NEW: Id of this browser session in the shared export job queue"""
+    if 'export_owner_id' not in st.session_state:
+        st.session_state.export_owner_id = uuid.uuid4().hex
+    return st.session_state.export_owner_id
+
+
+def _render_export_queue(owner, polling=False):
+    """Status, progress and download button for each of the owner's export jobs."""
+    from components.export_jobs import get_export_runner
+    runner = get_export_runner()
+    jobs = runner.jobs_for(owner)
+    if not jobs:
+        return
+
+    st.markdown("#### 📥 Export Queue")
+    for job in jobs:
+        st.markdown(f"**{job.label or job.filename}**")
+        if job.status == 'queued':
+            st.progress(0.0, text="⏳ Waiting for a free export worker...")
+        elif job.status == 'running':
+            step = f"{job.sheets_done}/{job.sheets_total} sheets" if job.sheets_total else "Starting"
+            st.progress(job.fraction, text=f"{step} - {job.current_sheet}")
+        elif job.status == 'failed':
+            st.error(f"❌ Excel generation error: {job.error}")
+        else:
+            # Show optimization summary
+            optimization = job.metadata
+            if optimization.get('optimization') == 'multi-room' and optimization.get('room_count', 0) >= 3:
+                st.info(
+                    f"🔧 Multi-Room Optimization Applied\n\n"
+                    f"**Cost Savings:** {optimization['savings_pct']:.1f}%\n\n"
+                    f"**Shared Infrastructure:**\n"
+                    f"- Centralized network switch\n"
+                    f"- Consolidated equipment racks\n"
+                    f"- Eliminates {optimization['shared_infrastructure']['network']['eliminates_individual_switches']} individual switches"
+                )
+            excel_data = runner.read(job.job_id)
+            if excel_data:
+                st.download_button(
+                    label="📊 Download Full Project BOQ",
+                    data=excel_data,
+                    file_name=job.filename,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    use_container_width=True,
+                    type="secondary",
+                    key=f"download_{job.job_id}"
+                )
+                st.caption(f"Available for another {runner.expires_in(job) / 60:.0f} min")
+            else:
+                st.error("❌ Failed to generate Excel file. Check excel_generator.py")
+
+        if not job.active and st.button("🗑️ Remove", key=f"remove_export_{job.job_id}"):
+            runner.remove(job.job_id)
+            st.rerun()
+
+    if polling and not any(job.active for job in jobs):
+        # All jobs finished - one full rerun stops the polling
+        st.rerun()
+
+
+def show_export_queue():
+    """
+    NEW: Per-session download queue of background exports.
+    While a job is queued or running the queue re-renders itself every
+    EXPORT_POLL_SECONDS (st.fragment) without rerunning the rest of the page.
+    """
+    try:
+        from components.export_jobs import get_export_runner
+    except ImportError:
+        return
+    owner = _export_owner_id()
+    polling = any(job.active for job in get_export_runner().jobs_for(owner))
+    if polling and hasattr(st, 'fragment'):
+        st.fragment(run_every=EXPORT_POLL_SECONDS)(_render_export_queue)(owner, polling=True)
+    else:
+        _render_export_queue(owner)
+        if polling and st.button("🔄 Refresh export status", key="refresh_export_queue_btn"):
+            st.rerun()
+
+
 def create_multi_room_interface():
     """Interface for managing multiple rooms in a project."""
     st.markdown("---")
@@ -185,6 +271,9 @@ def create_multi_room_interface():
                     'name': room_name,
                     'type': st.session_state.get('room_type_select', list(ROOM_SPECS.keys())[0]),
                     'area': st.session_state.get('room_length_input', 24) * st.session_state.get('room_width_input', 16),
+                    'length': st.session_state.get('room_length_input', 24),
+                    'width': st.session_state.get('room_width_input', 16),
+                    'ceiling_height': st.session_state.get('ceiling_height_input', 10),
                     'boq_items': [],
                     'features': st.session_state.get('features_text_area', ''),
                     'technical_reqs': {}
@@ -219,44 +308,99 @@ def create_multi_room_interface():
             else:
                 try:
                     # Import here to avoid circular dependency
-                    from components.excel_generator import generate_company_excel
+                    from components.excel_generator import project_fingerprint, CachedWorkbookExporter
+                    from components.export_jobs import get_export_runner, submit_company_export
                     from components.utils import get_usd_to_inr_rate
-                    
-                    # ✅ ADD OPTIMIZATION CALL HERE:
                     from components.multi_room_optimizer import MultiRoomOptimizer
-                    optimizer = MultiRoomOptimizer()
-                    optimized_result = optimizer.optimize_multi_room_project(valid_rooms)
-                    
-                    # Show optimization summary
-                    if optimized_result.get('optimization') == 'multi-room' and len(valid_rooms) >= 3:
-                        st.info(
-                            f"🔧 Multi-Room Optimization Applied\n\n"
-                            f"**Cost Savings:** {optimized_result['savings_pct']:.1f}%\n\n"
-                            f"**Shared Infrastructure:**\n"
-                            f"- Centralized network switch\n"
-                            f"- Consolidated equipment racks\n"
-                            f"- Eliminates {optimized_result['shared_infrastructure']['network']['eliminates_individual_switches']} individual switches"
-                        )
-                    
-                    excel_data = generate_company_excel(
-                        project_details=project_details,
-                        rooms_data=optimized_result['rooms'],  # ✅ Use optimized rooms
-                        usd_to_inr_rate=get_usd_to_inr_rate()
-                    )
 
-                    if excel_data:
-                        filename = f"{project_details['Project Name']}_BOQ_{datetime.now().strftime('%Y%m%d')}.xlsx"
-                        st.download_button(
-                            label="📊 Download Full Project BOQ",
-                            data=excel_data,
-                            file_name=filename,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True,
-                            type="secondary"
-                        )
+                    # NEW: Export is lazy - the optimizer and workbook only run on request,
+                    # and the result is reused until the project fingerprint changes
+                    usd_to_inr_rate = get_usd_to_inr_rate()
+                    optimization_enabled = st.session_state.get('multi_room_optimization_enabled', True)
+                    rooms_are_adjacent = st.session_state.get('rooms_are_adjacent', False)
+                    export_key = project_fingerprint(
+                        project_details, valid_rooms, usd_to_inr_rate,
+                        optimization_enabled=optimization_enabled,
+                        rooms_are_adjacent=rooms_are_adjacent
+                    )
+                    if 'project_workbook_exporter' not in st.session_state:
+                        st.session_state.project_workbook_exporter = CachedWorkbookExporter()
+
+                    # NEW: The export runs as a background job; it shows up in the
+                    # download queue below, which polls its progress
+                    owner = _export_owner_id()
+                    if get_export_runner().find(owner, export_key) is None:
+                        if st.button("📦 Prepare Full Project BOQ", use_container_width=True,
+                                     key="prepare_project_export_btn"):
+                            submit_company_export(
+                                owner, project_details, valid_rooms, usd_to_inr_rate,
+                                filename=f"{project_details['Project Name']}_BOQ_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                                key=export_key,
+                                # ✅ Settings passed explicitly - the job runs outside the script thread
+                                optimizer=MultiRoomOptimizer(optimization_enabled=optimization_enabled,
+                                                             rooms_are_adjacent=rooms_are_adjacent),
+                                # Changed rooms are rebuilt, unchanged room sheets are reused
+                                exporter=st.session_state.project_workbook_exporter
+                            )
+                        else:
+                            st.caption("Workbook is built in the background and kept until the project changes.")
                     else:
-                        st.error("❌ Failed to generate Excel file. Check excel_generator.py")
-                        
+                        st.caption("📥 This project's workbook is in the export queue below.")
+
+                    # NEW: Plain exports for ERP / procurement - no styled workbook needed.
+                    # Nothing runs until "Prepare" is pressed (the expander body runs on every
+                    # rerun, even collapsed); the BOQ document is then kept for this project
+                    # version and each format is rendered the first time it is asked for.
+                    with st.expander("📄 CSV / JSON / PDF"):
+                        plain_export = st.session_state.get('plain_export')
+                        if plain_export is not None and plain_export['key'] != export_key:
+                            plain_export = st.session_state.plain_export = None
+
+                        plain_format = st.radio(
+                            "Format", ['json', 'csv', 'pdf'], horizontal=True, key="plain_export_format",
+                            format_func=lambda fmt: {'json': 'JSON', 'csv': 'CSV', 'pdf': 'PDF'}[fmt]
+                        )
+                        if plain_export is None or plain_format not in plain_export['files']:
+                            if st.button(f"📄 Prepare {plain_format.upper()}", use_container_width=True,
+                                         key="plain_export_prepare_btn"):
+                                from components.boq_document import build_boq_document
+                                from components.boq_renderers import RENDERERS, render_boq, zip_files
+
+                                if plain_export is None:
+                                    optimizer = MultiRoomOptimizer(optimization_enabled=optimization_enabled,
+                                                                   rooms_are_adjacent=rooms_are_adjacent)
+                                    plain_export = {
+                                        'key': export_key,
+                                        'document': build_boq_document(
+                                            project_details,
+                                            optimizer.optimize_multi_room_project(valid_rooms)['rooms'],
+                                            usd_to_inr_rate
+                                        ),
+                                        'files': {},
+                                    }
+                                    st.session_state.plain_export = plain_export
+
+                                files = render_boq(plain_export['document'], plain_format)
+                                if len(files) == 1:
+                                    filename, data = next(iter(files.items()))
+                                    mime = RENDERERS[plain_format].media_type
+                                else:
+                                    # One CSV per room - bundled for the browser
+                                    filename = f"{project_details['Project Name']}_BOQ_{plain_format.upper()}.zip"
+                                    data, mime = zip_files(files), "application/zip"
+                                plain_export['files'][plain_format] = (filename, data, mime)
+
+                        if plain_export is not None and plain_format in plain_export['files']:
+                            filename, data, mime = plain_export['files'][plain_format]
+                            st.download_button(
+                                label=f"⬇️ Download {plain_format.upper()}",
+                                data=data,
+                                file_name=filename,
+                                mime=mime,
+                                use_container_width=True,
+                                key="plain_export_download_btn"
+                            )
+
                 except ImportError as e:
                     st.error(f"❌ Excel generation failed: Missing component - {e}")
                     st.info("Please ensure excel_generator.py and multi_room_optimizer.py are in the components folder")
@@ -266,11 +410,19 @@ def create_multi_room_interface():
                     with st.expander("🔍 Technical Details"):
                         st.code(traceback.format_exc())
 
+    # NEW: Background exports of this session (progress + downloads)
+    show_export_queue()
+
     # Room selection and management
     if st.session_state.project_rooms:
         st.markdown("---")
         st.write("**Current Project Rooms:**")
 
+        # NEW: Generate every room in one pass across a worker pool
+        if st.button(f"⚡ Generate All {len(st.session_state.project_rooms)} Rooms",
+                     use_container_width=True, key="generate_all_rooms_btn"):
+            _generate_all_project_rooms()
+
         # Save current room's BOQ items before switching
         previous_room_index = st.session_state.current_room_index
         if previous_room_index < len(st.session_state.project_rooms):
@@ -303,6 +455,84 @@ def create_multi_room_interface():
             st.rerun()
 
 
+@st.cache_resource(show_spinner=False)
+def _get_shared_catalog(catalog_key, _product_df):
+    """One standardized, indexed catalog per catalog version, shared by all room workers."""
+    from components.intelligent_product_selector import SharedCatalog
+    return SharedCatalog(_product_df)
+
+
+def _generate_all_project_rooms():
+    """NEW: Parallel generation for all project rooms, merged back in room order"""
+    if not st.session_state.get('unified_context'):
+        st.error("❌ Please complete the Smart Questionnaire first!")
+        return
+    product_df = st.session_state.get('product_df')
+    if product_df is None:
+        st.error("❌ Product catalog not loaded.")
+        return
+
+    from components.alternatives_engine import catalog_fingerprint
+    from components.multi_room_generator import (
+        build_room_contexts, generate_project_boqs, merge_into_project_rooms
+    )
+
+    rooms = st.session_state.project_rooms
+    catalog = _get_shared_catalog(catalog_fingerprint(product_df), product_df)
+    contexts = build_room_contexts(st.session_state.unified_context, rooms)
+
+    progress_bar = st.progress(0, text=f"Generating {len(rooms)} rooms...")
+    room_status = st.empty()
+    finished = []
+
+    def on_room_done(index, result):
+        finished.append(index)
+        status = "❌" if result.messages and result.messages[-1][0] == 'error' else "✅"
+        progress_bar.progress(len(finished) / len(rooms),
+                              text=f"{status} {rooms[index]['name']} ({len(finished)}/{len(rooms)})")
+        room_status.caption(f"Last completed: {rooms[index]['name']} - {len(result.items)} items "
+                            f"in {result.elapsed_ms / 1000:.1f}s")
+
+    results = generate_project_boqs(contexts, catalog, on_room_done=on_room_done)
+    merge_into_project_rooms(rooms, results)
+
+    current = st.session_state.current_room_index
+    if current < len(rooms):
+        st.session_state.boq_items = rooms[current].get('boq_items', [])
+        st.session_state.validation_results = rooms[current].get('validation_results', {})
+        update_boq_content_with_current_items()
+
+    failed = [rooms[i]['name'] for i, r in enumerate(results) if not r.items]
+    progress_bar.empty()
+    if failed:
+        st.warning(f"⚠️ No BOQ generated for: {', '.join(failed)}")
+    st.success(f"✅ Generated BOQs for {len(rooms) - len(failed)}/{len(rooms)} rooms")
+
+
+# ==================== HEADLESS GENERATION ADAPTER ====================
+
+def streamlit_generation_callbacks(progress_bar=None):
+    """
+    NEW: Progress/log callbacks that render headless BOQ generation in Streamlit
+    Returns (progress_callback, log_callback) for run_room_generation()
+    """
+    def progress_callback(fraction: float, message: str):
+        if progress_bar is not None:
+            progress_bar.progress(min(max(fraction, 0.0), 1.0), text=message)
+
+    def log_callback(message: str, level: str = 'info'):
+        if level == 'success':
+            st.success(message)
+        elif level == 'warning':
+            st.warning(message)
+        elif level == 'error':
+            st.error(message)
+        else:
+            st.info(message)
+
+    return progress_callback, log_callback
+
+
 # ==================== BOQ DISPLAY AND EDITING ====================
 
 def display_validation_summary(validation_results, selector):
@@ -953,6 +1183,12 @@ def product_search_interface(product_df, currency):
                         st.success(f"✅ Added {add_qty}x {product['name']}!")
                         st.rerun()
 
+@st.cache_resource(show_spinner=False)
+def _get_alternatives_engine(catalog_key, _product_df):
+    """One alternatives neighbour index per catalog version, shared across reruns."""
+    from components.alternatives_engine import AlternativesEngine
+    return AlternativesEngine(_product_df)
+
 def create_boq_comparison_interface(product_df):
     """
     Allow users to compare current BOQ with alternatives
@@ -1008,30 +1244,32 @@ def create_boq_comparison_interface(product_df):
     
     st.markdown("---")
     
-    # Generate alternatives
+    # Generate alternatives (served from the cached neighbour index)
+    from components.alternatives_engine import catalog_fingerprint
+    engine = _get_alternatives_engine(catalog_fingerprint(product_df), product_df)
+    
+    col_dir, col_brand = st.columns([1, 2])
+    with col_dir:
+        price_direction = st.radio(
+            "Price", ["Any", "Cheaper", "Pricier"],
+            horizontal=True, key="alt_price_direction"
+        )
+    with col_brand:
+        brand_filter = st.multiselect(
+            "Brands",
+            engine.partition_brands(selected_item.get('category'), selected_item.get('sub_category')),
+            key="alt_brand_filter"
+        )
+    
     if st.button("🔍 Find Alternative Products", key="find_alternatives_btn"):
         with st.spinner("Searching for alternatives..."):
-            from components.intelligent_product_selector import ProductRequirement, IntelligentProductSelector
-            
-            # Create a requirement from the selected item
-            requirement = ProductRequirement(
-                category=selected_item.get('category'),
-                sub_category=selected_item.get('sub_category'),
-                quantity=selected_item.get('quantity', 1),
-                priority=1,
-                justification="Alternative search",
-                size_requirement=selected_item.get('size_requirement'),
-                client_preference_weight=0.0  # Ignore brand preference for alternatives
-            )
-            
-            selector = IntelligentProductSelector(
-                product_df=product_df,
-                client_preferences={},
-                budget_tier='Standard'
+            alternatives = engine.top_k(
+                selected_item,
+                count=3,
+                price_direction=price_direction.lower(),
+                brands=brand_filter or None
             )
             
-            alternatives = selector.suggest_alternatives(selected_item, requirement, count=3)
-            
             if alternatives:
                 st.markdown("### 🔄 Alternative Options")
                 
@@ -5,6 +5,7 @@ import streamlit.components.v1 as components
 import re
 import json
 from components.room_profiles import ROOM_SPECS
+from components.avixa_engine import analyze_room
 # --- Enhanced Room Specifications Database (Also needed by the visualizer) ---
 # --- Enhanced Room Specifications Database (Also needed by the visualizer) ---
 
@@ -150,6 +151,11 @@ def create_3d_visualization():
     room_height = st.session_state.get('ceiling_height_input', 9.0)
     room_type_str = st.session_state.get('room_type_select', 'Standard Conference Room (6-8 People)')
 
+    # AVIXA analytics come from the shared engine cache (same result the BOQ generator used)
+    capacity = ROOM_SPECS.get(room_type_str, {}).get('capacity')
+    avixa_calcs = analyze_room(room_length, room_width, room_height, room_type_str,
+                               capacity[1] if capacity else None)
+
     # The HTML and JavaScript to be rendered in the browser.
     # It reads Python variables via f-strings.
     html_content = f"""
@@ -394,6 +400,14 @@ def create_3d_visualization():
                     <span>Cable Runs Required</span>
                     <span class="space-value" id="cableRuns">0</span>
                 </div>
+                <div class="space-metric">
+                    <span>AVIXA Display Size</span>
+                    <span class="space-value" id="avixaDisplay">{avixa_calcs['display']['selected_size_inches']}"</span>
+                </div>
+                <div class="space-metric">
+                    <span>AVIXA Speakers / Mics</span>
+                    <span class="space-value" id="avixaAudio">{avixa_calcs['audio']['speakers_needed']} / {avixa_calcs['microphones']['mics_needed']}</span>
+                </div>
                 
                 <div id="spaceRecommendations" style="margin-top: 15px; padding-top: 15px; border-top: 1px solid rgba(255,255,255,0.2);">
                     <h4 style="color: #40C4FF; margin: 0 0 10px 0;">Recommendations</h4>